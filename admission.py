@@ -0,0 +1,165 @@
+# job-guardian/admission.py
+# /query 的流量控制：限制同時執行的 LLM 查詢數，超過的請求依序排隊。
+# - 佇列滿了直接回 429，排隊超過期限回 503，兩者都附 Retry-After（依近期處理時間估算）
+# - 空出名額時直接交給佇列最前面的請求（FIFO，不會被後來的請求插隊）
+# - 統計目前執行數、佇列深度、等待時間，給 /metrics 使用
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Optional
+
+
+class AdmissionRejected(Exception):
+    """
+    status: 429（佇列已滿）或 503（排隊逾時）
+    retry_after: 建議 client 幾秒後重試
+    """
+
+    def __init__(self, status: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def concurrency_limit(configured: Optional[int], executor, fallback: int) -> int:
+    """
+    同時執行上限：有設定（QUERY_MAX_CONCURRENCY）就用設定值，
+    否則沿用 executor.config.max_concurrent_activities，再沒有就用 fallback。
+    """
+    executor_limit = getattr(getattr(executor, "config", None), "max_concurrent_activities", None)
+    return configured or executor_limit or fallback
+
+
+class AdmissionController:
+    """
+    limit: 最多同時執行幾個請求
+    max_queue: 最多排隊幾個請求（0 代表不排隊，滿了就拒絕）
+    queue_timeout: 排隊最多等幾秒
+    """
+
+    def __init__(self, limit: int, max_queue: int = 32, queue_timeout: float = 30):
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # 近期處理時間（EWMA），用來估算 Retry-After
+        self._service_ewma: Optional[float] = None
+        self._waits: Deque[float] = deque(maxlen=1024)
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def admit(self):
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    async def acquire(self) -> None:
+        """取得執行名額；無法取得時丟出 AdmissionRejected。成功後必須呼叫 release()。"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            self._waits.append(0.0)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_full += 1
+            raise AdmissionRejected(429, self.retry_after(), "目前查詢人數過多，請稍後再試")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        enqueued = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except BaseException as e:
+            handed = waiter.done() and not waiter.cancelled()
+            if handed and isinstance(e, asyncio.TimeoutError):
+                # 名額剛好在逾時的同時交過來，照常執行
+                pass
+            elif handed:
+                # 請求已取消（client 斷線），名額還給下一位
+                self._handoff()
+                raise
+            else:
+                waiter.cancel()
+                self._remove(waiter)
+                if isinstance(e, asyncio.TimeoutError):
+                    self.rejected_timeout += 1
+                    raise AdmissionRejected(503, self.retry_after(), "排隊等候逾時，請稍後再試") from None
+                raise
+        # release() 交棒時已把 active 留給這個請求
+        self.admitted += 1
+        self._waits.append(time.monotonic() - enqueued)
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        if service_time is not None:
+            self._service_ewma = (
+                service_time if self._service_ewma is None
+                else 0.8 * self._service_ewma + 0.2 * service_time
+            )
+        self._handoff()
+
+    def _handoff(self) -> None:
+        # 名額直接交給下一個仍在等的請求；沒人等才真的釋放
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _remove(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def retry_after(self) -> int:
+        """估算排到的時間：(佇列長度 + 1) 批 × 平均處理時間。"""
+        service = self._service_ewma or 1.0
+        batches = (len(self._waiters) + 1) / self.limit
+        return max(1, math.ceil(service * batches))
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+
+        def pct(p: float) -> Optional[float]:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 1)
+
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queue_depth": len(self._waiters),
+            "max_queue": self.max_queue,
+            "max_queue_depth_seen": self.max_queue_depth,
+            "queue_timeout_seconds": self.queue_timeout,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected_queue_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+            "wait_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+            "avg_service_seconds": round(self._service_ewma, 3) if self._service_ewma is not None else None,
+        }
@@ -0,0 +1,56 @@
+# job-guardian/agent_log.py
+# agent 狀態記錄：固定大小的 ring buffer，給 /logs 與 telemetry iframe 輪詢使用。
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from itertools import islice
+
+
+class AgentLog:
+    """
+    固定大小的 agent 狀態記錄（ring buffer）：append O(1)，超過 max_entries 自動丟掉最舊的。
+    每筆記錄有遞增的序號，client 可用 since(seq) 只取新增的部分。
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self._entries: deque = deque(maxlen=max(1, max_entries))  # (seq, ts, message)
+        self.last_seq = 0
+
+    def append(self, message: str) -> int:
+        self.last_seq += 1
+        self._entries.append((self.last_seq, time.time(), message))
+        return self.last_seq
+
+    @property
+    def first_seq(self) -> int:
+        return self._entries[0][0] if self._entries else self.last_seq + 1
+
+    def tail(self, n: int) -> list:
+        return list(islice(reversed(self._entries), max(0, n)))[::-1]
+
+    def since(self, seq: int, limit: int = 200) -> list:
+        """序號大於 seq 的記錄（由舊到新，最多 limit 筆）。"""
+        start = max(0, seq + 1 - self.first_seq)
+        return list(islice(self._entries, start, start + max(0, limit)))
+
+    def page(self, since: int, limit: int = 200) -> dict:
+        """
+        /logs?since= 的回應：序號大於 since 的記錄。
+        dropped 表示中間有記錄已被淘汰；reset 表示 since 比最新序號還大（server 重啟過），改從頭回傳。
+        """
+        reset = since > self.last_seq
+        if reset:
+            since = 0
+        entries = self.since(since, limit)
+        return {
+            "entries": [{"seq": seq, "ts": ts, "message": message} for seq, ts, message in entries],
+            "next": entries[-1][0] if entries else max(since, self.last_seq),
+            "last_seq": self.last_seq,
+            "dropped": since + 1 < self.first_seq,
+            "reset": reset,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
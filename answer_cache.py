@@ -0,0 +1,247 @@
+# job-guardian/answer_cache.py
+# 語意答案快取：同一個問題換個說法（「台積電有沒有違反勞基法」「請問台積電是否違反勞基法」）
+# 直接回傳上次的答案，不必再跑一次 Gemini + 工具呼叫。
+# - 查詢先正規化（NFKC、台/臺、大小寫、去標點空白），完全相同就直接命中
+# - 否則以本機 embedding 找最相近的舊問題，相似度達門檻且「只差在整個語助詞/問句用語」才算命中
+#   （避免「台積電」與「聯電」這種只差公司名稱的問題被當成同一題）
+# - 每筆答案記錄當時的資料集版本；版本變動後舊答案作廢
+
+from __future__ import annotations
+
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mcp_agent.workflows.embedding.embedding_base import EmbeddingModel
+
+VARIANT_CHARS = str.maketrans({"臺": "台", "妳": "你", "么": "麼"})
+PUNCT_PAT = re.compile(r"[\s\W_]+", re.UNICODE)
+
+# 兩個問題之間允許不同的詞：問句用語、語助詞（公司名稱、法規名稱不在此列）
+# 以整個詞比對；「有」「的」「是」這類單字常出現在公司名稱裡（大有公司 / 大公司），不單獨列入
+FILLER_WORDS = (
+    "請問", "請", "想知道", "想問", "查詢", "查一下", "看看", "幫我", "告訴我", "一下",
+    "是否有", "是否", "有沒有", "有無", "是不是",
+    "什麼", "怎樣", "怎麼樣", "如何", "目前", "現在", "最近",
+    "了嗎", "嗎", "呢", "吧", "啊", "呀",
+)
+# 長的詞優先，「有沒有」不會被拆成別的詞
+FILLER_PAT = re.compile("|".join(sorted(map(re.escape, FILLER_WORDS), key=len, reverse=True)))
+
+
+def normalize_query(query: str) -> str:
+    s = unicodedata.normalize("NFKC", query).lower().translate(VARIANT_CHARS)
+    return PUNCT_PAT.sub("", s)
+
+
+def strip_filler(query: str) -> str:
+    """去掉正規化後問題中的 FILLER_WORDS，剩下的就是問題的實際內容。"""
+    return FILLER_PAT.sub("", query)
+
+
+def only_filler_differs(a: str, b: str) -> bool:
+    """兩個正規化後的問題是否只差在 FILLER_WORDS 裡的詞。"""
+    return strip_filler(a) == strip_filler(b)
+
+
+Versions = Tuple[Tuple[str, Optional[str]], ...]
+
+
+@dataclass
+class _Entry:
+    key: str
+    answer: str
+    versions: Versions
+    elapsed: float
+    stored_at: float
+    hits: int = 0
+
+
+@dataclass
+class AnswerLookup:
+    """lookup 的結果；未命中時把 lookup 物件交回 store，避免同一個問題算兩次 embedding。"""
+
+    key: str
+    versions: Versions
+    vector: Optional[np.ndarray] = None
+    answer: Optional[str] = None
+    similarity: float = 0.0
+    exact: bool = False
+
+    @property
+    def hit(self) -> bool:
+        return self.answer is not None
+
+
+class SemanticAnswerCache:
+    """
+    embedder: 本機 embedding 模型（EmbeddingModel）
+    threshold: 餘弦相似度門檻（字元 n-gram embedding 只反映字面相似，門檻不宜太高；正確性由 verify 把關）
+    max_entries: 最多保留幾筆答案（0 代表停用）；LRU 淘汰
+    ttl: 每筆答案最多保留秒數
+    verify: 相似度達門檻後的最終檢查 (新問題, 舊問題) -> bool
+    """
+
+    def __init__(
+        self,
+        embedder: EmbeddingModel,
+        threshold: float = 0.6,
+        max_entries: int = 512,
+        ttl: float = 3600,
+        verify: Callable[[str, str], bool] = only_filler_differs,
+    ):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.verify = verify
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # 向量索引：第 i 列對應 self._keys[i]；新增時 append，刪除時整份重建
+        self._keys: List[str] = []
+        self._matrix = np.zeros((0, embedder.embedding_dim), dtype=np.float32)
+        self._versions: Dict[str, Optional[str]] = {}
+
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.rejected = 0       # 相似度達門檻但 verify 不通過
+        self.evictions = 0
+        self.purges = 0
+        self.saved_seconds = 0.0
+        self.lookup_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------------- 版本 ----------------
+    def observe(self, versions: Dict[str, Optional[str]]) -> Versions:
+        """記錄目前的資料集版本；有資料集版本變動時清掉所有依賴舊版本的答案。"""
+        changed = any(self._versions.get(n) != v for n, v in versions.items())
+        self._versions.update(versions)
+        if changed:
+            current = tuple(sorted(self._versions.items()))
+            stale = [k for k, e in self._entries.items() if e.versions != current]
+            self._remove(stale)
+            self.purges += len(stale)
+        return tuple(sorted(self._versions.items()))
+
+    # ---------------- 查詢 ----------------
+    async def lookup(self, query: str, versions: Dict[str, Optional[str]]) -> AnswerLookup:
+        started = time.perf_counter()
+        current = self.observe(versions)
+        result = AnswerLookup(key=normalize_query(query), versions=current)
+        try:
+            if not self.enabled or not result.key:
+                return result
+
+            entry = self._entries.get(result.key)
+            if entry is not None and self._fresh(entry, current):
+                result.similarity, result.exact = 1.0, True
+                return self._hit(result, entry)
+
+            result.vector = (await self.embedder.embed([result.key]))[0]
+            if not self._keys:
+                return self._miss(result)
+            scores = self._matrix @ result.vector
+            for i in np.argsort(-scores)[:5].tolist():
+                score = float(scores[i])
+                if score < self.threshold:
+                    break
+                entry = self._entries[self._keys[i]]
+                if not self._fresh(entry, current):
+                    continue
+                if not self.verify(result.key, entry.key):
+                    self.rejected += 1
+                    continue
+                result.similarity = score
+                return self._hit(result, entry)
+            return self._miss(result)
+        finally:
+            self.lookup_seconds += time.perf_counter() - started
+
+    def _fresh(self, entry: _Entry, versions: Versions) -> bool:
+        return entry.versions == versions and time.time() - entry.stored_at < self.ttl
+
+    def _hit(self, result: AnswerLookup, entry: _Entry) -> AnswerLookup:
+        self._entries.move_to_end(entry.key)
+        entry.hits += 1
+        self.hits += 1
+        self.exact_hits += result.exact
+        self.saved_seconds += entry.elapsed
+        result.answer = entry.answer
+        return result
+
+    def _miss(self, result: AnswerLookup) -> AnswerLookup:
+        self.misses += 1
+        return result
+
+    async def store(self, lookup: AnswerLookup, answer: str, elapsed: float) -> None:
+        """記錄 LLM 產生的答案；lookup 之後資料集版本若已變動則不存（答案可能混用新舊資料）。"""
+        if not self.enabled or not lookup.key or not answer:
+            return
+        if lookup.versions != tuple(sorted(self._versions.items())):
+            return
+        if lookup.vector is None:
+            lookup.vector = (await self.embedder.embed([lookup.key]))[0]
+
+        if lookup.key in self._entries:
+            self._remove([lookup.key])
+        self._entries[lookup.key] = _Entry(
+            key=lookup.key,
+            answer=answer,
+            versions=lookup.versions,
+            elapsed=elapsed,
+            stored_at=time.time(),
+        )
+        self._keys.append(lookup.key)
+        self._matrix = np.vstack([self._matrix, lookup.vector[None, :].astype(np.float32)])
+
+        if len(self._entries) > self.max_entries:
+            oldest = list(self._entries)[: len(self._entries) - self.max_entries]
+            self._remove(oldest)
+            self.evictions += len(oldest)
+
+    def invalidate(self) -> int:
+        removed = len(self._entries)
+        self._remove(list(self._entries))
+        self.purges += removed
+        return removed
+
+    def _remove(self, keys: List[str]) -> None:
+        if not keys:
+            return
+        for k in keys:
+            self._entries.pop(k, None)
+        keep = [i for i, k in enumerate(self._keys) if k in self._entries]
+        self._keys = [self._keys[i] for i in keep]
+        self._matrix = self._matrix[keep]
+
+    # ---------------- 統計 ----------------
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "exact_hits": self.exact_hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "purges": self.purges,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "avg_lookup_ms": round(self.lookup_seconds * 1000 / lookups, 3) if lookups else None,
+            "dataset_versions": dict(self._versions),
+        }
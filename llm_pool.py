@@ -0,0 +1,144 @@
+# job-guardian/llm_pool.py
+# LLM worker pool：每個 worker 各自保有對話歷史，共用同一個 agent（MCPAggregator 連線）。
+# - 依 session id 分配 worker，同一個 session 依序處理，不同 session 可同時進行
+# - 沒有 session id 的請求使用無狀態 worker（用完即清空歷史）
+# - 閒置過久的 session 會被回收，pool 滿了就回收最久沒用的閒置 worker
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from mcp_agent.workflows.llm.augmented_llm_google import GoogleAugmentedLLM
+
+
+class _LLMWorker:
+    def __init__(self, llm, session_id: Optional[str]):
+        self.llm = llm
+        self.session_id = session_id
+        self.busy = False
+        self.last_used = time.monotonic()
+
+
+class LLMPool:
+    """
+    依 session id 分配 LLM worker；沒有 session id 的請求使用無狀態 worker（用完即清空歷史）。
+    - 同一個 session 的請求依序處理，不同 session/無狀態請求可同時進行
+    - 歷史只保留最近 max_history 則訊息
+    - 閒置超過 idle_ttl 的 session 會被回收；滿了就回收最久沒用的閒置 worker
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], GoogleAugmentedLLM],
+        max_size: int = 4,
+        idle_ttl: float = 900,
+        max_history: int = 20,
+    ):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.idle_ttl = idle_ttl
+        self.max_history = max_history
+        self._sessions: "OrderedDict[str, _LLMWorker]" = OrderedDict()
+        self._stateless: list[_LLMWorker] = []
+        self._size = 0
+        self._cond = asyncio.Condition()
+        self.created = 0
+        self.evicted = 0
+
+    @asynccontextmanager
+    async def acquire(self, session_id: Optional[str] = None):
+        worker = await self._checkout(session_id)
+        try:
+            yield worker.llm
+        finally:
+            await self._checkin(worker)
+
+    async def _checkout(self, session_id: Optional[str]) -> _LLMWorker:
+        async with self._cond:
+            while True:
+                self._evict_expired()
+                worker = self._sessions.get(session_id) if session_id else None
+                if worker is not None:
+                    if not worker.busy:
+                        self._sessions.move_to_end(session_id)
+                        break
+                elif not session_id and self._stateless:
+                    worker = self._stateless.pop()
+                    break
+                elif self._size < self.max_size or self._evict_one():
+                    worker = _LLMWorker(self.factory(), session_id)
+                    self._size += 1
+                    self.created += 1
+                    if session_id:
+                        self._sessions[session_id] = worker
+                    break
+                await self._cond.wait()
+            worker.busy = True
+            return worker
+
+    async def _checkin(self, worker: _LLMWorker) -> None:
+        async with self._cond:
+            worker.busy = False
+            worker.last_used = time.monotonic()
+            if worker.session_id is None:
+                worker.llm.history.clear()
+                self._stateless.append(worker)
+            else:
+                self._trim_history(worker.llm)
+            self._cond.notify_all()
+
+    def _trim_history(self, llm) -> None:
+        history = llm.history.get()
+        if len(history) <= self.max_history:
+            return
+        # 從使用者訊息開始保留，避免留下沒有對應 function_call 的 tool 回應
+        cut = len(history) - self.max_history
+        while cut < len(history) and getattr(history[cut], "role", None) != "user":
+            cut += 1
+        llm.history.set(history[cut:])
+
+    def _drop(self, worker: _LLMWorker) -> None:
+        if worker.session_id is None:
+            self._stateless.remove(worker)
+        else:
+            del self._sessions[worker.session_id]
+        self._size -= 1
+        self.evicted += 1
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for worker in [w for w in self._sessions.values() if not w.busy and now - w.last_used > self.idle_ttl]:
+            self._drop(worker)
+
+    def _evict_one(self) -> bool:
+        """騰出一個位置：優先丟掉閒置的無狀態 worker，其次是最久沒用的閒置 session。"""
+        if self._stateless:
+            self._drop(self._stateless[0])
+            return True
+        for worker in self._sessions.values():  # OrderedDict：最久沒用的在前
+            if not worker.busy:
+                self._drop(worker)
+                return True
+        return False
+
+    async def evict_idle(self) -> None:
+        async with self._cond:
+            self._evict_expired()
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        busy = sum(w.busy for w in self._sessions.values())
+        return {
+            "size": self._size,
+            "max_size": self.max_size,
+            "sessions": len(self._sessions),
+            "stateless_idle": len(self._stateless),
+            "busy_sessions": busy,
+            "created": self.created,
+            "evicted": self.evicted,
+        }
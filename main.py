@@ -174,13 +174,25 @@ from google.genai import types
 import aiofiles
 
 
+import json
+from typing import Callable, Optional
+
 from pydantic import BaseModel
 from mcp_agent.app import MCPApp
 from mcp_agent.config import get_settings, MCPSettings, MCPServerSettings
 from mcp_agent.agents.agent import Agent
+from mcp_agent.logging.logger import LoggingConfig
 from mcp_agent.workflows.llm.augmented_llm_google import GoogleAugmentedLLM
+from mcp_agent.workflows.embedding.embedding_hashing import HashingEmbeddingModel
+from mcp_agent.utils.single_flight import SingleFlight
 from telemetry.config import setup_telemetry
-from telemetry.tracing import trace_span
+from telemetry.tracing import latency_snapshot, trace_span
+from answer_cache import AnswerLookup, SemanticAnswerCache, normalize_query
+from admission import AdmissionController, AdmissionRejected, concurrency_limit
+from agent_log import AgentLog
+from llm_pool import LLMPool
+from telemetry.log_tail import read_since, tail_lines
+from telemetry.broadcaster import broadcaster
 
 # === Data Model ===
 class Essay(BaseModel):
@@ -202,10 +214,22 @@ settings = get_settings()
 # resolving the issue from loading the relative path in the YAML file.
 if not settings.mcp:
     settings.mcp = MCPSettings()
+# agent 只開放查詢類工具；invalidate_dataset_cache 會清掉所有人共用的快取，
+# 不能讓使用者的提問（或夾帶的指令）觸發
+AGENT_TOOLS = {
+    "esg_hr",
+    "labor_violations",
+    "ge_work_equality_violations",
+    "violation_summary",
+    "company_profile_batch",
+    "resolve_company",
+    "dataset_status",
+}
 settings.mcp.servers["job_guardian"] = MCPServerSettings(
     command="python",
     args=[os.path.join(BASE_DIR, "mcp_server", "server.py")],
     transport="stdio",
+    allowed_tools=AGENT_TOOLS,
 )
 
 # === FastAPI 初始化 ===
@@ -221,7 +245,35 @@ app.add_middleware(
 
 # === Agent 狀態 ===
 mcp_app = MCPApp(name="job_guardian_agent", settings=settings)
-agent_state = {"ready": False, "agent": None, "llm": None, "logs": []}
+AGENT_LOG_SIZE = int(os.getenv("AGENT_LOG_SIZE", "1000"))
+
+
+agent_state = {"ready": False, "agent": None, "pool": None, "admission": None, "logs": AgentLog(AGENT_LOG_SIZE)}
+
+# LLM worker pool：每個 worker 各自保有對話歷史，共用同一個 agent（MCPAggregator 連線）
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "4"))
+LLM_SESSION_IDLE_TTL = float(os.getenv("LLM_SESSION_IDLE_TTL", "900"))
+LLM_MAX_HISTORY = int(os.getenv("LLM_MAX_HISTORY", "20"))
+
+# 語意答案快取：換句話問同一個問題時直接回傳上次的答案（只用於無狀態請求）
+answer_cache = SemanticAnswerCache(
+    HashingEmbeddingModel(),
+    threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.6")),
+    max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+)
+# 資料集版本向 MCP server 查詢後保留幾秒（版本變動最晚在這段時間後反映到答案快取）
+DATASET_VERSION_TTL = float(os.getenv("DATASET_VERSION_TTL", "30"))
+_dataset_versions_cache = {"at": 0.0, "versions": {}}
+
+# 同時送進來的相同問題（正規化後）只跑一次 LLM，其餘請求等同一個結果
+query_flight: SingleFlight = SingleFlight()
+
+# 流量控制：同時執行的 LLM 查詢數上限（未設定時沿用 executor 的 max_concurrent_activities，
+# 再沒有就等於 LLM_POOL_SIZE）、排隊上限與排隊期限
+QUERY_MAX_CONCURRENCY = int(os.getenv("QUERY_MAX_CONCURRENCY", "0")) or None
+QUERY_MAX_QUEUE = int(os.getenv("QUERY_MAX_QUEUE", "32"))
+QUERY_QUEUE_TIMEOUT = float(os.getenv("QUERY_QUEUE_TIMEOUT", "30"))
 
 
 # === 啟動事件 ===
@@ -242,9 +294,13 @@ async def start_agent():
             instruction=(
                 "你是一個使用工具來回答問題的智慧助理。\n"
                 "可用的工具有：\n"
-                "1. esg_hr: 查詢公司的 ESG 人力發展資料（薪資、福利、女性主管比例）。\n"
-                "2. labor_violations: 查詢勞動部違反勞基法紀錄。\n"
-                "3. ge_work_equality_violations: 查詢違反性別工作平等法紀錄。\n\n"
+                "1. resolve_company: 把使用者輸入的公司名稱對應到資料集裡的標準名稱，名稱不確定時先用。\n"
+                "2. esg_hr: 查詢公司的 ESG 人力發展資料（薪資、福利、女性主管比例）。\n"
+                "3. labor_violations: 查詢勞動部違反勞基法紀錄。\n"
+                "4. ge_work_equality_violations: 查詢違反性別工作平等法紀錄。\n"
+                "5. violation_summary: 查詢公司違規的完整彙總（各年度件數、罰鍰總額、違反法條、最近日期）。\n"
+                "6. company_profile_batch: 一次查多家公司的 ESG 與違規彙總，比較多家雇主時使用。\n"
+                "7. dataset_status: 查詢各資料集的版本與更新時間。\n\n"
                 "你的任務是根據使用者的問題呼叫正確的工具。\n"
                 "當你收到工具回傳的結果後，你必須將該結果撰寫成一段通順的中文摘要來回答使用者。"
             ),
@@ -252,37 +308,63 @@ async def start_agent():
         )
 
         async with job_guardian_agent:
-            llm = await job_guardian_agent.attach_llm(GoogleAugmentedLLM)
+            # 所有 worker 共用同一個 agent，也就共用同一條到 job_guardian 的 MCP 連線
+            pool = LLMPool(
+                factory=lambda: GoogleAugmentedLLM(agent=job_guardian_agent),
+                max_size=LLM_POOL_SIZE,
+                idle_ttl=LLM_SESSION_IDLE_TTL,
+                max_history=LLM_MAX_HISTORY,
+            )
+            admission = AdmissionController(
+                limit=concurrency_limit(QUERY_MAX_CONCURRENCY, agent_app.context.executor, LLM_POOL_SIZE),
+                max_queue=QUERY_MAX_QUEUE,
+                queue_timeout=QUERY_QUEUE_TIMEOUT,
+            )
             agent_state.update({
                 "ready": True,
                 "agent": job_guardian_agent,
-                "llm": llm
+                "pool": pool,
+                "admission": admission,
             })
             agent_state["logs"].append("✅ Job Guardian agent initialized and ready.")
 
-            # 保持常駐
+            # 保持常駐；順便回收閒置的 session
             while True:
                 await asyncio.sleep(60)
+                await pool.evict_idle()
 
 
 # === API ===
 @app.get("/logs")
-async def logs():
-    """顯示 agent 狀態（給 telemetry iframe 用）"""
-    return PlainTextResponse("\n".join(agent_state["logs"][-50:]))
+async def logs(since: Optional[int] = None, limit: int = 50):
+    """
+    顯示 agent 狀態（給 telemetry iframe 用）。
+    - 不帶參數：純文字，最近 limit 筆；X-Log-Seq 標頭為目前最新序號
+    - since=<seq>：JSON，只回傳序號大於 seq 的記錄；dropped 表示中間有記錄已被 ring buffer 淘汰，
+      reset 表示 since 比目前最新序號還大（server 重啟過），改從頭回傳
+    """
+    log: AgentLog = agent_state["logs"]
+    limit = max(1, min(limit, AGENT_LOG_SIZE))
+    if since is None:
+        text = "\n".join(message for _, _, message in log.tail(limit))
+        return PlainTextResponse(text, headers={"X-Log-Seq": str(log.last_seq)})
 
+    return log.page(since, limit)
 
-@trace_span("receive_prompt")
+
+@trace_span("receive_prompt", capture_args=True)
 def receive_prompt(user_query: str):
     """Logs the received user query."""
     agent_state["logs"].append(f"🔍 Received query: {user_query}")
 
+def build_prompt(user_query: str) -> str:
+    return f"根據輸入內容「{user_query}」，請查詢對應的公司紀錄並回傳總結。"
+
+
 @trace_span("llm_tool_call_and_synthesis")
 async def execute_llm_generation(llm, user_query: str) -> str:
     """Calls the LLM to generate a response using tools."""
-    contents = await llm.generate(
-        message=f"根據輸入內容「{user_query}」，請查詢對應的公司紀錄並回傳總結。"
-    )
+    contents = await llm.generate(message=build_prompt(user_query))
 
     # Extract the text from the last content part
     if contents and contents[-1] and contents[-1].parts:
@@ -292,15 +374,60 @@ async def execute_llm_generation(llm, user_query: str) -> str:
     return "" # Return empty string if no text content found
 
 @trace_span("format_response")
-def format_response(query: str, result: str, elapsed: float):
+def format_response(
+    query: str,
+    result: str,
+    elapsed: float,
+    session_id: Optional[str] = None,
+    cached: Optional[AnswerLookup] = None,
+):
     """Formats the final successful response."""
-    msg = f"✅ 查詢完成 ({elapsed:.2f}s)：{query}"
+    source = "（快取）" if cached is not None and cached.hit else ""
+    msg = f"✅ 查詢完成{source} ({elapsed:.2f}s)：{query}"
     agent_state["logs"].append(msg)
-    return {
+    response = {
         "query": query,
         "result": result,
         "elapsed": elapsed,
+        "session_id": session_id,
+    }
+    if cached is not None and cached.hit:
+        response["cache"] = {"hit": True, "exact": cached.exact, "similarity": round(cached.similarity, 4)}
+    return response
+
+
+async def dataset_versions() -> dict:
+    """向 MCP server 的 dataset_status 取得各資料集版本；短時間內重複使用。"""
+    now = time.monotonic()
+    if now - _dataset_versions_cache["at"] < DATASET_VERSION_TTL:
+        return _dataset_versions_cache["versions"]
+
+    result = await agent_state["agent"].call_tool("dataset_status")
+    if result.isError:
+        raise RuntimeError(f"dataset_status 失敗: {result.content}")
+    status = result.structuredContent or json.loads(result.content[0].text)
+    versions = {
+        name: (info or {}).get("version")
+        for name, info in status.get("datasets", {}).items()
     }
+    _dataset_versions_cache.update({"at": now, "versions": versions})
+    return versions
+
+
+@trace_span("answer_cache_lookup")
+async def lookup_answer(user_query: str, session_id: Optional[str]) -> Optional[AnswerLookup]:
+    """
+    查詢答案快取；帶 session_id 的請求答案會受對話歷史影響，不使用快取（回傳 None）。
+    取不到資料集版本時也不使用快取，避免回傳舊資料的答案。
+    """
+    if session_id or not answer_cache.enabled:
+        return None
+    try:
+        versions = await dataset_versions()
+    except Exception as e:
+        agent_state["logs"].append(f"⚠️ 無法取得資料集版本，略過答案快取: {e}")
+        return None
+    return await answer_cache.lookup(user_query, versions)
 
 @app.post("/query")
 async def query(request: Request):
@@ -313,75 +440,205 @@ async def query(request: Request):
     if not user_query:
         return JSONResponse({"error": "請輸入查詢內容"}, status_code=400)
 
+    # 帶 session_id 的請求保留對話歷史；沒帶則使用無狀態 worker
+    session_id = data.get("session_id") or request.headers.get("X-Session-Id") or None
+
     receive_prompt(user_query)
 
-    llm = agent_state["llm"]
+    pool: LLMPool = agent_state["pool"]
+    admission: AdmissionController = agent_state["admission"]
     start = time.time()
 
     try:
-        # LLM 判斷應用的 tool 並查詢 + 總結
-        result = await execute_llm_generation(llm, user_query)
+        cached = await lookup_answer(user_query, session_id)
+        if cached is not None and cached.hit:
+            return format_response(user_query, cached.answer, time.time() - start, session_id, cached)
+
+        async def generate() -> str:
+            # 快取命中與合併的請求不佔名額，只有真的要跑 LLM 時才排隊
+            async with admission.admit(), pool.acquire(session_id) as llm:
+                # LLM 判斷應用的 tool 並查詢 + 總結
+                result = await execute_llm_generation(llm, user_query)
+            if cached is not None:
+                await answer_cache.store(cached, result, time.time() - start)
+            return result
+
+        if session_id:
+            # 有對話歷史的請求答案因人而異，不合併
+            result = await generate()
+        else:
+            result = await query_flight.do(normalize_query(user_query), generate)
 
         elapsed = time.time() - start
-        
-        response = format_response(user_query, result, elapsed)
+        response = format_response(user_query, result, elapsed, session_id)
         return response
 
+    except AdmissionRejected as e:
+        return _rejected_response(e)
     except Exception as e:
         err_msg = f"❌ 查詢失敗: {e}"
         agent_state["logs"].append(err_msg)
         return JSONResponse({"error": str(e)}, status_code=500)
 
 
+def _rejected_response(e: AdmissionRejected) -> JSONResponse:
+    agent_state["logs"].append(f"⏳ 查詢被拒（{e.status}）：{e.reason}")
+    return JSONResponse(
+        {"error": e.reason, "retry_after": e.retry_after},
+        status_code=e.status,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+class _ReleasingStreamingResponse(StreamingResponse):
+    """串流結束時一定呼叫 on_close（包含 client 在開始串流前就斷線、generator 沒跑到的情況）。"""
+
+    def __init__(self, *args, on_close: Callable[[], None], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/query/stream")
+async def query_stream(request: Request):
+    """
+    /query 的串流版（SSE）：立即回 start，之後依序送出
+    tool_call_start / tool_call_end（工具進度）、token（模型即時輸出的文字），最後是 done 或 error。
+    """
+    if not agent_state["ready"]:
+        return JSONResponse({"error": "Agent 尚未初始化完成"}, status_code=503)
+
+    data = await request.json()
+    user_query = data.get("query", "").strip()
+    if not user_query:
+        return JSONResponse({"error": "請輸入查詢內容"}, status_code=400)
+    session_id = data.get("session_id") or request.headers.get("X-Session-Id") or None
+
+    receive_prompt(user_query)
+    pool: LLMPool = agent_state["pool"]
+    admission: AdmissionController = agent_state["admission"]
+    start = time.time()
+
+    # 快取命中不佔名額；否則先取得名額再開始串流，額滿時才能回 429/503
+    cached = await lookup_answer(user_query, session_id)
+    if cached is None or not cached.hit:
+        try:
+            await admission.acquire()
+        except AdmissionRejected as e:
+            return _rejected_response(e)
+    admitted_at = time.time()
+
+    async def cached_stream():
+        yield _sse("start", {"query": user_query, "session_id": session_id})
+        yield _sse("token", {"type": "token", "text": cached.answer})
+        yield _sse("done", format_response(user_query, cached.answer, time.time() - start, session_id, cached))
+
+    async def event_stream():
+        yield _sse("start", {"query": user_query, "session_id": session_id})
+        try:
+            result = ""
+            async with pool.acquire(session_id) as llm:
+                async for event in llm.generate_stream(message=build_prompt(user_query)):
+                    if event["type"] == "done":
+                        result = event["text"]
+                    else:
+                        yield _sse(event["type"], event)
+            elapsed = time.time() - start
+            if cached is not None:
+                await answer_cache.store(cached, result, elapsed)
+            yield _sse("done", format_response(user_query, result, elapsed, session_id))
+        except Exception as e:
+            agent_state["logs"].append(f"❌ 查詢失敗: {e}")
+            yield _sse("error", {"error": str(e)})
+
+    # 關掉反向代理的緩衝，token 才會即時送到前端
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if cached is not None and cached.hit:
+        return StreamingResponse(cached_stream(), media_type="text/event-stream", headers=headers)
+    return _ReleasingStreamingResponse(
+        event_stream(),
+        on_close=lambda: admission.release(time.time() - admitted_at),
+        media_type="text/event-stream",
+        headers=headers,
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    """答案快取命中率/省下的時間、相同問題合併次數、排隊狀況、LLM worker pool 狀態、各 span 延遲分布、低於 log level 而略過的 agent log 數與 log 佇列狀況"""
+    pool: Optional[LLMPool] = agent_state["pool"]
+    admission: Optional[AdmissionController] = agent_state["admission"]
+    return {
+        "admission": admission.stats() if admission is not None else None,
+        "answer_cache": answer_cache.stats(),
+        "query_coalescing": query_flight.stats(),
+        "telemetry_stream": broadcaster.stats(),
+        "latency": latency_snapshot(),
+        "llm_pool": pool.stats() if pool is not None else None,
+        "suppressed_log_events": LoggingConfig.suppressed_events(),
+        "log_event_bus": LoggingConfig.event_bus_stats(),
+    }
+
+
 # === Telemetry API (Integrated from telemetry_server.py) ===
 LOG_FILE_PATH = os.path.join(os.path.dirname(__file__), "telemetry", "mcp-activity.log")
 
 @app.get("/telemetry/stream")
-async def stream_telemetry():
+async def stream_telemetry(request: Request, last_event_id: Optional[int] = None):
     """
-    Streams telemetry data using Server-Sent Events (SSE) by tailing the log file.
+    Streams telemetry data using Server-Sent Events (SSE).
+    所有連線共用同一個 broadcaster（由 MCPActivityExporter 直接餵資料），不再各自輪詢 log 檔；
+    重連時瀏覽器會帶 Last-Event-ID，從 ring buffer 補送中斷期間的事件。
     """
-    async def event_generator():
-        # Ensure the log file exists
-        if not os.path.exists(LOG_FILE_PATH):
-            with open(LOG_FILE_PATH, "w") as f:
-                f.write("") # Create an empty file
+    header_id = request.headers.get("Last-Event-ID")
+    if header_id and header_id.isdigit():
+        last_event_id = int(header_id)
 
-        async with aiofiles.open(LOG_FILE_PATH, mode="r") as f:
-            current_position = await f.tell()
-            while True:
-                await asyncio.sleep(0.1)  # Wait for new lines
-                # Check if the file has grown
-                new_size = os.path.getsize(LOG_FILE_PATH)
-                if new_size > current_position:
-                    await f.seek(current_position) # Seek to the last known position
-                    line = await f.readline()
-                    while line:
-                        yield f"data: {line.strip()}\n\n"
-                        current_position = await f.tell()
-                        line = await f.readline()
-                elif new_size < current_position: # File was truncated or reset
-                    await f.seek(0)
-                    current_position = 0
-
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    async def event_generator():
+        yield "retry: 3000\n\n"
+        async for event in broadcaster.subscribe(last_event_id, heartbeat=15):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            event_id, line = event
+            yield f"id: {event_id}\ndata: {line.strip()}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/telemetry/recent")
-async def get_recent_telemetry():
+async def get_recent_telemetry(lines: int = 50, offset: Optional[int] = None, max_bytes: int = 256 * 1024):
     """
     Returns the last few lines of the telemetry log file.
+    - lines: 最多回傳幾行（從檔尾往前讀，不讀整個檔案）
+    - offset: 從上次回傳的 offset 接續讀取新增的行（檔案輪替後自動從頭讀）
+    - max_bytes: 接續讀取時單次最多讀幾 bytes
     """
     if not os.path.exists(LOG_FILE_PATH):
         return {"data": "Log file not found"}
 
-    lines = []
-    async with aiofiles.open(LOG_FILE_PATH, mode="r") as f:
-        # Read last 50 lines for example
-        # This is a simplified approach, for very large files, more efficient tailing might be needed
-        content = await f.read()
-        lines = content.splitlines()[-50:]
+    lines = max(1, min(lines, 5000))
+    if offset is None:
+        tail, next_offset = await asyncio.to_thread(tail_lines, LOG_FILE_PATH, lines)
+        rotated = False
+    else:
+        tail, next_offset, rotated = await asyncio.to_thread(
+            read_since, LOG_FILE_PATH, max(0, offset), lines, max(1, max_bytes)
+        )
 
-    return {"data": "\n".join(lines)}
+    return {"data": "\n".join(tail), "offset": next_offset, "rotated": rotated}
 
 # Mount the static files at the end
 from fastapi.staticfiles import StaticFiles
@@ -565,7 +565,34 @@ class LoggerSettings(BaseModel):
     """How often to flush events in seconds"""
 
     max_queue_size: int = 2048
-    """Maximum queue size for event processing"""
+    """Maximum number of queued events per transport and per listener"""
+
+    queue_overflow: Literal["block", "drop_oldest", "drop_debug_first", "sample"] = (
+        "drop_debug_first"
+    )
+    """What to do when an event queue is full: wait for space, drop the oldest event, drop the least severe events first, or keep only a sample of new events"""
+
+    queue_sample_rate: float = 0.1
+    """Fraction of new events kept when an event queue is full and queue_overflow is 'sample'"""
+
+    # File transport settings
+    file_buffer_size: int = 64 * 1024
+    """Bytes to buffer in memory before the file transport writes them out"""
+
+    file_flush_interval: float = 1.0
+    """Maximum seconds a buffered log line waits before being written to the file"""
+
+    file_fsync: Literal["never", "flush", "close"] = "never"
+    """When to fsync the log file: never, after every flush, or only when the transport is closed"""
+
+    file_max_bytes: int = 0
+    """Rotate the log file once it reaches this many bytes (0 disables size-based rotation)"""
+
+    file_rotate_interval: float | None = None
+    """Rotate the log file after this many seconds (None disables time-based rotation)"""
+
+    file_backup_count: int = 5
+    """Number of rotated log files to keep"""
 
     # HTTP transport settings
     http_endpoint: str | None = None
@@ -138,6 +138,9 @@ async def configure_logger(
         transport=transport,
         batch_size=config.logger.batch_size,
         flush_interval=config.logger.flush_interval,
+        max_queue_size=config.logger.max_queue_size,
+        queue_overflow=config.logger.queue_overflow,
+        queue_sample_rate=config.logger.queue_sample_rate,
         progress_display=config.logger.progress_display,
         token_counter=token_counter,
     )
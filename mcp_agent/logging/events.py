@@ -19,6 +19,13 @@ from pydantic import BaseModel, ConfigDict, Field
 EventType = Literal["debug", "info", "warning", "error", "progress"]
 """Broad categories for events (severity or role)."""
 
+_LEVELS: Dict[str, int] = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
 
 class EventContext(BaseModel):
     """
@@ -79,33 +86,35 @@ class EventFilter(BaseModel):
         """
         Check if an event matches this EventFilter criteria.
         """
+        return self.accepts(event.type, event.namespace, event.name)
+
+    def accepts(
+        self, event_type: EventType, namespace: str, name: str | None = None
+    ) -> bool:
+        """
+        Check the filter criteria without building an Event, so callers can skip
+        creating events nobody will receive.
+        """
         # 1) Filter by broad event type
         if self.types:
-            if event.type not in self.types:
+            if event_type not in self.types:
                 return False
 
         # 2) Filter by custom event name
         if self.names:
-            if not event.name or event.name not in self.names:
+            if not name or name not in self.names:
                 return False
 
         # 3) Filter by namespace prefix
         if self.namespaces and not any(
-            event.namespace.startswith(ns) for ns in self.namespaces
+            namespace.startswith(ns) for ns in self.namespaces
         ):
             return False
 
         # 4) Minimum severity
         if self.min_level:
-            level_map: Dict[EventType, int] = {
-                "debug": logging.DEBUG,
-                "info": logging.INFO,
-                "warning": logging.WARNING,
-                "error": logging.ERROR,
-            }
-
-            min_val = level_map.get(self.min_level, logging.DEBUG)
-            event_val = level_map.get(event.type, logging.DEBUG)
+            min_val = _LEVELS.get(self.min_level, logging.DEBUG)
+            event_val = _LEVELS.get(event_type, logging.DEBUG)
             if event_val < min_val:
                 return False
 
@@ -1,6 +1,7 @@
 import os
-import warnings
-from typing import Any, Dict, Iterable, Set
+import re
+import json
+from typing import Any, Callable, Dict, Iterable, Mapping, Set
 from datetime import datetime, date
 from decimal import Decimal
 from pathlib import Path
@@ -12,14 +13,37 @@ import httpx
 
 from mcp_agent.logging import logger
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class _Budget:
+    """Per-call serialization state: output size left and the containers on the current path."""
+
+    __slots__ = ("remaining", "path")
+
+    def __init__(self, max_bytes: int):
+        self.remaining = max_bytes
+        self.path: Set[int] = set()
+
 
 class JSONSerializer:
     """
     A robust JSON serializer that handles various Python objects by attempting
     different serialization strategies recursively.
+
+    The strategy for each type is resolved once and cached. Output is bounded by
+    depth, items per container, string length and an approximate total size in
+    bytes; anything cut off is replaced with a "<... truncated>" style marker, so
+    logging a huge object (e.g. a full LLM request) costs at most about max_bytes.
     """
 
-    MAX_DEPTH = 99  # Maximum recursion depth
+    MAX_DEPTH = 20  # Maximum nesting depth
+    MAX_ITEMS = 200  # Maximum items serialized per list/dict
+    MAX_STRING_LENGTH = 8192  # Maximum characters per string
+    MAX_BYTES = 256 * 1024  # Approximate maximum UTF-8 size of the whole output
 
     # Fields that are likely to contain sensitive information
     SENSITIVE_FIELDS = {
@@ -33,11 +57,32 @@ class JSONSerializer:
         "refresh_token",
     }
 
-    def __init__(self):
-        # Set of already processed objects to prevent infinite recursion
-        self._processed_objects: Set[int] = set()
+    # Strategy per type, shared by all instances
+    _dispatch: Dict[type, Callable[..., Any]] = {}
+
+    def __init__(
+        self,
+        max_depth: int | None = None,
+        max_items: int | None = None,
+        max_string_length: int | None = None,
+        max_bytes: int | None = None,
+        use_orjson: bool | None = None,
+    ):
+        self.max_depth = self.MAX_DEPTH if max_depth is None else max_depth
+        self.max_items = self.MAX_ITEMS if max_items is None else max_items
+        self.max_string_length = (
+            self.MAX_STRING_LENGTH if max_string_length is None else max_string_length
+        )
+        self.max_bytes = self.MAX_BYTES if max_bytes is None else max_bytes
+        # orjson is used for dumps() when installed, unless disabled
+        self.use_orjson = orjson is not None and use_orjson is not False
         # Check if secrets should be logged in full
         self._log_secrets = os.getenv("LOG_SECRETS", "").upper() == "TRUE"
+        self._sensitive_pattern = re.compile(
+            "|".join(re.escape(field) for field in sorted(self.SENSITIVE_FIELDS)),
+            re.IGNORECASE,
+        )
+        self._sensitive_keys: Dict[str, bool] = {}
 
     def _redact_sensitive_value(self, value: str) -> str:
         """Redact sensitive values to show only first 10 chars."""
@@ -51,118 +96,255 @@ class JSONSerializer:
 
     def serialize(self, obj: Any) -> Any:
         """Main entry point for serialization."""
-        # Reset processed objects for new serialization
-        self._processed_objects.clear()
-        return self._serialize_object(obj, depth=0)
+        return self._serialize_object(obj, 0, _Budget(self.max_bytes))
+
+    def dumps(self, obj: Any) -> str:
+        """Serialize obj and encode it as compact JSON."""
+        return self.encode(self.serialize(obj))
+
+    def encode(self, data: Any) -> str:
+        """Encode already serialized data as compact JSON (with orjson when available)."""
+        if self.use_orjson:
+            try:
+                return orjson.dumps(data).decode("utf-8")
+            except TypeError:
+                # e.g. integers wider than 64 bits
+                pass
+        # Same output as orjson: compact and UTF-8 rather than \u escapes
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
 
     def _is_sensitive_key(self, key: str) -> bool:
         """Check if a key likely contains sensitive information."""
-        key = str(key).lower()
-        return any(sensitive in key for sensitive in self.SENSITIVE_FIELDS)
-
-    def _serialize_object(self, obj: Any, depth: int = 0) -> Any:
-        """Recursively serialize an object using various strategies."""
-        # Handle None
-        if obj is None:
-            return None
-
-        if depth == 0:
-            self._parent_obj = obj
-        # Check depth
-        if depth > self.MAX_DEPTH:
-            warnings.warn(
-                f"Maximum recursion depth ({self.MAX_DEPTH}) exceeded while serializing object of type {type(obj).__name__} parent: {type(self._parent_obj).__name__}"
+        hit = self._sensitive_keys.get(key)
+        if hit is None:
+            if len(self._sensitive_keys) >= 4096:
+                self._sensitive_keys.clear()
+            hit = self._sensitive_keys[key] = (
+                self._sensitive_pattern.search(key) is not None
             )
-            return str(obj)
-
-        # Prevent infinite recursion
-        obj_id = id(obj)
-        if obj_id in self._processed_objects:
-            return str(obj)
-        self._processed_objects.add(obj_id)
+        return hit
 
-        # Try different serialization strategies in order
+    def _serialize_object(self, obj: Any, depth: int, budget: _Budget) -> Any:
+        """Serialize an object with the cached strategy for its type."""
+        cls = type(obj)
+        handler = self._dispatch.get(cls)
+        if handler is None:
+            handler = self._dispatch[cls] = self._resolve(cls)
         try:
-            if isinstance(obj, httpx.Response):
-                return f"<httpx.Response [{obj.status_code}] {obj.url}>"
-
-            if isinstance(obj, logger.Logger):
-                return "<logging: logger>"
-
-            # Basic JSON-serializable types
-            if isinstance(obj, (str, int, float, bool)):
-                return obj
-
-            # Handle common built-in types
-            if isinstance(obj, (datetime, date)):
-                return obj.isoformat()
-            if isinstance(obj, (Decimal, UUID)):
-                return str(obj)
-            if isinstance(obj, Path):
-                return str(obj)
-            if isinstance(obj, Enum):
-                return obj.value
-
-            # Handle callables
-            if callable(obj):
-                return f"<callable: {obj.__name__}>"
-
-            # Handle Pydantic models
-            if hasattr(obj, "model_dump"):  # Pydantic v2
-                return self._serialize_object(obj.model_dump())
-            if hasattr(obj, "dict"):  # Pydantic v1
-                return self._serialize_object(obj.dict())
-
-            # Handle dataclasses
-            if dataclasses.is_dataclass(obj):
-                return self._serialize_object(dataclasses.asdict(obj))
-
-            # Handle objects with custom serialization method
-            if hasattr(obj, "to_json"):
-                return self._serialize_object(obj.to_json())
-            if hasattr(obj, "to_dict"):
-                return self._serialize_object(obj.to_dict())
-
-            # Handle dictionaries with sensitive data redaction
-            if isinstance(obj, Dict):
-                safe_dict: Dict[str, Any] = {}
-                for key, value in obj.items():
-                    skey = str(key)
-                    if self._is_sensitive_key(skey):
-                        # Redact strings; for non-strings, avoid leaking complex objects
-                        safe_dict[skey] = (
-                            self._redact_sensitive_value(value)
-                            if isinstance(value, str)
-                            else "<redacted>"
-                        )
-                    else:
-                        safe_dict[skey] = self._serialize_object(value, depth + 1)
-                return safe_dict
-
-            # Handle iterables (lists, tuples, sets)
-            if isinstance(obj, Iterable) and not isinstance(obj, (str, bytes)):
-                return [self._serialize_object(item, depth + 1) for item in obj]
-
-            # Handle objects with __dict__
-            if hasattr(obj, "__dict__"):
-                return self._serialize_object(obj.__dict__, depth + 1)
-
-            # Handle objects with attributes
-            if inspect.getmembers(obj):
-                return {
-                    name: self._redact_sensitive_value(value)
-                    if self._is_sensitive_key(name)
-                    else self._serialize_object(value, depth + 1)
-                    for name, value in inspect.getmembers(obj)
-                    if not name.startswith("_") and not inspect.ismethod(value)
-                }
-
-            # Fallback: convert to string
-            return str(obj)
-
+            return handler(self, obj, depth, budget)
         except Exception as e:
             # If all serialization attempts fail, return string representation
-            return f"<unserializable: {type(obj).__name__}, error: {str(e)}>"
+            return f"<unserializable: {cls.__name__}, error: {str(e)}>"
+
+    @classmethod
+    def _resolve(cls, obj_type: type) -> Callable[..., Any]:
+        """Pick the serialization strategy for a type, trying them in order."""
+        if obj_type is str:
+            return cls._serialize_str
+        if obj_type in (int, float, bool, type(None)):
+            return cls._serialize_scalar
+        if issubclass(obj_type, httpx.Response):
+            return cls._serialize_httpx_response
+        if issubclass(obj_type, logger.Logger):
+            return cls._serialize_logger
+
+        if issubclass(obj_type, Enum):
+            return cls._serialize_enum
+
+        # Subclasses of basic JSON-serializable types
+        if issubclass(obj_type, str):
+            return cls._serialize_str
+        if issubclass(obj_type, (int, float, bool)):
+            return cls._serialize_scalar
+
+        # Handle common built-in types
+        if issubclass(obj_type, (datetime, date)):
+            return cls._serialize_isoformat
+        if issubclass(obj_type, (Decimal, UUID, Path)):
+            return cls._serialize_as_str
+        if issubclass(obj_type, (bytes, bytearray, memoryview)):
+            return cls._serialize_bytes
+
+        # Handle callables (same test as callable(obj), made on the type)
+        if any("__call__" in vars(base) for base in obj_type.__mro__):
+            return cls._serialize_callable
+
+        # Handle Pydantic models
+        if hasattr(obj_type, "model_fields") and hasattr(obj_type, "model_dump"):
+            return cls._serialize_pydantic  # Pydantic v2
+        if hasattr(obj_type, "dict"):  # Pydantic v1
+            return cls._serialize_pydantic_v1
+
+        # Handle dataclasses
+        if dataclasses.is_dataclass(obj_type):
+            return cls._serialize_dataclass
+
+        # Handle objects with custom serialization method
+        if hasattr(obj_type, "to_json"):
+            return cls._serialize_to_json
+        if hasattr(obj_type, "to_dict"):
+            return cls._serialize_to_dict
+
+        # Handle dictionaries with sensitive data redaction
+        if issubclass(obj_type, Mapping):
+            return cls._serialize_mapping
+
+        # Handle iterables (lists, tuples, sets)
+        if issubclass(obj_type, Iterable):
+            return cls._serialize_iterable
+
+        return cls._serialize_generic
+
+    # --- Strategies ---------------------------------------------------------
+
+    def _serialize_scalar(self, obj, depth, budget):
+        budget.remaining -= 8
+        return obj
+
+    def _serialize_str(self, obj, depth, budget):
+        if not obj:
+            return obj
+        size = len(obj) if obj.isascii() else len(obj.encode("utf-8", "replace"))
+        if len(obj) <= self.max_string_length and size <= budget.remaining:
+            budget.remaining -= size + 2
+            return obj
+        # Keep as many characters as fit, assuming the average UTF-8 width
+        width = size / len(obj)
+        limit = min(self.max_string_length, int(max(budget.remaining, 0) / width))
+        budget.remaining -= int(limit * width) + 2
+        return f"{obj[:limit]}...<{len(obj) - limit} more chars>"
+
+    def _serialize_httpx_response(self, obj, depth, budget):
+        return self._serialize_str(
+            f"<httpx.Response [{obj.status_code}] {obj.url}>", depth, budget
+        )
+
+    def _serialize_logger(self, obj, depth, budget):
+        return "<logging: logger>"
+
+    def _serialize_isoformat(self, obj, depth, budget):
+        return self._serialize_str(obj.isoformat(), depth, budget)
+
+    def _serialize_as_str(self, obj, depth, budget):
+        return self._serialize_str(str(obj), depth, budget)
+
+    def _serialize_enum(self, obj, depth, budget):
+        return self._serialize_object(obj.value, depth, budget)
+
+    def _serialize_bytes(self, obj, depth, budget):
+        return f"<bytes: {len(obj)}>"
+
+    def _serialize_callable(self, obj, depth, budget):
+        name = getattr(obj, "__name__", type(obj).__name__)
+        return f"<callable: {name}>"
+
+    def _serialize_pydantic(self, obj, depth, budget):
+        # Walk the fields instead of model_dump(), so a huge model is never copied in full
+        fields = [
+            name
+            for name, field in type(obj).model_fields.items()
+            if not field.exclude
+        ]
+        extra = getattr(obj, "__pydantic_extra__", None)
+        if extra:
+            fields.extend(extra)
+        return self._serialize_fields(obj, fields, depth, budget)
+
+    def _serialize_pydantic_v1(self, obj, depth, budget):
+        return self._serialize_object(obj.dict(), depth, budget)
+
+    def _serialize_dataclass(self, obj, depth, budget):
+        names = [field.name for field in dataclasses.fields(obj)]
+        return self._serialize_fields(obj, names, depth, budget)
+
+    def _serialize_to_json(self, obj, depth, budget):
+        return self._serialize_object(obj.to_json(), depth, budget)
+
+    def _serialize_to_dict(self, obj, depth, budget):
+        return self._serialize_object(obj.to_dict(), depth, budget)
+
+    def _serialize_mapping(self, obj, depth, budget):
+        return self._serialize_items(obj, obj.items(), len(obj), depth, budget)
+
+    def _serialize_iterable(self, obj, depth, budget):
+        marker = self._enter(obj, depth, budget)
+        if marker is not None:
+            return marker
+        try:
+            items = []
+            for index, item in enumerate(obj):
+                if index >= self.max_items or budget.remaining <= 0:
+                    items.append(self._more_marker(obj, index))
+                    break
+                items.append(self._serialize_object(item, depth + 1, budget))
+            return items
+        finally:
+            budget.path.discard(id(obj))
+
+    def _serialize_generic(self, obj, depth, budget):
+        # Handle objects with __dict__
+        if hasattr(obj, "__dict__"):
+            return self._serialize_object(vars(obj), depth + 1, budget)
+
+        # Handle objects with attributes
+        members = [
+            (name, value)
+            for name, value in inspect.getmembers(obj)
+            if not name.startswith("_") and not inspect.ismethod(value)
+        ]
+        if members:
+            return self._serialize_items(obj, members, len(members), depth, budget)
+
+        # Fallback: convert to string
+        return self._serialize_str(str(obj), depth, budget)
+
+    # --- Helpers ------------------------------------------------------------
+
+    def _enter(self, obj, depth, budget) -> str | None:
+        """Start serializing a container; returns a marker instead if it must be cut off."""
+        if depth > self.max_depth:
+            return f"<max depth exceeded: {type(obj).__name__}>"
+        # Prevent infinite recursion (only containers on the current path count)
+        if id(obj) in budget.path:
+            return f"<circular reference: {type(obj).__name__}>"
+        budget.path.add(id(obj))
+        return None
+
+    @staticmethod
+    def _more_marker(obj, index: int) -> str:
+        try:
+            return f"<... {len(obj) - index} more items truncated>"
+        except TypeError:
+            return "<... more items truncated>"
+
+    def _serialize_fields(self, obj, names, depth, budget):
+        items = ((name, getattr(obj, name, None)) for name in names)
+        return self._serialize_items(obj, items, len(names), depth, budget)
+
+    def _serialize_items(self, obj, items, size: int, depth, budget):
+        marker = self._enter(obj, depth, budget)
+        if marker is not None:
+            return marker
+        try:
+            safe_dict: Dict[str, Any] = {}
+            for index, (key, value) in enumerate(items):
+                if index >= self.max_items or budget.remaining <= 0:
+                    safe_dict["<truncated>"] = f"{size - index} more keys"
+                    break
+                skey = key if type(key) is str else str(key)
+                budget.remaining -= len(skey) + 4
+                if self._is_sensitive_key(skey):
+                    # Redact strings; for non-strings, avoid leaking complex objects
+                    safe_dict[skey] = (
+                        self._redact_sensitive_value(value)
+                        if isinstance(value, str)
+                        else "<redacted>"
+                    )
+                else:
+                    safe_dict[skey] = self._serialize_object(value, depth + 1, budget)
+            return safe_dict
+        finally:
+            budget.path.discard(id(obj))
 
     def __call__(self, obj: Any) -> Any:
         """Make the serializer callable."""
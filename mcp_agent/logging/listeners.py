@@ -33,6 +33,12 @@ class EventListener(ABC):
     async def handle_event(self, event: Event):
         """Process an incoming event."""
 
+    def accepts(
+        self, event_type: EventType, namespace: str, name: str | None = None
+    ) -> bool:
+        """Whether this listener may act on such an event (checked before the event is built)."""
+        return True
+
 
 class LifecycleAwareListener(EventListener):
     """
@@ -67,6 +73,11 @@ class FilteredListener(LifecycleAwareListener):
         if not self.filter or self.filter.matches(event):
             await self.handle_matched_event(event)
 
+    def accepts(
+        self, event_type: EventType, namespace: str, name: str | None = None
+    ) -> bool:
+        return not self.filter or self.filter.accepts(event_type, namespace, name)
+
     async def handle_matched_event(self, event: Event):
         """Process an event that matches the filter."""
         pass
@@ -12,7 +12,8 @@ from datetime import timedelta
 import threading
 import time
 
-from typing import Any, Dict, Final
+from collections import Counter
+from typing import Any, Callable, Dict, Final
 
 from contextlib import asynccontextmanager, contextmanager
 
@@ -28,7 +29,7 @@ from mcp_agent.logging.listeners import (
     LoggingListener,
     ProgressListener,
 )
-from mcp_agent.logging.transport import AsyncEventBus, EventTransport
+from mcp_agent.logging.transport import AsyncEventBus, EventTransport, OverflowPolicy
 
 
 class Logger:
@@ -200,11 +201,30 @@ class Logger:
         self,
         etype: EventType,
         ename: str | None,
-        message: str,
+        message: str | Callable[[], str],
         context: EventContext | None,
-        data: dict,
+        data: dict | Callable[[], dict],
     ):
-        """Create and emit an event."""
+        """
+        Create and emit an event.
+
+        The level/namespace check runs first, so an event that no transport or
+        listener would receive costs no Event object or task. `message`, `data`,
+        or the value of a `data` keyword may be zero-argument callables; they are
+        only called when the event will be delivered, e.g.
+        `logger.debug("Request:", data=lambda: build_payload())`.
+        """
+        if not self.event_bus.accepts(etype, self.namespace, ename):
+            _suppressed_events[etype] += 1
+            return
+
+        if callable(message):
+            message = message()
+        if callable(data):
+            data = data()
+        elif data and callable(data.get("data")):
+            data = {**data, "data": data["data"]()}
+
         # Only create or modify context with session_id if we have one
         if self.session_id:
             # If no context was provided, create one with our session_id
@@ -260,7 +280,7 @@ class Logger:
 
     def debug(
         self,
-        message: str,
+        message: str | Callable[[], str],
         name: str | None = None,
         context: EventContext = None,
         **data,
@@ -378,6 +398,9 @@ class LoggingConfig:
         transport: EventTransport | None = None,
         batch_size: int = 100,
         flush_interval: float = 2.0,
+        max_queue_size: int | None = None,
+        queue_overflow: OverflowPolicy | None = None,
+        queue_sample_rate: float | None = None,
         **kwargs: Any,
     ):
         """
@@ -388,9 +411,17 @@ class LoggingConfig:
             transport: Transport for sending events to external systems
             batch_size: Default batch size for batching listener
             flush_interval: Default flush interval for batching listener
+            max_queue_size: Maximum queued events per transport/listener
+            queue_overflow: What to do when a queue is full (see AsyncEventBus)
+            queue_sample_rate: Fraction of events kept under the "sample" policy
             **kwargs: Additional configuration options
         """
         bus = AsyncEventBus.get(transport=transport)
+        bus.configure_queues(
+            max_queue_size=max_queue_size,
+            overflow=queue_overflow,
+            sample_rate=queue_sample_rate,
+        )
         # Keep a reference to the provided filter so we can update at runtime
         if event_filter is not None:
             cls._event_filter_ref = event_filter
@@ -489,11 +520,22 @@ class LoggingConfig:
             "emergency": "error",
         }
         cls._event_filter_ref.min_level = mapping.get(normalized, "info")
+        AsyncEventBus.get().invalidate_filters()
 
     @classmethod
     def get_event_filter(cls) -> EventFilter | None:
         return cls._event_filter_ref
 
+    @classmethod
+    def suppressed_events(cls) -> Dict[str, int]:
+        """Number of events skipped because no transport or listener would receive them, by type."""
+        return dict(_suppressed_events)
+
+    @classmethod
+    def event_bus_stats(cls) -> Dict[str, Any]:
+        """Queue depth, drops and latency per transport/listener of the event bus."""
+        return AsyncEventBus.get().stats()
+
     @classmethod
     @asynccontextmanager
     async def managed(cls, **config_kwargs):
@@ -507,6 +549,8 @@ class LoggingConfig:
 
 _logger_lock = threading.Lock()
 _loggers: Dict[str, Logger] = {}
+# Events dropped by Logger.event() before construction, by event type
+_suppressed_events: Counter = Counter()
 _default_bound_context: Any | None = None
 
 
@@ -5,12 +5,29 @@ Transports for the Logger module for MCP Agent, including:
 """
 
 import asyncio
-import json
+import atexit
+import os
+import random
+import threading
+import time
 import uuid
+import weakref
 import datetime
 import sys
 from abc import ABC, abstractmethod
-from typing import Dict, List, Protocol
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Literal,
+    Protocol,
+)
 from pathlib import Path
 
 import aiohttp
@@ -20,7 +37,7 @@ from rich.text import Text
 
 from mcp_agent.config import LoggerSettings
 from mcp_agent.console import console
-from mcp_agent.logging.events import Event, EventFilter
+from mcp_agent.logging.events import Event, EventFilter, EventType
 from mcp_agent.logging.json_serializer import JSONSerializer
 from mcp_agent.logging.listeners import EventListener, LifecycleAwareListener
 from rich import print
@@ -54,6 +71,12 @@ class FilteredEventTransport(EventTransport, ABC):
         if not self.filter or self.filter.matches(event):
             await self.send_matched_event(event)
 
+    def accepts(
+        self, event_type: EventType, namespace: str, name: str | None = None
+    ) -> bool:
+        """Whether an event with these attributes would be sent."""
+        return not self.filter or self.filter.accepts(event_type, namespace, name)
+
     @abstractmethod
     async def send_matched_event(self, event: Event):
         """Send an event to the external system."""
@@ -66,6 +89,11 @@ class NoOpTransport(FilteredEventTransport):
         """Do nothing."""
         pass
 
+    def accepts(
+        self, event_type: EventType, namespace: str, name: str | None = None
+    ) -> bool:
+        return False
+
 
 class ConsoleTransport(FilteredEventTransport):
     """Simple transport that prints events to console."""
@@ -109,7 +137,15 @@ class ConsoleTransport(FilteredEventTransport):
 
 
 class FileTransport(FilteredEventTransport):
-    """Transport that writes events to a file with proper formatting."""
+    """
+    Transport that writes events to a file with proper formatting.
+
+    Writes are group-committed: formatted lines are buffered in memory and written
+    through one long-lived file handle when the buffer reaches ``buffer_size`` bytes,
+    ``flush_interval`` seconds after the first buffered line, and on close.
+    The file is rotated by size and/or age, keeping ``backup_count`` old files
+    (``app.jsonl.1``, ``app.jsonl.2``, ...).
+    """
 
     def __init__(
         self,
@@ -117,6 +153,12 @@ class FileTransport(FilteredEventTransport):
         event_filter: EventFilter | None = None,
         mode: str = "a",
         encoding: str = "utf-8",
+        buffer_size: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        fsync: Literal["never", "flush", "close"] = "never",
+        max_bytes: int = 0,
+        rotate_interval: float | None = None,
+        backup_count: int = 5,
     ):
         """Initialize FileTransport.
 
@@ -125,24 +167,49 @@ class FileTransport(FilteredEventTransport):
             event_filter: Optional filter for events
             mode: File open mode ('a' for append, 'w' for write)
             encoding: File encoding to use
+            buffer_size: Bytes to buffer before writing to the file
+            flush_interval: Maximum seconds a buffered line waits before being written
+            fsync: When to fsync: 'never', after every 'flush', or only on 'close'
+            max_bytes: Rotate once the file reaches this size (0 disables)
+            rotate_interval: Rotate once the file has been open this many seconds (None disables)
+            backup_count: Number of rotated files to keep
         """
         super().__init__(event_filter=event_filter)
         self.filepath = Path(filepath)
         self.mode = mode
         self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
         self._serializer = JSONSerializer()
 
         # Batching for efficient writes
         self._write_buffer: List[str] = []
-        self._buffer_lock = asyncio.Lock()
+        self._buffered_bytes = 0
         self._flush_task: asyncio.Task | None = None
         self._running = True
 
+        # File state, only touched from the writer thread (or at exit) under _io_lock
+        self._file: BinaryIO | None = None
+        self._file_size = 0
+        self._opened_at = 0.0
+        self._io_lock = threading.Lock()
+        # A single worker keeps batches in the order they were flushed
+        self._executor: ThreadPoolExecutor | None = None
+
+        self.events_written = 0
+        self.flushes = 0
+        self.rotations = 0
+
         # Create directory if it doesn't exist
         self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        _file_transports.add(self)
 
     async def send_matched_event(self, event: Event) -> None:
-        """Write matched event to log file asynchronously.
+        """Buffer matched event, writing the buffer out once it is full.
 
         Args:
             event: Event to write to file
@@ -164,34 +231,145 @@ class FileTransport(FilteredEventTransport):
             log_entry["data"] = self._serializer(event.data)
 
         # Prepare the log line
-        log_line = json.dumps(log_entry, separators=(",", ":")) + "\n"
+        log_line = self._serializer.encode(log_entry) + "\n"
 
-        # Use asyncio to run file I/O in executor to avoid blocking
-        try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,  # Use default executor
-                self._write_to_file,
-                log_line,
+        self._write_buffer.append(log_line)
+        self._buffered_bytes += len(log_line)
+        if self._buffered_bytes >= self.buffer_size:
+            await self.flush()
+        else:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        task = self._flush_task
+        loop = asyncio.get_running_loop()
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._flush_task = loop.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            if not self._write_buffer:
+                return
+
+    def _take_buffer(self) -> List[str]:
+        lines, self._write_buffer = self._write_buffer, []
+        self._buffered_bytes = 0
+        return lines
+
+    async def flush(self) -> None:
+        """Write all buffered lines to the file."""
+        if not self._write_buffer:
+            return
+        lines = self._take_buffer()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="mcp-agent-file-log"
             )
-        except IOError as e:
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._write_lines, lines)
+        except OSError as e:
             # Log error without recursion
             print(f"Error writing to log file {self.filepath}: {e}")
 
-    def _write_to_file(self, log_line: str) -> None:
-        """Synchronous file write helper for use in executor."""
-        with open(self.filepath, mode=self.mode, encoding=self.encoding) as f:
-            f.write(log_line)
-            f.flush()  # Ensure writing to disk
+    def _write_lines(self, lines: List[str]) -> None:
+        """Synchronous group-commit of a batch of lines."""
+        data = "".join(lines).encode(self.encoding)
+        with self._io_lock:
+            if self._file is None:
+                self._open()
+            if self._should_rotate(len(data)):
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync == "flush":
+                os.fsync(self._file.fileno())
+            self._file_size += len(data)
+            self.events_written += len(lines)
+            self.flushes += 1
+
+    def _open(self) -> None:
+        mode = self.mode if "b" in self.mode else self.mode + "b"
+        self._file = open(self.filepath, mode=mode, buffering=1024 * 1024)
+        # Only truncate on the first open; reopening after rotation or close appends
+        self.mode = "a"
+        self._file_size = self._file.seek(0, os.SEEK_END)
+        self._opened_at = time.monotonic()
+
+    def _should_rotate(self, incoming: int) -> bool:
+        if self._file_size == 0:
+            return False
+        if self.max_bytes > 0 and self._file_size + incoming > self.max_bytes:
+            return True
+        return (
+            self.rotate_interval is not None
+            and time.monotonic() - self._opened_at >= self.rotate_interval
+        )
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = self.filepath.with_name(f"{self.filepath.name}.{i}")
+                if src.exists():
+                    os.replace(src, self.filepath.with_name(f"{self.filepath.name}.{i + 1}"))
+            os.replace(self.filepath, self.filepath.with_name(f"{self.filepath.name}.1"))
+        else:
+            self.filepath.unlink(missing_ok=True)
+        self.rotations += 1
+        self._open()
+
+    def _close_file(self) -> None:
+        with self._io_lock:
+            if self._file is None:
+                return
+            self._file.flush()
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def _close_sync(self) -> None:
+        """Write what is left in the buffer and close the file (used at interpreter exit)."""
+        try:
+            if self._write_buffer:
+                self._write_lines(self._take_buffer())
+            self._close_file()
+        except Exception as e:
+            print(f"Error writing to log file {self.filepath}: {e}")
 
     async def close(self) -> None:
-        """Clean up resources if needed."""
-        pass  # File handles are automatically closed after each write
+        """Flush buffered lines and close the file handle."""
+        task, self._flush_task = self._flush_task, None
+        if task is not None and not task.done():
+            task.cancel()
+        await self.flush()
+        if self._executor is not None:
+            # Runs after any batch still queued on the writer thread
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._close_file)
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        else:
+            self._close_file()
 
     @property
     def is_closed(self) -> bool:
         """Check if transport is closed."""
-        return False  # Since we open/close per write
+        return self._file is None
+
+
+_file_transports: "weakref.WeakSet[FileTransport]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_file_transports() -> None:
+    # Don't lose buffered lines if the app exits without shutting down logging
+    for transport in list(_file_transports):
+        transport._close_sync()
 
 
 class HTTPTransport(FilteredEventTransport):
@@ -279,31 +457,287 @@ class HTTPTransport(FilteredEventTransport):
             self.batch.clear()
 
 
+OverflowPolicy = Literal["block", "drop_oldest", "drop_debug_first", "sample"]
+
+# Eviction order for "drop_debug_first" (lowest goes first)
+_SEVERITY: Dict[str, int] = {
+    "debug": 0,
+    "progress": 1,
+    "info": 1,
+    "warning": 2,
+    "error": 3,
+}
+
+
+class _EventQueue:
+    """
+    Bounded queue plus worker task for one consumer (a transport or a listener),
+    so a slow consumer only ever fills its own queue.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handle: Callable[[Event], Awaitable[Any]],
+        maxsize: int,
+        overflow: OverflowPolicy,
+        sample_rate: float,
+    ):
+        self.name = name
+        self.handle = handle
+        self.maxsize = max(1, maxsize)
+        self.overflow = overflow
+        self.sample_rate = sample_rate
+
+        self.events: Deque[Event] = deque()
+        self.task: asyncio.Task | None = None
+        self._ready: asyncio.Event | None = None
+        self._space: asyncio.Event | None = None
+        self._busy = False
+
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        self._latencies: Deque[float] = deque(maxlen=512)
+        self._total_latency = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    @property
+    def pending(self) -> int:
+        """Queued events plus the one being handled."""
+        return len(self.events) + self._busy
+
+    def start(self) -> None:
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        if self.events:
+            self._ready.set()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await asyncio.wait_for(self.task, timeout=5.0)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                pass
+            except Exception as e:
+                print(f"Error stopping {self.name}: {e}")
+        self.task = None
+
+    def offer(self, event: Event) -> None:
+        """Enqueue without waiting, applying the overflow policy if the queue is full."""
+        if len(self.events) >= self.maxsize:
+            self.dropped += 1
+            if not self._make_room(event):
+                return
+        self._append(event)
+
+    async def put(self, event: Event) -> None:
+        """
+        Enqueue, waiting for space under the "block" policy.
+        A consumer that emits from its own handler cannot wait for its own queue to
+        drain, so in that case the event is offered (dropping the oldest) instead.
+        """
+        if (
+            self.overflow != "block"
+            or not self.running
+            or asyncio.current_task() is self.task
+        ):
+            self.offer(event)
+            return
+        while len(self.events) >= self.maxsize:
+            self._space.clear()
+            await self._space.wait()
+        self._append(event)
+
+    def _append(self, event: Event) -> None:
+        self.events.append(event)
+        if len(self.events) > self.max_depth:
+            self.max_depth = len(self.events)
+        if self._ready is not None:
+            self._ready.set()
+
+    def _make_room(self, event: Event) -> bool:
+        """Evict a queued event for the incoming one; False means drop the incoming event."""
+        policy = self.overflow
+        if policy == "sample":
+            if random.random() >= self.sample_rate:
+                return False
+        elif policy == "drop_debug_first":
+            # Evict the oldest queued event of the lowest severity, as long as it is
+            # not more severe than the incoming one; otherwise drop the incoming event.
+            rank = _SEVERITY.get(event.type, 1)
+            victim, victim_rank = None, rank + 1
+            for i, queued in enumerate(self.events):
+                queued_rank = _SEVERITY.get(queued.type, 1)
+                if queued_rank < victim_rank:
+                    victim, victim_rank = i, queued_rank
+                    if queued_rank == 0:
+                        break
+            if victim is None:
+                return False
+            del self.events[victim]
+            return True
+        # "drop_oldest", and "block" when waiting is not possible
+        self.events.popleft()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            while not self.events:
+                self._ready.clear()
+                await self._ready.wait()
+            event = self.events.popleft()
+            self._space.set()
+            self._busy = True
+            started = time.perf_counter()
+            try:
+                await self.handle(event)
+            except Exception as e:
+                self.errors += 1
+                print(f"Error in {self.name}: {e}")
+                print(
+                    f"Stacktrace: {''.join(traceback.format_exception(type(e), e, e.__traceback__))}"
+                )
+            finally:
+                elapsed = time.perf_counter() - started
+                self._busy = False
+                self.processed += 1
+                self._latencies.append(elapsed)
+                self._total_latency += elapsed
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+
+        def ms(value: float | None) -> float | None:
+            return round(value * 1000, 3) if value is not None else None
+
+        return {
+            "depth": len(self.events),
+            "max_depth": self.max_depth,
+            "max_size": self.maxsize,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "latency_ms": {
+                "avg": ms(self._total_latency / self.processed)
+                if self.processed
+                else None,
+                "p50": ms(latencies[len(latencies) // 2]) if latencies else None,
+                "p95": ms(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))])
+                if latencies
+                else None,
+                "max": ms(latencies[-1]) if latencies else None,
+            },
+        }
+
+
 class AsyncEventBus:
     """
     Async event bus with local in-process listeners + optional remote transport.
     Also injects distributed tracing (trace_id, span_id) if there's a current span.
+
+    The transport (each transport of a MultiTransport) and every listener get their
+    own bounded queue and worker task, so one slow consumer cannot stall the others
+    or grow memory without limit. When a queue is full, `overflow` decides:
+    - "block": emit() waits until the queue has space (backpressure). A listener
+      emitting into its own full queue would wait on itself, so that queue drops its
+      oldest event instead; listeners that emit into each other's queues can still
+      wait on one another and should not be combined with "block".
+    - "drop_oldest": the oldest queued event is dropped
+    - "drop_debug_first": the oldest queued event of the lowest severity is dropped,
+      provided it is not more severe than the incoming event; otherwise the incoming
+      event is dropped itself
+    - "sample": only `sample_rate` of the incoming events are kept, each replacing the oldest
     """
 
     _instance = None
 
-    def __init__(self, transport: EventTransport | None = None):
+    def __init__(
+        self,
+        transport: EventTransport | None = None,
+        max_queue_size: int = 2048,
+        overflow: OverflowPolicy = "drop_debug_first",
+        sample_rate: float = 0.1,
+    ):
         self.transport: EventTransport = transport or NoOpTransport()
         self.listeners: Dict[str, EventListener] = {}
-        self._task: asyncio.Task | None = None
+        self.max_queue_size = max_queue_size
+        self.overflow: OverflowPolicy = overflow
+        self.sample_rate = sample_rate
+        self._queues: Dict[str, _EventQueue] = {}
         self._running = False
+        self.emitted = 0
+        # accepts() results by (type, namespace, name); cleared when filters change
+        self._accepts_cache: Dict[tuple, bool] = {}
 
-    def init_queue(self):
-        if self._running:
-            return
-        self._queue = asyncio.Queue()
-        self._stop_event = asyncio.Event()
-        # Store the loop we're created on
-        try:
-            self._loop = asyncio.get_running_loop()
-        except RuntimeError:
-            self._loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self._loop)
+    def configure_queues(
+        self,
+        max_queue_size: int | None = None,
+        overflow: OverflowPolicy | None = None,
+        sample_rate: float | None = None,
+    ) -> None:
+        """Update queue bounds and overflow policy, including for existing queues."""
+        if max_queue_size is not None:
+            self.max_queue_size = max_queue_size
+        if overflow is not None:
+            self.overflow = overflow
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        for queue in self._queues.values():
+            queue.maxsize = max(1, self.max_queue_size)
+            queue.overflow = self.overflow
+            queue.sample_rate = self.sample_rate
+
+    def _consumers(self) -> Dict[str, Callable[[Event], Awaitable[Any]]]:
+        consumers: Dict[str, Callable[[Event], Awaitable[Any]]] = {}
+        transports = (
+            self.transport.transports
+            if isinstance(self.transport, MultiTransport)
+            else [self.transport]
+        )
+        for transport in transports:
+            if isinstance(transport, NoOpTransport):
+                continue
+            name = f"transport:{transport.__class__.__name__}"
+            if name in consumers:
+                name = f"{name}#{len(consumers)}"
+            consumers[name] = transport.send_event
+        for name, listener in self.listeners.items():
+            consumers[f"listener:{name}"] = listener.handle_event
+        return consumers
+
+    def _sync_queues(self) -> None:
+        """Create or drop queues to match the current transport and listeners."""
+        consumers = self._consumers()
+        for name, queue in list(self._queues.items()):
+            if consumers.get(name) != queue.handle:
+                del self._queues[name]
+                if queue.task is not None and not queue.task.done():
+                    queue.task.cancel()
+        for name, handle in consumers.items():
+            if name not in self._queues:
+                queue = _EventQueue(
+                    name, handle, self.max_queue_size, self.overflow, self.sample_rate
+                )
+                self._queues[name] = queue
+                if self._running:
+                    queue.start()
+
+    def _ensure_running(self) -> None:
+        # Auto-start the workers on first use; requires a running loop
+        if not self._running:
+            self._running = True
+            self._sync_queues()
+        for queue in self._queues.values():
+            if not queue.running:
+                queue.start()
 
     @classmethod
     def get(cls, transport: EventTransport | None = None) -> "AsyncEventBus":
@@ -313,6 +747,8 @@ class AsyncEventBus:
         elif transport is not None:
             # Update transport if provided
             cls._instance.transport = transport
+            cls._instance.invalidate_filters()
+            cls._instance._sync_queues()
         return cls._instance
 
     @classmethod
@@ -325,12 +761,13 @@ class AsyncEventBus:
         if cls._instance:
             # Signal shutdown
             cls._instance._running = False
-            if hasattr(cls._instance, "_stop_event"):
+            for queue in cls._instance._queues.values():
                 try:
-                    # _stop_event.set() schedules on the event's loop; this can fail if
-                    # the loop is already closed in test teardown. Swallow to ensure
+                    # Cancelling schedules on the task's loop; this can fail if the
+                    # loop is already closed in test teardown. Swallow to ensure
                     # reset never raises in those cases.
-                    cls._instance._stop_event.set()
+                    if queue.task is not None and not queue.task.done():
+                        queue.task.cancel()
                 except RuntimeError:
                     pass
                 except Exception:
@@ -341,22 +778,14 @@ class AsyncEventBus:
 
     async def start(self):
         """Start the event bus and all lifecycle-aware listeners."""
-        # Always ensure queue is initialized
-        if not hasattr(self, "_queue"):
-            self.init_queue()
-
         # Start each lifecycle-aware listener (even if already running)
         # This ensures listeners are started even if auto-start happened
         for listener in self.listeners.values():
             if isinstance(listener, LifecycleAwareListener):
                 await listener.start()
 
-        # If not already running, start the event processing task
-        if not self._running:
-            # Clear stop event and start processing
-            self._stop_event.clear()
-            self._running = True
-            self._task = asyncio.create_task(self._process_events())
+        # Start a worker per transport and listener
+        self._ensure_running()
 
     async def stop(self):
         """Stop the event bus and all lifecycle-aware listeners."""
@@ -365,37 +794,20 @@ class AsyncEventBus:
 
         # Signal processing to stop
         self._running = False
-        if hasattr(self, "_stop_event"):
-            self._stop_event.set()
 
-        # Try to process remaining items with a timeout if queue exists
-        if hasattr(self, "_queue") and not self._queue.empty():
-            try:
-                # Give some time for remaining items to be processed
-                await asyncio.wait_for(self._queue.join(), timeout=5.0)
-            except asyncio.TimeoutError:
-                # If we timeout, drain the queue to prevent deadlock
-                while not self._queue.empty():
-                    try:
-                        self._queue.get_nowait()
-                        self._queue.task_done()
-                    except asyncio.QueueEmpty:
-                        break
-            except Exception as e:
-                print(f"Error during queue cleanup: {e}")
+        # Give queued events some time to be processed
+        try:
+            await asyncio.wait_for(self._drain(), timeout=5.0)
+        except asyncio.TimeoutError:
+            pending = sum(queue.pending for queue in self._queues.values())
+            print(f"Dropping {pending} unprocessed events on shutdown")
+        except Exception as e:
+            print(f"Error during queue cleanup: {e}")
 
-        # Cancel and wait for task with timeout
-        if self._task and not self._task.done():
-            self._task.cancel()
-            try:
-                # Wait for task to complete with timeout
-                await asyncio.wait_for(self._task, timeout=5.0)
-            except (asyncio.CancelledError, asyncio.TimeoutError):
-                pass  # Task was cancelled or timed out
-            except Exception as e:
-                print(f"Error cancelling process task: {e}")
-            finally:
-                self._task = None
+        # Cancel the workers; events still queued are discarded
+        for queue in self._queues.values():
+            await queue.stop()
+            queue.events.clear()
 
         # Stop each lifecycle-aware listener
         for listener in self.listeners.values():
@@ -407,8 +819,20 @@ class AsyncEventBus:
                 except Exception as e:
                     print(f"Error stopping listener: {e}")
 
+        # Write out anything the transport still buffers (e.g. FileTransport)
+        close = getattr(self.transport, "close", None)
+        if close is not None:
+            try:
+                await asyncio.wait_for(close(), timeout=5.0)
+            except Exception as e:
+                print(f"Error closing transport: {e}")
+
+    async def _drain(self) -> None:
+        while any(queue.pending and queue.running for queue in self._queues.values()):
+            await asyncio.sleep(0.01)
+
     async def emit(self, event: Event):
-        """Emit an event to all listeners and transport."""
+        """Queue an event for the transport and all listeners."""
         # Inject current tracing info if available
         span = trace.get_current_span()
         if span.is_recording():
@@ -416,22 +840,13 @@ class AsyncEventBus:
             event.trace_id = f"{ctx.trace_id:032x}"
             event.span_id = f"{ctx.span_id:016x}"
 
-        # Forward to transport first (immediate processing)
-        try:
-            await self.transport.send_event(event)
-        except Exception as e:
-            print(f"Error in transport.send_event: {e}")
-
-        # Initialize queue and start processing if needed
-        if not hasattr(self, "_queue"):
-            self.init_queue()
-            # Auto-start the event processing task if not running
-            if not self._running:
-                self._running = True
-                self._task = asyncio.create_task(self._process_events())
-
-        # Then queue for listeners
-        await self._queue.put(event)
+        self._ensure_running()
+        self.emitted += 1
+        for queue in list(self._queues.values()):
+            if self.overflow == "block":
+                await queue.put(event)
+            else:
+                queue.offer(event)
 
     def emit_with_stderr_transport(self, event: Event):
         print(
@@ -439,15 +854,13 @@ class AsyncEventBus:
             file=sys.stderr,
         )
 
-        # Initialize queue and start processing if needed
-        if not hasattr(self, "_queue"):
-            self.init_queue()
-            # Auto-start the event processing task if not running
-            if not self._running:
-                self._running = True
-                self._task = asyncio.create_task(self._process_events())
-
-        self._queue.put_nowait(event)
+        self._ensure_running()
+        self.emitted += 1
+        # Only listeners; the stderr print above stands in for the transport.
+        # Cannot wait here, so "block" falls back to dropping the oldest event.
+        for name, queue in list(self._queues.items()):
+            if name.startswith("listener:"):
+                queue.offer(event)
 
     async def _send_to_transport(self, event: Event):
         """Send event to transport with error handling."""
@@ -456,95 +869,59 @@ class AsyncEventBus:
         except Exception as e:
             print(f"Error in transport.send_event: {e}")
 
+    def accepts(
+        self, event_type: EventType, namespace: str, name: str | None = None
+    ) -> bool:
+        """
+        Whether the transport or any listener may receive an event with these
+        attributes. Lets the Logger skip building events that would be dropped.
+        Results are cached; call invalidate_filters() after changing a filter in place.
+        """
+        key = (event_type, namespace, name)
+        cached = self._accepts_cache.get(key)
+        if cached is not None:
+            return cached
+
+        transport_accepts = getattr(self.transport, "accepts", None)
+        result = (
+            transport_accepts is None
+            or transport_accepts(event_type, namespace, name)
+            or any(
+                listener.accepts(event_type, namespace, name)
+                for listener in self.listeners.values()
+            )
+        )
+        if len(self._accepts_cache) >= 4096:
+            self._accepts_cache.clear()
+        self._accepts_cache[key] = result
+        return result
+
+    def invalidate_filters(self) -> None:
+        """Forget cached accepts() results (transport, listeners or filters changed)."""
+        self._accepts_cache.clear()
+
     def add_listener(self, name: str, listener: EventListener):
         """Add a listener to the event bus."""
         self.listeners[name] = listener
+        self.invalidate_filters()
+        self._sync_queues()
 
     def remove_listener(self, name: str):
         """Remove a listener from the event bus."""
         self.listeners.pop(name, None)
-
-    async def _process_events(self):
-        """Process events from the queue until stopped."""
-        while self._running:
-            event = None
-            try:
-                # Use wait with both queue.get() and stop_event.wait() to avoid timeout delays
-                try:
-                    # Check if we should be stopping first
-                    if not self._running or self._stop_event.is_set():
-                        break
-
-                    # Wait for either an event or stop signal without timeout
-                    queue_task = asyncio.create_task(self._queue.get())
-                    stop_task = asyncio.create_task(self._stop_event.wait())
-
-                    done, pending = await asyncio.wait(
-                        [queue_task, stop_task], return_when=asyncio.FIRST_COMPLETED
-                    )
-
-                    # Cancel pending tasks
-                    for task in pending:
-                        task.cancel()
-                        try:
-                            await task
-                        except asyncio.CancelledError:
-                            pass
-
-                    # Check which task completed
-                    if stop_task in done:
-                        break
-
-                    if queue_task in done:
-                        event = queue_task.result()
-                    else:
-                        continue
-                except asyncio.CancelledError:
-                    break
-
-                # Process the event through all listeners
-                tasks = []
-                for listener in self.listeners.values():
-                    try:
-                        tasks.append(listener.handle_event(event))
-                    except Exception as e:
-                        print(f"Error creating listener task: {e}")
-
-                if tasks:
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-                    for r in results:
-                        if isinstance(r, Exception):
-                            print(f"Error in listener: {r}")
-                            print(
-                                f"Stacktrace: {''.join(traceback.format_exception(type(r), r, r.__traceback__))}"
-                            )
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"Error in event processing loop: {e}")
-                continue
-            finally:
-                # Always mark the task as done if we got an event
-                if event is not None:
-                    self._queue.task_done()
-
-        # Process remaining events in queue if it exists
-        if hasattr(self, "_queue"):
-            while not self._queue.empty():
-                try:
-                    event = self._queue.get_nowait()
-                    tasks = []
-                    for listener in self.listeners.values():
-                        try:
-                            tasks.append(listener.handle_event(event))
-                        except Exception:
-                            pass
-                    if tasks:
-                        await asyncio.gather(*tasks, return_exceptions=True)
-                    self._queue.task_done()
-                except asyncio.QueueEmpty:
-                    break
+        self.invalidate_filters()
+        self._sync_queues()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, drops and handling latency per transport and listener."""
+        return {
+            "overflow": self.overflow,
+            "max_queue_size": self.max_queue_size,
+            "emitted": self.emitted,
+            "queues": {
+                name: queue.stats() for name, queue in self._queues.items()
+            },
+        }
 
 
 class MultiTransport(EventTransport):
@@ -558,6 +935,15 @@ class MultiTransport(EventTransport):
         """
         self.transports = transports
 
+    def accepts(
+        self, event_type: EventType, namespace: str, name: str | None = None
+    ) -> bool:
+        return any(
+            getattr(transport, "accepts", None) is None
+            or transport.accepts(event_type, namespace, name)
+            for transport in self.transports
+        )
+
     async def send_event(self, event: Event):
         """Send event to all configured transports in parallel.
 
@@ -584,6 +970,16 @@ class MultiTransport(EventTransport):
             for transport, exc in exceptions:
                 print(f"  {transport.__class__.__name__}: {exc}")
 
+    async def close(self):
+        """Close every transport that supports it."""
+        for transport in self.transports:
+            close = getattr(transport, "close", None)
+            if close is not None:
+                try:
+                    await close()
+                except Exception as e:
+                    print(f"Error closing {transport.__class__.__name__}: {e}")
+
 
 def get_log_filename(settings: LoggerSettings, session_id: str | None = None) -> str:
     """Generate a log filename based on the configuration.
@@ -646,7 +1042,16 @@ def create_transport(
                 )
 
             transports.append(
-                FileTransport(filepath=filepath, event_filter=event_filter)
+                FileTransport(
+                    filepath=filepath,
+                    event_filter=event_filter,
+                    buffer_size=settings.file_buffer_size,
+                    flush_interval=settings.file_flush_interval,
+                    fsync=settings.file_fsync,
+                    max_bytes=settings.file_max_bytes,
+                    rotate_interval=settings.file_rotate_interval,
+                    backup_count=settings.file_backup_count,
+                )
             )
         elif transport_type == "http":
             if not settings.http_endpoint:
@@ -1,4 +1,5 @@
 import asyncio
+import json
 from typing import List, Literal, Dict, Optional, TypeVar, TYPE_CHECKING
 
 from opentelemetry import trace
@@ -33,6 +34,7 @@ from mcp_agent.mcp.gen_client import gen_client
 from mcp_agent.core.context_dependent import ContextDependent
 from mcp_agent.mcp.mcp_agent_client_session import MCPAgentClientSession
 from mcp_agent.mcp.mcp_connection_manager import MCPConnectionManager
+from mcp_agent.utils.single_flight import SingleFlight
 
 if TYPE_CHECKING:
     from mcp_agent.core.context import Context
@@ -107,11 +109,15 @@ class MCPAggregator(ContextDependent):
         connection_persistence: bool = True,  # Default to True for better stability
         context: Optional["Context"] = None,
         name: str = None,
+        coalesce_tool_calls: bool = True,
         **kwargs,
     ):
         """
         :param server_names: A list of server names to connect to.
         :param connection_persistence: Whether to maintain persistent connections to servers (default: True).
+        :param coalesce_tool_calls: Whether concurrent identical calls (same server, tool and arguments) to
+        tools annotated as read-only or idempotent share a single request to the server (default: True).
+        Tools without those annotations always run once per call.
         Note: The server names must be resolvable by the gen_client function, and specified in the server registry.
         """
         super().__init__(
@@ -122,7 +128,10 @@ class MCPAggregator(ContextDependent):
         self.server_names = server_names
         self.connection_persistence = connection_persistence
         self.agent_name = name
+        self.coalesce_tool_calls = coalesce_tool_calls
         self._persistent_connection_manager: MCPConnectionManager = None
+        # In-flight tool calls keyed by (server_name, tool_name, arguments)
+        self._tool_call_flight: SingleFlight[CallToolResult] = SingleFlight()
 
         # Set up logger with agent name in namespace if available
         global logger
@@ -891,15 +900,14 @@ class MCPAggregator(ContextDependent):
                     return
                 annotate_span_for_call_tool_result(span, result)
 
+            # _execute may be shared with coalesced callers, so it only touches the span of
+            # the caller that runs it; every caller annotates its own span with the result.
             async def try_call_tool(client: ClientSession):
                 try:
-                    res = await client.call_tool(
+                    return await client.call_tool(
                         name=local_tool_name, arguments=arguments
                     )
-                    _annotate_span_for_result(res)
-                    return res
                 except Exception as e:
-                    span.set_status(trace.Status(trace.StatusCode.ERROR))
                     span.record_exception(e)
                     return CallToolResult(
                         isError=True,
@@ -911,49 +919,84 @@ class MCPAggregator(ContextDependent):
                         ],
                     )
 
-            if self.connection_persistence:
-                server_connection = (
-                    await self._persistent_connection_manager.get_server(
-                        server_name, client_session_factory=MCPAgentClientSession
+            async def _execute() -> CallToolResult:
+                if self.connection_persistence:
+                    server_connection = (
+                        await self._persistent_connection_manager.get_server(
+                            server_name, client_session_factory=MCPAgentClientSession
+                        )
                     )
-                )
-                res = await try_call_tool(server_connection.session)
-                _annotate_span_for_result(res)
-                return res
-            else:
-                logger.debug(
-                    f"Creating temporary connection to server: {server_name}",
-                    data={
-                        "progress_action": ProgressAction.STARTING,
-                        "server_name": server_name,
-                        "agent_name": self.agent_name,
-                    },
-                )
-                span.add_event(
-                    "temporary_connection_created",
-                    {"server_name": server_name, GEN_AI_AGENT_NAME: self.agent_name},
-                )
-                async with gen_client(
-                    server_name, server_registry=self.context.server_registry
-                ) as client:
-                    result = await try_call_tool(client)
+                    return await try_call_tool(server_connection.session)
+                else:
                     logger.debug(
-                        f"Closing temporary connection to server: {server_name}",
+                        f"Creating temporary connection to server: {server_name}",
                         data={
-                            "progress_action": ProgressAction.SHUTDOWN,
+                            "progress_action": ProgressAction.STARTING,
                             "server_name": server_name,
                             "agent_name": self.agent_name,
                         },
                     )
                     span.add_event(
-                        "temporary_connection_closed",
-                        {
-                            "server_name": server_name,
-                            GEN_AI_AGENT_NAME: self.agent_name,
-                        },
+                        "temporary_connection_created",
+                        {"server_name": server_name, GEN_AI_AGENT_NAME: self.agent_name},
                     )
-                    _annotate_span_for_result(result)
-                    return result
+                    async with gen_client(
+                        server_name, server_registry=self.context.server_registry
+                    ) as client:
+                        result = await try_call_tool(client)
+                        logger.debug(
+                            f"Closing temporary connection to server: {server_name}",
+                            data={
+                                "progress_action": ProgressAction.SHUTDOWN,
+                                "server_name": server_name,
+                                "agent_name": self.agent_name,
+                            },
+                        )
+                        span.add_event(
+                            "temporary_connection_closed",
+                            {
+                                "server_name": server_name,
+                                GEN_AI_AGENT_NAME: self.agent_name,
+                            },
+                        )
+                        return result
+
+            key = self._tool_call_key(server_name, local_tool_name, arguments)
+            if key is None:
+                res = await _execute()
+            else:
+                if self._tool_call_flight.is_inflight(key):
+                    span.set_attribute("coalesced", True)
+                res = await self._tool_call_flight.do(key, _execute)
+            _annotate_span_for_result(res)
+            return res
+
+    def _tool_call_key(
+        self, server_name: str, tool_name: str, arguments: dict | None
+    ) -> tuple | None:
+        """
+        Key for coalescing identical in-flight tool calls, or None when the call must run
+        on its own: coalescing is disabled, or the tool is not annotated as read-only or
+        idempotent (two calls to a tool with side effects must execute twice).
+        """
+        if not self.coalesce_tool_calls or not self._is_coalescable(server_name, tool_name):
+            return None
+        try:
+            args = json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            # Arguments that cannot be serialized are never coalesced
+            return None
+        return server_name, tool_name, args
+
+    def _is_coalescable(self, server_name: str, tool_name: str) -> bool:
+        for namespaced_tool in self._server_to_tool_map.get(server_name, []):
+            if namespaced_tool.tool.name == tool_name:
+                annotations = namespaced_tool.tool.annotations
+                return bool(
+                    annotations
+                    and (annotations.readOnlyHint or annotations.idempotentHint)
+                )
+        return False
 
     async def list_prompts(self, server_name: str | None = None) -> ListPromptsResult:
         """
@@ -0,0 +1,60 @@
+"""
+Single-flight coalescing: concurrent calls with the same key share one execution.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Deduplicates concurrent work by key.
+
+    The first caller for a key (the leader) starts the work in its own task;
+    callers arriving while it is still running (followers) await the same task
+    instead of repeating it. The key is released as soon as the work finishes,
+    so later calls run again. Nothing is cached.
+
+    The work runs in a separate task so that one caller being cancelled
+    does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def is_inflight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._release(key, t))
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.leaders + self.followers
+        return {
+            "inflight": len(self._inflight),
+            "executions": self.leaders,
+            "coalesced": self.followers,
+            "coalesced_rate": round(self.followers / calls, 4) if calls else None,
+        }
@@ -0,0 +1,61 @@
+import math
+import unicodedata
+import zlib
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from mcp_agent.workflows.embedding.embedding_base import EmbeddingModel, FloatArray
+
+if TYPE_CHECKING:
+    from mcp_agent.core.context import Context
+
+
+class HashingEmbeddingModel(EmbeddingModel):
+    """
+    Local embedding model based on hashed character n-grams.
+    Needs no network or model download, and is deterministic across processes,
+    which makes it suitable for near-duplicate detection (e.g. caching answers
+    to rephrased questions). It captures surface similarity, not meaning.
+    """
+
+    def __init__(
+        self,
+        dim: int = 512,
+        ngram_range: Tuple[int, int] = (1, 3),
+        context: Optional["Context"] = None,
+        **kwargs,
+    ):
+        super().__init__(context=context, **kwargs)
+        self._embedding_dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str) -> Dict[str, int]:
+        text = unicodedata.normalize("NFKC", text).lower()
+        text = "".join(text.split())
+        grams: Dict[str, int] = {}
+        lo, hi = self.ngram_range
+        for n in range(lo, hi + 1):
+            for i in range(len(text) - n + 1):
+                g = text[i : i + n]
+                grams[g] = grams.get(g, 0) + 1
+        return grams
+
+    def embed_sync(self, data: List[str]) -> FloatArray:
+        out = np.zeros((len(data), self._embedding_dim), dtype=np.float32)
+        for row, text in enumerate(data):
+            for gram, tf in self._features(text).items():
+                h = zlib.crc32(gram.encode("utf-8"))
+                # The top bit picks the sign so that collisions tend to cancel out
+                sign = 1.0 if h & 0x80000000 else -1.0
+                out[row, h % self._embedding_dim] += sign * (1.0 + math.log(tf))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+    async def embed(self, data: List[str]) -> FloatArray:
+        return self.embed_sync(data)
+
+    @property
+    def embedding_dim(self) -> int:
+        return self._embedding_dim
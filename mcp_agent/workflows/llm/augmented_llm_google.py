@@ -1,4 +1,7 @@
-from typing import Type
+import asyncio
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Tuple, Type
 import base64
 
 from pydantic import BaseModel
@@ -81,50 +84,18 @@ class GoogleAugmentedLLM(
         Override this method to use a different LLM.
         """
 
-        messages: list[types.Content] = []
         params = self.get_request_params(request_params)
-
-        if params.use_history:
-            messages.extend(self.history.get())
-
-        messages.extend(GoogleConverter.convert_mixed_messages_to_google(message))
-
-        response = await self.agent.list_tools(tool_filter=params.tool_filter)
-
-        tools = [
-            types.Tool(
-                function_declarations=[
-                    types.FunctionDeclaration(
-                        name=tool.name,
-                        description=tool.description,
-                        parameters=transform_mcp_tool_schema(tool.inputSchema),
-                    )
-                ]
-            )
-            for tool in response.tools
-        ]
+        messages = self._initial_messages(message, params)
+        tools = await self._list_google_tools(params)
 
         responses: list[types.Content] = []
         model = await self.select_model(params)
 
         for i in range(params.max_iterations):
-            inference_config = types.GenerateContentConfig(
-                max_output_tokens=params.maxTokens,
-                temperature=params.temperature,
-                stop_sequences=params.stopSequences or [],
-                system_instruction=self.instruction or params.systemPrompt,
-                tools=tools,
-                automatic_function_calling=types.AutomaticFunctionCallingConfig(
-                    disable=True
-                ),
-                candidate_count=1,
-                **(params.metadata or {}),
-            )
-
             arguments = {
                 "model": model,
                 "contents": messages,
-                "config": inference_config,
+                "config": self._inference_config(params, tools),
             }
 
             self.logger.debug("Completion request arguments:", data=arguments)
@@ -172,30 +143,11 @@ class GoogleAugmentedLLM(
                 ] = await self.executor.execute_many(function_calls)
 
                 self.logger.debug(
-                    f"Iteration {i}: Tool call results: {str(results) if results else 'None'}"
+                    lambda: f"Iteration {i}: Tool call results: {str(results) if results else 'None'}"
                 )
 
-                function_response_parts: list[types.Part] = []
-                for result in results:
-                    if (
-                        result
-                        and not isinstance(result, BaseException)
-                        and result.parts
-                    ):
-                        function_response_parts.extend(result.parts)
-                    else:
-                        self.logger.error(
-                            f"Warning: Unexpected error during tool execution: {result}. Continuing..."
-                        )
-                        function_response_parts.append(
-                            types.Part.from_text(text=f"Error executing tool: {result}")
-                        )
-
-                # Combine all parallel function responses into a single message
-                if function_response_parts:
-                    function_response_content = types.Content(
-                        role="tool", parts=function_response_parts
-                    )
+                function_response_content = self._function_response_content(results)
+                if function_response_content:
                     messages.append(function_response_content)
             else:
                 self.logger.debug(
@@ -210,6 +162,160 @@ class GoogleAugmentedLLM(
 
         return responses
 
+    async def generate_stream(
+        self, message, request_params: RequestParams | None = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of generate(). Yields events as they happen:
+          {"type": "token", "text": ...}                          model text as Gemini streams it
+          {"type": "tool_call_start", "name": ..., "arguments": ...}
+          {"type": "tool_call_end", "name": ..., "ok": bool, "elapsed_ms": ...}
+          {"type": "done", "text": ..., "iterations": ...}        final synthesized text
+        Completions are streamed directly from the Gemini API rather than through the executor.
+        """
+        params = self.get_request_params(request_params)
+        messages = self._initial_messages(message, params)
+        tools = await self._list_google_tools(params)
+
+        model = await self.select_model(params)
+        final_text = ""
+        iterations = 0
+
+        for i in range(params.max_iterations):
+            iterations = i + 1
+            self._log_chat_progress(chat_turn=(len(messages) + 1) // 2, model=model)
+
+            # Accumulate the streamed parts into a single model message
+            parts: list[types.Part] = []
+            text = ""
+            async for chunk in GoogleCompletionTasks.request_completion_stream(
+                self.context.config.google,
+                {
+                    "model": model,
+                    "contents": messages,
+                    "config": self._inference_config(params, tools),
+                },
+            ):
+                if not chunk.candidates or not chunk.candidates[0].content:
+                    continue
+                for part in chunk.candidates[0].content.parts or []:
+                    if part.text:
+                        text += part.text
+                        yield {"type": "token", "text": part.text}
+                    elif part.function_call:
+                        parts.append(part)
+
+            if text:
+                parts.insert(0, types.Part.from_text(text=text))
+                final_text = text
+            if not parts:
+                break
+
+            messages.append(types.Content(role="model", parts=parts))
+
+            function_calls = [part.function_call for part in parts if part.function_call]
+            if not function_calls:
+                break
+
+            for call in function_calls:
+                yield {
+                    "type": "tool_call_start",
+                    "name": call.name,
+                    "arguments": dict(call.args or {}),
+                }
+
+            async def _run(index: int, call: types.FunctionCall):
+                started = time.perf_counter()
+                try:
+                    result = await self.execute_tool_call(call)
+                except Exception as e:
+                    result = e
+                return index, call, result, (time.perf_counter() - started) * 1000
+
+            # Report each tool as it finishes, but keep the responses in call order
+            results: list[types.Content | BaseException | None] = [None] * len(function_calls)
+            for next_done in asyncio.as_completed(
+                [_run(idx, call) for idx, call in enumerate(function_calls)]
+            ):
+                idx, call, result, elapsed_ms = await next_done
+                results[idx] = result
+                ok = bool(result) and not isinstance(result, BaseException)
+                yield {
+                    "type": "tool_call_end",
+                    "name": call.name,
+                    "ok": ok,
+                    "elapsed_ms": round(elapsed_ms, 1),
+                }
+
+            messages.append(self._function_response_content(results))
+
+        if params.use_history:
+            self.history.set(messages)
+
+        self._log_chat_finished(model=model)
+
+        yield {"type": "done", "text": final_text, "iterations": iterations}
+
+    def _initial_messages(
+        self, message, params: RequestParams
+    ) -> list[types.Content]:
+        """History (if enabled) followed by the new message(s), in Gemini format."""
+        messages: list[types.Content] = []
+        if params.use_history:
+            messages.extend(self.history.get())
+        messages.extend(GoogleConverter.convert_mixed_messages_to_google(message))
+        return messages
+
+    async def _list_google_tools(self, params: RequestParams) -> list[types.Tool]:
+        response = await self.agent.list_tools(tool_filter=params.tool_filter)
+        return [
+            types.Tool(
+                function_declarations=[
+                    types.FunctionDeclaration(
+                        name=tool.name,
+                        description=tool.description,
+                        parameters=transform_mcp_tool_schema(tool.inputSchema),
+                    )
+                ]
+            )
+            for tool in response.tools
+        ]
+
+    def _inference_config(
+        self, params: RequestParams, tools: list[types.Tool]
+    ) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            max_output_tokens=params.maxTokens,
+            temperature=params.temperature,
+            stop_sequences=params.stopSequences or [],
+            system_instruction=self.instruction or params.systemPrompt,
+            tools=tools,
+            automatic_function_calling=types.AutomaticFunctionCallingConfig(
+                disable=True
+            ),
+            candidate_count=1,
+            **(params.metadata or {}),
+        )
+
+    def _function_response_content(
+        self, results: list[types.Content | BaseException | None]
+    ) -> types.Content | None:
+        """Combine all parallel function responses into a single message."""
+        function_response_parts: list[types.Part] = []
+        for result in results:
+            if result and not isinstance(result, BaseException) and result.parts:
+                function_response_parts.extend(result.parts)
+            else:
+                self.logger.error(
+                    f"Warning: Unexpected error during tool execution: {result}. Continuing..."
+                )
+                function_response_parts.append(
+                    types.Part.from_text(text=f"Error executing tool: {result}")
+                )
+        if not function_response_parts:
+            return None
+        return types.Content(role="tool", parts=function_response_parts)
+
     async def generate_str(
         self,
         message,
@@ -365,6 +471,11 @@ class RequestStructuredCompletionRequest(BaseModel):
 
 
 class GoogleCompletionTasks:
+    # Process-wide client cache keyed on the connection settings, so every request
+    # reuses the same HTTP connection pool instead of building a new Client per call.
+    _clients: Dict[Tuple, Tuple[Client, asyncio.AbstractEventLoop | None]] = {}
+    _clients_lock = threading.Lock()
+
     @staticmethod
     @workflow_task
     async def request_completion_task(
@@ -373,20 +484,63 @@ class GoogleCompletionTasks:
         """
         Request a completion from Google's API.
         """
-
-        if request.config and request.config.vertexai:
-            google_client = Client(
-                vertexai=request.config.vertexai,
-                project=request.config.project,
-                location=request.config.location,
-            )
-        else:
-            google_client = Client(api_key=request.config.api_key)
+        google_client = GoogleCompletionTasks.get_client(request.config)
 
         payload = request.payload
-        response = google_client.models.generate_content(**payload)
+        # Use the async surface so concurrent requests overlap instead of blocking the loop
+        response = await google_client.aio.models.generate_content(**payload)
         return response
 
+    @staticmethod
+    def _client_key(config: GoogleSettings | None) -> Tuple:
+        if config and config.vertexai:
+            return ("vertexai", config.project, config.location)
+        return ("api_key", config.api_key if config else None)
+
+    @staticmethod
+    def get_client(config: GoogleSettings | None) -> Client:
+        """
+        Return the shared client for these settings.
+        The async transport is bound to the event loop it was created on,
+        so a client is rebuilt when called from a different loop.
+        """
+        key = GoogleCompletionTasks._client_key(config)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        with GoogleCompletionTasks._clients_lock:
+            cached = GoogleCompletionTasks._clients.get(key)
+            if cached is not None and cached[1] is loop:
+                return cached[0]
+            client = GoogleCompletionTasks.create_client(config)
+            GoogleCompletionTasks._clients[key] = (client, loop)
+            return client
+
+    @staticmethod
+    def create_client(config: GoogleSettings | None) -> Client:
+        if config and config.vertexai:
+            return Client(
+                vertexai=config.vertexai,
+                project=config.project,
+                location=config.location,
+            )
+        return Client(api_key=config.api_key if config else None)
+
+    @staticmethod
+    async def request_completion_stream(
+        config: GoogleSettings | None, payload: dict
+    ) -> AsyncIterator[types.GenerateContentResponse]:
+        """
+        Stream a completion from Google's API, yielding partial responses as they arrive.
+        Not a workflow task: a stream cannot be replayed through a durable executor.
+        """
+        google_client = GoogleCompletionTasks.get_client(config)
+        stream = await google_client.aio.models.generate_content_stream(**payload)
+        async for chunk in stream:
+            yield chunk
+
     @staticmethod
     @workflow_task
     async def request_structured_completion_task(
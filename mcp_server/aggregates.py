@@ -0,0 +1,190 @@
+# job-guardian/mcp_server/aggregates.py
+# 違規資料集的每家公司彙總表：資料集載入時算一次，摘要工具直接查表。
+# - 以「正規化公司名稱」為 key（大小寫折疊 + 去尾綴，與 CompanyIndex 相同）
+# - 各年度件數、罰鍰總額、違反法條（不重複）、最近一次公告日期
+#   （日期先解析再比較：不補零的 2024/3/5、民國 113/03/05、1130305 都能正確排序）
+
+from __future__ import annotations
+
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from columnar import ColumnarTable, ColumnRef
+from company_index import CompanyIndex
+
+_DATE_PARTS = re.compile(r"(\d{2,4})\D+(\d{1,2})\D+(\d{1,2})")
+ROC_OFFSET = 1911
+UNKNOWN_YEAR = "unknown"
+
+# 比較用的日期 key：(年, 月, 日) 西元；無法解析的排在最前面，同值時以原字串比較
+DateKey = Tuple[Tuple[int, int, int], str]
+
+
+def date_key(date: str) -> DateKey:
+    """
+    公告日期 → 可比較的 key。支援 2024-03-05 / 2024/3/5 / 20240305，
+    以及民國 113/03/05 / 113年3月5日 / 1130305（年份小於 1000 視為民國年）。
+    """
+    s = date.strip()
+    m = _DATE_PARTS.search(s)
+    if m:
+        y, mo, d = (int(g) for g in m.groups())
+    elif s.isdigit() and len(s) in (7, 8):
+        y, mo, d = int(s[:-4]), int(s[-4:-2]), int(s[-2:])
+    else:
+        return (0, 0, 0), s
+    if y < 1000:
+        y += ROC_OFFSET
+    if not (1 <= mo <= 12 and 1 <= d <= 31):
+        return (0, 0, 0), s
+    return (y, mo, d), s
+
+
+
+def date_year(date: str) -> str:
+    """count_by_year 的 key：西元年（民國年已換算）；無法解析的日期歸到 UNKNOWN_YEAR。"""
+    y = date_key(date)[0][0]
+    return str(y) if y else UNKNOWN_YEAR
+
+
+class CompanyAggregate:
+    __slots__ = ("key", "names", "violations", "count_by_year", "fined", "total_fine",
+                 "max_fine", "articles", "latest_date", "latest_key", "_dict")
+
+    def __init__(self, key: Optional[str]):
+        self.key = key
+        self.names: List[str] = []
+        self.violations = 0
+        self.count_by_year: Dict[str, int] = {}
+        self.fined = 0          # 罰鍰金額可解析的件數
+        self.total_fine = 0
+        self.max_fine = 0
+        self.articles: Dict[str, int] = {}
+        self.latest_date: Optional[str] = None
+        self.latest_key: Optional[DateKey] = None
+        self._dict: Optional[dict] = None
+
+    def to_dict(self) -> dict:
+        # 建好後不再變動，輸出格式只組一次
+        if self._dict is None:
+            self._dict = {
+                "company": self.key,
+                "names": self.names,
+                "violations": self.violations,
+                "count_by_year": dict(sorted(self.count_by_year.items())),
+                "fines": {
+                    "total": self.total_fine,
+                    "max": self.max_fine,
+                    "fined_count": self.fined,
+                },
+                "law_articles": [
+                    {"article": a, "count": n}
+                    for a, n in sorted(self.articles.items(), key=lambda kv: (-kv[1], kv[0]))
+                ],
+                "latest_date": self.latest_date,
+            }
+        return self._dict
+
+
+class CompanyAggregates:
+    """
+    index: 同一份資料表的 CompanyIndex（沿用其「名稱 → 列號」分組與正規化結果）
+    date_ref / article_ref: 公告日期、違反法條的欄位參照
+    罰鍰金額取自 table.numeric["fine"]（-1 代表無法解析）
+    """
+
+    def __init__(
+        self,
+        index: CompanyIndex,
+        table: ColumnarTable,
+        date_ref: ColumnRef,
+        article_ref: ColumnRef,
+    ):
+        started = time.perf_counter()
+        self.index = index
+        fines = table.numeric.get("fine")
+        self.by_key: Dict[str, CompanyAggregate] = {}
+        date_keys: Dict[str, DateKey] = {}  # 同一個日期字串只解析一次
+
+        for nid, key in enumerate(index.normalized):
+            agg = self.by_key.get(key)
+            if agg is None:
+                agg = self.by_key[key] = CompanyAggregate(key)
+            agg.names.append(index.names[nid])
+            by_year = agg.count_by_year
+            articles = agg.articles
+            for i in index.rows_by_name[nid]:
+                agg.violations += 1
+                date = table.pick(i, date_ref)
+                if date:
+                    dkey = date_keys.get(date)
+                    if dkey is None:
+                        dkey = date_keys[date] = date_key(date)
+                    # 與工具回傳的 count_by_year 相同（date_year）：解析後的西元年
+                    year = str(dkey[0][0]) if dkey[0][0] else UNKNOWN_YEAR
+                    by_year[year] = by_year.get(year, 0) + 1
+                    if agg.latest_key is None or dkey > agg.latest_key:
+                        agg.latest_date, agg.latest_key = date, dkey
+                article = table.pick(i, article_ref)
+                if article:
+                    articles[article] = articles.get(article, 0) + 1
+                if fines is not None and fines[i] >= 0:
+                    agg.fined += 1
+                    agg.total_fine += fines[i]
+                    if fines[i] > agg.max_fine:
+                        agg.max_fine = fines[i]
+
+        self.build_ms = (time.perf_counter() - started) * 1000
+        self._stats: Optional[dict] = None
+
+    def lookup(self, company: str) -> Optional[CompanyAggregate]:
+        """正規化後精確比對，O(1)。"""
+        return self.by_key.get(self.index.key(company))
+
+    def for_names(self, name_ids: Iterable[int]) -> List[CompanyAggregate]:
+        """CompanyIndex 的公司 id（例如 contains 的結果）→ 不重複的彙總列。"""
+        out: Dict[str, CompanyAggregate] = {}
+        normalized = self.index.normalized
+        for nid in name_ids:
+            key = normalized[nid]
+            if key not in out:
+                out[key] = self.by_key[key]
+        return list(out.values())
+
+    def stats(self) -> dict:
+        if self._stats is None:
+            self._stats = self._compute_stats()
+        return self._stats
+
+    def _compute_stats(self) -> dict:
+        return {
+            "build_ms": round(self.build_ms, 2),
+            "companies": len(self.by_key),
+            "approx_bytes": sys.getsizeof(self.by_key)
+            + sum(sys.getsizeof(a.articles) + sys.getsizeof(a.count_by_year) for a in self.by_key.values()),
+        }
+
+
+def merge_aggregates(aggs: List[CompanyAggregate]) -> Optional[dict]:
+    """多家公司（例如關鍵字命中多個名稱）合併成一份，格式同 CompanyAggregate.to_dict；company 為 None。"""
+    if not aggs:
+        return None
+    if len(aggs) == 1:
+        return aggs[0].to_dict()
+
+    merged = CompanyAggregate(None)
+    for agg in aggs:
+        merged.names.extend(agg.names)
+        merged.violations += agg.violations
+        for y, n in agg.count_by_year.items():
+            merged.count_by_year[y] = merged.count_by_year.get(y, 0) + n
+        merged.fined += agg.fined
+        merged.total_fine += agg.total_fine
+        merged.max_fine = max(merged.max_fine, agg.max_fine)
+        for a, n in agg.articles.items():
+            merged.articles[a] = merged.articles.get(a, 0) + n
+        if agg.latest_key is not None and (merged.latest_key is None or agg.latest_key > merged.latest_key):
+            merged.latest_date, merged.latest_key = agg.latest_date, agg.latest_key
+    return merged.to_dict()
@@ -0,0 +1,148 @@
+# job-guardian/mcp_server/columnar.py
+# 欄式（columnar）資料表：取代「每列一個 dict」的儲存方式。
+# - 欄名 intern 一次；每欄以字典編碼儲存（不重複值 list + array('I') 代碼）
+# - 欄位別名（_pick 的候選欄名）每個 schema 只解析一次
+# - 數值/日期欄位以 array 儲存（年度、罰鍰金額等）
+
+from __future__ import annotations
+
+import base64
+import sys
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 解析後的欄位參照：依候選順序排列、且確實存在於此表的欄位 index
+ColumnRef = Tuple[int, ...]
+
+
+class ColumnarTable:
+    def __init__(self, columns: Sequence[str], values: List[List[str]], codes: List[array]):
+        self.columns: Tuple[str, ...] = tuple(sys.intern(c) for c in columns)
+        self.values = values
+        self.codes = codes
+        self.length = len(codes[0]) if codes else 0
+        # 重複欄名時以最後一欄為準（與 csv.DictReader 相同）
+        self.col_index: Dict[str, int] = {c: i for i, c in enumerate(self.columns)}
+        self.numeric: Dict[str, array] = {}
+        self._refs: Dict[Tuple[str, ...], ColumnRef] = {}
+
+    # ---------------- 建表 ----------------
+    @classmethod
+    def from_records(cls, header: Sequence[str], records: Iterable[Sequence[str]]) -> "ColumnarTable":
+        """header/records 來自 csv.reader；值會 strip，不足的欄位補空字串。"""
+        builder = TableBuilder(header)
+        for rec in records:
+            builder.append(rec)
+        return builder.build()
+
+    # ---------------- 存取 ----------------
+    def __len__(self) -> int:
+        return self.length
+
+    def resolve(self, *candidates: str) -> ColumnRef:
+        """把候選欄名解析為此表的欄位 index（結果快取，每個 schema 只算一次）。"""
+        ref = self._refs.get(candidates)
+        if ref is None:
+            ref = tuple(self.col_index[c] for c in candidates if c in self.col_index)
+            self._refs[candidates] = ref
+        return ref
+
+    def get(self, row: int, col: int) -> str:
+        return self.values[col][self.codes[col][row]]
+
+    def pick(self, row: int, ref: ColumnRef) -> Optional[str]:
+        """與 server._pick 相同語意：第一個非空的候選欄位值。"""
+        for col in ref:
+            v = self.values[col][self.codes[col][row]]
+            if v != "":
+                return v
+        return None
+
+    def column(self, ref: ColumnRef) -> List[Optional[str]]:
+        """整欄取值（套用 pick 語意），建索引/衍生欄位用。"""
+        return [self.pick(i, ref) for i in range(self.length)]
+
+    def row(self, i: int) -> Dict[str, str]:
+        """還原成原本的 dict 形式（只在回傳「資料列原始」時才建立）。"""
+        return {c: self.values[j][self.codes[j][i]] for j, c in enumerate(self.columns)}
+
+    def rows(self) -> List[Dict[str, str]]:
+        return [self.row(i) for i in range(self.length)]
+
+    # ---------------- 數值欄位 ----------------
+    def derive(
+        self,
+        name: str,
+        ref: ColumnRef,
+        parse: Callable[[Optional[str]], int],
+        typecode: str = "q",
+    ) -> array:
+        """由字串欄位解析出數值欄位，存成 array；同一欄位值只解析一次。"""
+        cache: Dict[Optional[str], int] = {}
+        out = array(typecode)
+        for i in range(self.length):
+            v = self.pick(i, ref)
+            n = cache.get(v)
+            if n is None:
+                n = cache[v] = parse(v)
+            out.append(n)
+        self.numeric[name] = out
+        return out
+
+    def approx_bytes(self) -> int:
+        total = sum(c.itemsize * len(c) for c in self.codes)
+        for vals in self.values:
+            # snapshot 載入的字串表在 mmap 上，直接回報其大小，不必逐一解碼
+            nbytes = getattr(vals, "nbytes", None)
+            total += nbytes if nbytes is not None else sum(sys.getsizeof(s) for s in vals)
+        total += sum(a.itemsize * len(a) for a in self.numeric.values())
+        return total
+
+    # ---------------- 序列化（磁碟快取用） ----------------
+    def to_dict(self) -> dict:
+        return {
+            "columns": list(self.columns),
+            "values": [vals if isinstance(vals, list) else list(vals) for vals in self.values],
+            "codes": [base64.b64encode(c.tobytes()).decode("ascii") for c in self.codes],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ColumnarTable":
+        codes = []
+        for h in data["codes"]:
+            a = array("I")
+            a.frombytes(base64.b64decode(h))
+            codes.append(a)
+        return cls(data["columns"], data["values"], codes)
+
+
+class TableBuilder:
+    """逐列累積成字典編碼欄位；串流解析時可以邊收邊建。"""
+
+    def __init__(self, header: Sequence[str]):
+        self.columns = [(h or "").strip() for h in header]
+        width = len(self.columns)
+        self.values: List[List[str]] = [[] for _ in range(width)]
+        self.codes: List[array] = [array("I") for _ in range(width)]
+        self._lookup: List[Dict[str, int]] = [{} for _ in range(width)]
+
+    def append(self, record: Sequence[str]) -> None:
+        if not record:
+            return  # 空白行（csv.DictReader 也會略過）
+        for j, lookup in enumerate(self._lookup):
+            v = record[j].strip() if j < len(record) else ""
+            code = lookup.get(v)
+            if code is None:
+                code = lookup[v] = len(self.values[j])
+                self.values[j].append(v)
+            self.codes[j].append(code)
+
+    def __len__(self) -> int:
+        return len(self.codes[0]) if self.codes else 0
+
+    def build(self) -> ColumnarTable:
+        return ColumnarTable(self.columns, self.values, self.codes)
+
+    def view(self) -> ColumnarTable:
+        """與 builder 共用儲存空間的唯讀視圖；len() 固定在建立當下，但可讀取任何已 append 的列。"""
+        return self.build()
@@ -0,0 +1,211 @@
+# job-guardian/mcp_server/company_index.py
+# 公司名稱索引：每次資料集載入時建一次，取代工具內逐列 regex 比對。
+# - 精確比對：正規化名稱 → 公司 id 的 hash map（O(1)）
+# - 子字串比對：bigram 倒排索引，取交集後只驗證少數候選名稱
+
+from __future__ import annotations
+
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+
+class SubstringIndex:
+    """
+    對一組字串建 unigram + bigram 倒排索引。
+    search(q) 回傳所有「q in texts[i]」成立的 i（遞增排序）。
+    """
+
+    def __init__(self, texts: Sequence[str]):
+        self.texts = texts
+        postings: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            grams = set(text)
+            grams.update(text[j:j + 2] for j in range(len(text) - 1))
+            for g in grams:
+                postings.setdefault(g, []).append(i)
+        self.postings = postings
+
+    @classmethod
+    def from_postings(cls, texts: Sequence[str], postings: Dict[str, Sequence[int]]) -> "SubstringIndex":
+        """由既有的倒排表還原（離線 snapshot 載入用；posting 可以是 mmap 上的 memoryview）。"""
+        index = cls.__new__(cls)
+        index.texts = texts
+        index.postings = postings
+        return index
+
+    def search(self, query: str) -> List[int]:
+        if not query:
+            return list(range(len(self.texts)))
+        if len(query) == 1:
+            return list(self.postings.get(query, ()))
+
+        lists = []
+        for j in range(len(query) - 1):
+            plist = self.postings.get(query[j:j + 2])
+            if not plist:
+                return []
+            lists.append(plist)
+        lists.sort(key=len)
+
+        # 從最短的 posting 開始取交集，最後再做一次真正的子字串驗證
+        candidates = set(lists[0])
+        for plist in lists[1:]:
+            candidates.intersection_update(plist)
+            if not candidates:
+                return []
+        texts = self.texts
+        return sorted(i for i in candidates if query in texts[i])
+
+    def gram_count(self) -> int:
+        return len(self.postings)
+
+    def posting_count(self) -> int:
+        return sum(len(p) for p in self.postings.values())
+
+
+class CompanyIndex:
+    """
+    以「不重複公司名稱」為單位的索引；每個名稱對應到它出現的列號。
+    normalize: 名稱正規化函式（server.normalize_company_name）
+    case_sensitive: 對應 CASE_SENSITIVE 環境變數
+    """
+
+    def __init__(
+        self,
+        names_per_row: Iterable[Optional[str]],
+        normalize: Callable[[str], str],
+        case_sensitive: bool = False,
+    ):
+        started = time.perf_counter()
+        self.normalize = normalize
+        self.case_sensitive = case_sensitive
+
+        name_ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.rows_by_name: List[List[int]] = []
+        row_count = 0
+        for row_id, name in enumerate(names_per_row):
+            row_count += 1
+            if not name:
+                continue
+            nid = name_ids.get(name)
+            if nid is None:
+                nid = name_ids[name] = len(self.names)
+                self.names.append(name)
+                self.rows_by_name.append([])
+            self.rows_by_name[nid].append(row_id)
+        self.row_count = row_count
+
+        # 比對用的三種形式：原字串 / 大小寫折疊 / 正規化
+        self.folded = [self._fold(n) for n in self.names]
+        self.normalized = [normalize(f) for f in self.folded]
+
+        self.exact: Dict[str, List[int]] = {}
+        for nid, (folded, norm) in enumerate(zip(self.folded, self.normalized)):
+            self.exact.setdefault(folded, []).append(nid)
+            if norm != folded:
+                self.exact.setdefault(norm, []).append(nid)
+
+        self.raw_sub = SubstringIndex(self.names)
+        self.folded_sub = self.raw_sub if case_sensitive else SubstringIndex(self.folded)
+        self.norm_sub = SubstringIndex(self.normalized)
+
+        self.build_ms = (time.perf_counter() - started) * 1000
+        self._stats: Optional[dict] = None
+
+    @classmethod
+    def from_parts(
+        cls,
+        names: List[str],
+        rows_by_name: Sequence[Sequence[int]],
+        folded: List[str],
+        normalized: List[str],
+        exact: Dict[str, List[int]],
+        subs: Dict[str, SubstringIndex],
+        normalize: Callable[[str], str],
+        case_sensitive: bool,
+        row_count: int,
+        build_ms: float,
+    ) -> "CompanyIndex":
+        """由 snapshot 的預建內容還原，不重新建索引（subs: raw / folded / norm）。"""
+        index = cls.__new__(cls)
+        index.normalize = normalize
+        index.case_sensitive = case_sensitive
+        index.names = names
+        index.rows_by_name = rows_by_name
+        index.row_count = row_count
+        index.folded = folded
+        index.normalized = normalized
+        index.exact = exact
+        index.raw_sub = subs["raw"]
+        index.folded_sub = subs["folded"]
+        index.norm_sub = subs["norm"]
+        index.build_ms = build_ms
+        index._stats = None
+        return index
+
+    def _fold(self, s: str) -> str:
+        return s if self.case_sensitive else s.lower()
+
+    def key(self, name: str) -> str:
+        """大小寫折疊 + 正規化後的名稱（self.normalized 的形式）。"""
+        return self.normalize(self._fold(name))
+
+    # ---------------- 查詢（回傳公司 id） ----------------
+    def match(self, user_input: str, partial: bool = False) -> List[int]:
+        """與 server._match_company 相同語意：原字串或正規化後相等/包含。"""
+        user_value = self._fold(user_input)
+        user_norm = self.normalize(user_value)
+        if partial:
+            ids = set(self.folded_sub.search(user_value))
+            ids.update(self.norm_sub.search(user_norm))
+            return sorted(ids)
+
+        ids = set(self.exact.get(user_value, ()))
+        ids.update(self.exact.get(user_norm, ()))
+        # exact map 同時收錄 folded 與 normalized；排除只在另一種形式碰巧相等的名稱
+        return sorted(
+            nid for nid in ids
+            if self.folded[nid] == user_value or self.normalized[nid] == user_norm
+        )
+
+    def contains(self, keyword: str) -> List[int]:
+        """與 `keyword in name` 相同語意（區分大小寫、不正規化）。"""
+        return self.raw_sub.search(keyword)
+
+    # ---------------- 公司 id → 列號 ----------------
+    def rows_for(self, name_ids: Iterable[int]) -> List[int]:
+        """多家公司時依原始列順序合併，確保回傳順序與逐列掃描相同。"""
+        out: List[int] = []
+        for nid in name_ids:
+            out.extend(self.rows_by_name[nid])
+        out.sort()
+        return out
+
+    # ---------------- 統計 ----------------
+    def stats(self) -> dict:
+        # 索引建好後不再變動，統計只算一次
+        if self._stats is None:
+            self._stats = self._compute_stats()
+        return self._stats
+
+    def _compute_stats(self) -> dict:
+        subs = {id(s): s for s in (self.raw_sub, self.folded_sub, self.norm_sub)}.values()
+        return {
+            "build_ms": round(self.build_ms, 2),
+            "rows": self.row_count,
+            "names": len(self.names),
+            "exact_keys": len(self.exact),
+            "grams": sum(s.gram_count() for s in subs),
+            "postings": sum(s.posting_count() for s in subs),
+            "approx_bytes": self._approx_bytes(subs),
+        }
+
+    def _approx_bytes(self, subs) -> int:
+        # 粗估：dict/list 本身 + 每個 posting 一個指標
+        total = sys.getsizeof(self.exact) + sys.getsizeof(self.rows_by_name)
+        total += sum(sys.getsizeof(r) for r in self.rows_by_name)
+        for s in subs:
+            total += sys.getsizeof(s.postings) + 8 * s.posting_count()
+        return total
@@ -0,0 +1,195 @@
+# job-guardian/mcp_server/company_resolver.py
+# 公司名稱模糊解析：把使用者輸入對應到資料集裡的標準公司名稱，附相似度分數。
+# - 先做寬鬆正規化：全形/半形（NFKC）、台/臺、大小寫、括號、分公司/門市等尾綴、中英文公司尾綴
+# - 再以字元 n-gram（1~3）TF-IDF 餘弦相似度排序；倒排陣列 + NumPy 向量化計分
+# - 涵蓋所有資料集的公司名稱聯集，同一個正規化名稱視為同一家公司
+
+from __future__ import annotations
+
+import math
+import re
+import sys
+import time
+import unicodedata
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# 異體字：統一成較常見的寫法再比對
+VARIANT_CHARS = str.maketrans({"臺": "台", "峯": "峰", "裏": "裡"})
+
+BRANCH_PAT = re.compile(r"(?<=公司).{0,12}?(分公司|分店|營業所|辦事處|服務處|門市部?|工廠)$")
+# 英文尾綴必須是獨立的字（"Costco" 不會被切成 "Cost"）
+EN_SUFFIX_PAT = re.compile(
+    r"(?<![a-z])(co|company|corp|corporation|inc|incorporated|ltd|limited|taiwan branch|branch)[\s\.,]*$"
+)
+PUNCT_PAT = re.compile(r"[\s\.,，、．&'\"\-_/]+")
+
+NGRAM_SIZES = (1, 2, 3)
+
+
+def fuzzy_key(name: str, normalize: Callable[[str], str]) -> str:
+    """寬鬆正規化；normalize 為 server.normalize_company_name（去括號/空白/中文尾綴）。"""
+    if not name:
+        return ""
+    s = unicodedata.normalize("NFKC", name).lower().translate(VARIANT_CHARS)
+    s = BRANCH_PAT.sub("", s.strip())
+    # 英文尾綴可能連續出現（Co., Ltd.）
+    prev = None
+    while prev != s:
+        prev = s
+        s = EN_SUFFIX_PAT.sub("", s).rstrip(" ,.")
+    s = normalize(s)
+    return PUNCT_PAT.sub("", s)
+
+
+def _ngrams(key: str) -> Dict[str, int]:
+    grams: Dict[str, int] = {}
+    padded = f"^{key}$"
+    for n in NGRAM_SIZES:
+        text = key if n == 1 else padded
+        for j in range(len(text) - n + 1):
+            g = text[j:j + n]
+            grams[g] = grams.get(g, 0) + 1
+    return grams
+
+
+class CompanyResolver:
+    """
+    sources: {資料集名稱: [(公司名稱, 列數), ...]}
+    同一個 fuzzy_key 的名稱合併成一個候選；標準名稱取列數最多的原始寫法。
+    """
+
+    def __init__(
+        self,
+        sources: Dict[str, Iterable[Tuple[str, int]]],
+        normalize: Callable[[str], str],
+    ):
+        started = time.perf_counter()
+        self.normalize = normalize
+
+        key_ids: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.variants: List[Dict[str, int]] = []       # 原始寫法 → 列數
+        self.datasets: List[Dict[str, int]] = []       # 資料集 → 列數
+        for dataset, names in sources.items():
+            for name, rows in names:
+                key = fuzzy_key(name, normalize)
+                if not key:
+                    continue
+                kid = key_ids.get(key)
+                if kid is None:
+                    kid = key_ids[key] = len(self.keys)
+                    self.keys.append(key)
+                    self.variants.append({})
+                    self.datasets.append({})
+                self.variants[kid][name] = self.variants[kid].get(name, 0) + rows
+                self.datasets[kid][dataset] = self.datasets[kid].get(dataset, 0) + rows
+        self.key_ids = key_ids
+        self.canonical = [max(v.items(), key=lambda kv: (kv[1], -len(kv[0])))[0] for v in self.variants]
+
+        # TF-IDF：先收集 (doc, gram, tf)，再依 gram 排序成倒排陣列（CSC）
+        gram_ids: Dict[str, int] = {}
+        docs: List[int] = []
+        cols: List[int] = []
+        tfs: List[float] = []
+        for kid, key in enumerate(self.keys):
+            for g, tf in _ngrams(key).items():
+                gid = gram_ids.get(g)
+                if gid is None:
+                    gid = gram_ids[g] = len(gram_ids)
+                docs.append(kid)
+                cols.append(gid)
+                tfs.append(tf)
+        self.gram_ids = gram_ids
+
+        doc_arr = np.asarray(docs, dtype=np.int32)
+        col_arr = np.asarray(cols, dtype=np.int32)
+        tf_arr = np.asarray(tfs, dtype=np.float32)
+        n_docs = len(self.keys)
+        df = np.bincount(col_arr, minlength=len(gram_ids)).astype(np.float32)
+        self.idf = np.log((n_docs + 1) / (df + 1)).astype(np.float32) + 1.0
+
+        weights = (1.0 + np.log(tf_arr)) * self.idf[col_arr]
+        norms = np.sqrt(np.bincount(doc_arr, weights=weights * weights, minlength=n_docs))
+        norms[norms == 0] = 1.0
+        weights = weights / norms[doc_arr]
+
+        order = np.argsort(col_arr, kind="stable")
+        self.post_docs = doc_arr[order]
+        self.post_weights = weights[order].astype(np.float32)
+        self.indptr = np.zeros(len(gram_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(col_arr, minlength=len(gram_ids)), out=self.indptr[1:])
+
+        self.build_ms = (time.perf_counter() - started) * 1000
+        self._stats: Optional[dict] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # ---------------- 查詢 ----------------
+    def resolve(self, query: str, top_k: int = 5, min_score: float = 0.0) -> List[dict]:
+        key = fuzzy_key(query, self.normalize)
+        if not key or not self.keys:
+            return []
+
+        slices_docs = []
+        slices_vals = []
+        q_norm = 0.0
+        for g, tf in _ngrams(key).items():
+            gid = self.gram_ids.get(g)
+            if gid is None:
+                # 資料裡沒有的 gram 只影響查詢向量長度（idf 取最大值）
+                w = 1.0 + math.log(len(self.keys) + 1)
+                q_norm += ((1.0 + math.log(tf)) * w) ** 2
+                continue
+            w = (1.0 + math.log(tf)) * float(self.idf[gid])
+            q_norm += w * w
+            lo, hi = self.indptr[gid], self.indptr[gid + 1]
+            slices_docs.append(self.post_docs[lo:hi])
+            slices_vals.append(self.post_weights[lo:hi] * w)
+        if not slices_docs:
+            return []
+
+        scores = np.bincount(
+            np.concatenate(slices_docs),
+            weights=np.concatenate(slices_vals),
+            minlength=len(self.keys),
+        ) / math.sqrt(q_norm)
+
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        out = []
+        for kid in top.tolist():
+            score = float(scores[kid])
+            if kid == self.key_ids.get(key):
+                score = 1.0  # 正規化後完全相同
+            if score <= 0 or score < min_score:
+                continue
+            out.append(self._candidate(kid, score))
+        return out
+
+    def _candidate(self, kid: int, score: float) -> dict:
+        variants = sorted(self.variants[kid].items(), key=lambda kv: -kv[1])
+        return {
+            "name": self.canonical[kid],
+            "score": round(min(score, 1.0), 4),
+            "datasets": dict(self.datasets[kid]),
+            "variants": [name for name, _ in variants],
+        }
+
+    # ---------------- 統計 ----------------
+    def stats(self) -> dict:
+        if self._stats is None:
+            self._stats = {
+                "build_ms": round(self.build_ms, 2),
+                "companies": len(self.keys),
+                "grams": len(self.gram_ids),
+                "postings": int(len(self.post_docs)),
+                "approx_bytes": int(
+                    self.post_docs.nbytes + self.post_weights.nbytes + self.indptr.nbytes + self.idf.nbytes
+                ) + sys.getsizeof(self.gram_ids) + sys.getsizeof(self.key_ids),
+            }
+        return self._stats
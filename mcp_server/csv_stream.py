@@ -0,0 +1,138 @@
+# job-guardian/mcp_server/csv_stream.py
+# 串流 CSV 解碼：下載的 bytes 一段一段餵進來，立即吐出已完整的資料列。
+# - 編碼由第一段內容判斷（utf-8 BOM / utf-8 / cp950 / big5 / latin-1）
+# - 依 csv 預設 dialect 的規則追蹤引號狀態（只有欄位開頭的 " 才開啟引號欄位），
+#   引號內含換行的欄位不會被切斷，未引號欄位中的孤立 " 也不會吞掉後面的列
+
+from __future__ import annotations
+
+import codecs
+import csv
+import re
+from collections import deque
+from typing import List, Optional
+
+ENCODINGS = ("utf-8", "cp950", "big5", "latin-1")
+
+# 一個欄位：引號欄位（"" 為跳脫；結束引號後到分隔符前的字元照 csv 非 strict 模式併入欄位）
+# 或不以引號開頭的一般欄位（其中的 " 只是普通字元）
+_FIELD = r'(?:"(?:[^"]|"")*"(?!")[^,\n]*|[^",\n][^,\n]*|)'
+# 從欄位開頭盡量吃掉完整的欄位；停下來的位置若是 "，代表引號欄位在這行沒有閉合
+_FIELDS = re.compile(_FIELD + r"(?:," + _FIELD + r")*")
+# 位於引號欄位內：找到結束引號，以及其後到分隔符前的字元
+_CLOSE = re.compile(r'(?:[^"]|"")*"(?!")[^,\n]*')
+
+
+def _ends_in_quotes(line: str, in_quotes: bool) -> bool:
+    """line 讀完後是否仍在引號欄位內；in_quotes 為讀 line 之前的狀態。"""
+    pos = 0
+    if in_quotes:
+        m = _CLOSE.match(line)
+        if m is None:
+            return True
+        pos = m.end()
+        if pos >= len(line) or line[pos] != ",":
+            return False
+        pos += 1
+    elif '"' not in line:
+        return False
+    pos = _FIELDS.match(line, pos).end()
+    return pos < len(line) and line[pos] == '"'
+
+
+class EncodingMismatch(Exception):
+    """串流中途出現不符合已判定編碼的位元組。"""
+
+    def __init__(self, encoding: str):
+        super().__init__(f"內容不是 {encoding} 編碼")
+        self.encoding = encoding
+
+
+def sniff_encoding(chunk: bytes, candidates=ENCODINGS) -> str:
+    """用第一段內容判斷編碼；結尾被切斷的多位元組字元不算錯誤。"""
+    if chunk.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    for enc in candidates:
+        try:
+            codecs.getincrementaldecoder(enc)().decode(chunk, final=False)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+class _LineFeed:
+    """csv.reader 的輸入來源；只放入完整紀錄，所以 reader 不會讀到一半的引號欄位。"""
+
+    def __init__(self):
+        self.lines: deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+class CSVStreamParser:
+    """
+    feed(bytes) -> 本次新完成的紀錄（list[str]）；close() 取出最後殘留的紀錄。
+    第一筆紀錄即為表頭，交由呼叫端處理。
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        self.encoding = encoding
+        self._decoder = None
+        self._partial = ""      # 尚未遇到換行的半行文字
+        self._pending: List[str] = []  # 引號尚未閉合的多行紀錄
+        self._in_quotes = False
+        self._feed = _LineFeed()
+        self._reader = csv.reader(self._feed)
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[List[str]]:
+        if self._decoder is None:
+            if self.encoding is None:
+                self.encoding = sniff_encoding(chunk)
+            self._decoder = codecs.getincrementaldecoder(self.encoding)()
+        try:
+            text = self._decoder.decode(chunk, final=final)
+        except UnicodeDecodeError:
+            raise EncodingMismatch(self.encoding)
+
+        # 只以 \n 斷行（與 io.StringIO 逐行讀取相同），最後不完整的一行留到下一段
+        parts = (self._partial + text).split("\n")
+        self._partial = parts.pop()
+        lines = [p + "\n" for p in parts]
+        if final and self._partial:
+            lines.append(self._partial)
+            self._partial = ""
+
+        for line in lines:
+            self._pending.append(line)
+            self._in_quotes = _ends_in_quotes(line, self._in_quotes)
+            if not self._in_quotes:
+                self._feed.lines.append("".join(self._pending))
+                self._pending.clear()
+        return self._drain()
+
+    def close(self) -> List[List[str]]:
+        records = self.feed(b"", final=True) if self._decoder is not None else []
+        # 引號到檔尾都沒閉合：剩下的內容整段交給 csv 處理
+        tail = "".join(self._pending)
+        self._pending.clear()
+        self._in_quotes = False
+        if tail:
+            self._feed.lines.append(tail)
+            records.extend(self._drain())
+        return records
+
+    def _drain(self) -> List[List[str]]:
+        out: List[List[str]] = []
+        while self._feed.lines:
+            try:
+                out.append(next(self._reader))
+            except StopIteration:
+                break
+        return out
@@ -0,0 +1,430 @@
+# job-guardian/mcp_server/dataset_cache.py
+# 資料集快取層：每個來源 CSV 解析成 ColumnarTable 後同時保存在記憶體與磁碟。
+# - TTL 內直接回傳記憶體內容
+# - 過期但仍在 max_stale 內：先回傳舊資料，背景以 ETag/Last-Modified 做條件式重新驗證
+# - 超過 max_stale 或完全沒有資料：等待抓取完成
+# 全部在 asyncio 上執行；讀寫磁碟與建索引這類阻塞工作丟到 thread，避免卡住 server loop。
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from columnar import ColumnarTable, TableBuilder
+
+
+@dataclass
+class FetchResult:
+    """一次 HTTP 抓取的結果；status == 304 時 table 為 None。"""
+
+    status: int
+    table: Optional[ColumnarTable] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    version: Optional[str] = None
+
+
+# await fetch(url, conditional_headers, on_progress=...) -> FetchResult
+Fetcher = Callable[..., Awaitable[FetchResult]]
+
+# build_index(name, table) -> 任意索引物件；每次資料集（重新）載入時呼叫一次
+IndexBuilder = Callable[[str, ColumnarTable], Any]
+
+# build_aggregates(name, table, index) -> 彙總表；在索引建好之後呼叫
+AggregateBuilder = Callable[[str, ColumnarTable, Any], Any]
+
+
+@dataclass
+class CachedDataset:
+    name: str
+    url: str
+    table: ColumnarTable
+    version: str
+    # 最後一次向來源確認的時間（200 或 304 都算）
+    validated_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    loaded_from: str = "network"
+    revalidations: int = field(default=0)
+    index: Any = None
+    aggregates: Any = None
+
+    def age(self) -> float:
+        return time.time() - self.validated_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def info(self) -> dict:
+        return {
+            "url": self.url,
+            "rows": len(self.table),
+            "approx_bytes": self.table.approx_bytes(),
+            "version": self.version,
+            "age_seconds": round(self.age(), 1),
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "loaded_from": self.loaded_from,
+            "revalidations": self.revalidations,
+            "index": self.index.stats() if hasattr(self.index, "stats") else None,
+            "aggregates": self.aggregates.stats() if hasattr(self.aggregates, "stats") else None,
+        }
+
+
+class StreamUnavailable(Exception):
+    """這次載入無法邊下載邊掃描（改由磁碟載入，或下載重新開始），呼叫端應改用 get()。"""
+
+
+class LoadProgress:
+    """
+    冷啟動（記憶體與磁碟都沒有資料）時的下載進度。
+    fetcher 每解析完一段就 publish 一次，查詢端用 follow() 依序讀取已解析的列，
+    找到足夠筆數即可提早結束，不必等整份 CSV 下載完。
+    """
+
+    def __init__(self):
+        self.table: Optional[ColumnarTable] = None
+        self.rows = 0
+        self.generation = 0
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._builder: Optional[TableBuilder] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, builder: TableBuilder) -> None:
+        if builder is not self._builder:
+            # fetcher 重試會換一個新的 builder，先前讀到的列作廢
+            if self._builder is not None:
+                self.generation += 1
+            self._builder = builder
+            self.table = builder.view()
+        self.rows = len(builder)
+        self._wake()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._wake()
+
+    def _wake(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def follow(self) -> AsyncIterator[Tuple[ColumnarTable, int]]:
+        """依序產生 (table, 列號)；下載完成後結束。"""
+        i = 0
+        generation = self.generation
+        while True:
+            changed = self._changed
+            if self.generation != generation:
+                raise StreamUnavailable("來源重新下載")
+            table = self.table
+            while i < self.rows and self.generation == generation:
+                yield table, i
+                i += 1
+            if self.generation != generation:
+                continue
+            if self.error is not None:
+                raise self.error
+            if self.done:
+                if table is None:
+                    raise StreamUnavailable("資料改由快取載入")
+                return
+            await changed.wait()
+
+
+class DatasetCache:
+    """
+    以資料集名稱為 key 的快取。
+    sources: {name: url}
+    fetch:   實際下載 + 解析 CSV 的函式（由 server.py 提供）
+    build_index: 資料載入後建立查詢索引（304 時沿用舊索引）
+    build_aggregates: 索引建好後再建立彙總表（同上）
+    """
+
+    def __init__(
+        self,
+        sources: Dict[str, str],
+        fetch: Fetcher,
+        cache_dir: Optional[str] = None,
+        ttl: float = 6 * 3600,
+        max_stale: float = 7 * 86400,
+        build_index: Optional[IndexBuilder] = None,
+        build_aggregates: Optional[AggregateBuilder] = None,
+    ):
+        self.sources = dict(sources)
+        self.fetch = fetch
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.build_index = build_index
+        self.build_aggregates = build_aggregates
+
+        self._entries: Dict[str, CachedDataset] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._background: Dict[str, asyncio.Task] = {}
+        self._progress: Dict[str, LoadProgress] = {}
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _lock(self, name: str) -> asyncio.Lock:
+        # asyncio.Lock 綁定 event loop；換 loop 時（例如 notebook 多次 asyncio.run）重建
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._locks = {n: asyncio.Lock() for n in self.sources}
+            self._background = {}
+        return self._locks[name]
+
+    # ---------------- 查詢 ----------------
+    def peek(self, name: str) -> Optional[CachedDataset]:
+        """只看記憶體中的資料（不載入、不重新驗證）。"""
+        return self._entries.get(name)
+
+    async def get(self, name: str) -> CachedDataset:
+        if name not in self.sources:
+            raise KeyError(f"未知的資料集: {name}")
+
+        entry = self._entries.get(name)
+        if entry is None:
+            async with self._lock(name):
+                entry = self._entries.get(name) or await asyncio.to_thread(self._load_from_disk, name)
+        if entry is not None:
+            age = entry.age()
+            if age < self.ttl:
+                return entry
+            if age < self.max_stale:
+                # stale-while-revalidate：先回舊資料，背景更新
+                self._refresh_in_background(name)
+                return entry
+
+        return await self.refresh(name)
+
+    async def table(self, name: str) -> ColumnarTable:
+        return (await self.get(name)).table
+
+    async def get_or_follow(self, name: str) -> Union[CachedDataset, LoadProgress]:
+        """
+        與 get 相同，但完全沒有資料、必須從網路冷啟動時，不等下載完成，
+        直接回傳 LoadProgress 讓呼叫端邊下載邊掃描（下載仍在背景完成並寫入快取）。
+        """
+        if name not in self.sources:
+            raise KeyError(f"未知的資料集: {name}")
+
+        progress = self._progress.get(name)
+        if progress is not None and not progress.done:
+            return progress
+        if name not in self._entries and not self._lock(name).locked():
+            self._refresh_in_background(name)
+            await asyncio.sleep(0)  # 讓背景 task 取得鎖並登記 progress
+            progress = self._progress.get(name)
+            if progress is not None and not progress.done:
+                return progress
+        return await self.get(name)
+
+    async def prefetch(self) -> Dict[str, Optional[str]]:
+        """同時載入所有資料集（server 啟動時呼叫）；回傳各資料集的錯誤訊息或 None。"""
+        names = list(self.sources)
+        results = await asyncio.gather(*(self.get(n) for n in names), return_exceptions=True)
+        return {
+            n: (str(r) if isinstance(r, BaseException) else None)
+            for n, r in zip(names, results)
+        }
+
+    # ---------------- 更新 ----------------
+    async def refresh(self, name: str, force: bool = False) -> CachedDataset:
+        """向來源重新驗證（force: 未過 TTL 也驗證）；失敗時若仍有舊資料則回傳舊資料。"""
+        async with self._lock(name):
+            # 記憶體沒有資料時先登記進度（必須在第一個 await 之前），讓查詢端可以跟著掃描
+            progress: Optional[LoadProgress] = None
+            if name not in self._entries:
+                progress = self._progress[name] = LoadProgress()
+            try:
+                return await self._refresh_locked(name, progress, force)
+            except BaseException as e:
+                if progress is not None:
+                    progress.finish(e)
+                raise
+            finally:
+                if progress is not None:
+                    progress.finish(progress.error)
+                    if self._progress.get(name) is progress:
+                        del self._progress[name]
+
+    async def _refresh_locked(
+        self,
+        name: str,
+        progress: Optional[LoadProgress],
+        force: bool = False,
+    ) -> CachedDataset:
+        current = self._entries.get(name) or await asyncio.to_thread(self._load_from_disk, name)
+        # 等鎖期間可能已被其他 task 更新
+        if current is not None and current.age() < self.ttl and not force:
+            return current
+
+        url = self.sources[name]
+        headers = current.conditional_headers() if current else {}
+        # 只有真正從網路冷啟動時才開放邊下載邊掃描
+        on_progress = progress.publish if progress is not None and current is None else None
+        try:
+            result = await self.fetch(url, headers, on_progress=on_progress)
+        except Exception as e:
+            if current is not None:
+                print(f"[WARN] {name} 重新驗證失敗，沿用快取資料: {e}", file=sys.stderr)
+                return current
+            raise
+
+        if result.status == 304 and current is not None:
+            current.validated_at = time.time()
+            current.revalidations += 1
+            # snapshot 載入的資料磁碟快取裡沒有資料表，要整份寫入
+            await asyncio.to_thread(self._save_to_disk, current, current.loaded_from != "snapshot")
+            return current
+
+        entry = CachedDataset(
+            name=name,
+            url=url,
+            table=result.table if result.table is not None else ColumnarTable((), [], []),
+            version=result.version or "",
+            validated_at=time.time(),
+            etag=result.etag,
+            last_modified=result.last_modified,
+        )
+        await asyncio.to_thread(self._attach_index, entry)
+        self._entries[name] = entry
+        await asyncio.to_thread(self._save_to_disk, entry)
+        return entry
+
+    def _refresh_in_background(self, name: str) -> None:
+        self._lock(name)  # 確保 _background 屬於目前的 loop
+        task = self._background.get(name)
+        if task is not None and not task.done():
+            return
+
+        async def _run():
+            try:
+                await self.refresh(name)
+            except Exception as e:
+                print(f"[WARN] {name} 背景更新失敗: {e}", file=sys.stderr)
+
+        self._background[name] = asyncio.create_task(_run())
+
+    async def invalidate(self, name: Optional[str] = None) -> List[str]:
+        """清除記憶體與磁碟快取；name 為 None 時清除全部。"""
+        names = [name] if name else list(self.sources)
+        for n in names:
+            if n not in self.sources:
+                raise KeyError(f"未知的資料集: {n}")
+        for n in names:
+            async with self._lock(n):
+                self._entries.pop(n, None)
+                for path in self._disk_paths(n) or ():
+                    if os.path.exists(path):
+                        os.remove(path)
+        return names
+
+    def install(self, entry: CachedDataset) -> bool:
+        """
+        放入外部載入的資料（例如離線 snapshot）；之後照常依 TTL 重新驗證。
+        來源 URL 不符、或記憶體中已有較新的資料時略過，回傳 False。
+        """
+        if self.sources.get(entry.name) != entry.url:
+            return False
+        current = self._entries.get(entry.name)
+        if current is not None and current.validated_at >= entry.validated_at:
+            return False
+        self._attach_index(entry)
+        self._entries[entry.name] = entry
+        return True
+
+    def status(self) -> Dict[str, Optional[dict]]:
+        return {
+            n: (self._entries[n].info() if n in self._entries else None)
+            for n in self.sources
+        }
+
+    def _attach_index(self, entry: CachedDataset) -> None:
+        # 在放進 _entries 之前建好，查詢端永遠看到「資料 + 對應索引」的一致組合
+        # snapshot 載入的資料已附預建索引，不重建
+        if self.build_index is not None and entry.index is None:
+            entry.index = self.build_index(entry.name, entry.table)
+        if self.build_aggregates is not None:
+            entry.aggregates = self.build_aggregates(entry.name, entry.table, entry.index)
+
+    # ---------------- 磁碟 ----------------
+    # 每個資料集兩個檔案：<name>.meta.json（驗證資訊）與 <name>.table.json（欄式資料）
+    # 304 時只需重寫很小的 meta 檔。
+    def _disk_paths(self, name: str) -> Optional[tuple[str, str]]:
+        if not self.cache_dir:
+            return None
+        base = os.path.join(self.cache_dir, name)
+        return f"{base}.meta.json", f"{base}.table.json"
+
+    def _load_from_disk(self, name: str) -> Optional[CachedDataset]:
+        paths = self._disk_paths(name)
+        if not paths or not all(os.path.exists(p) for p in paths):
+            return None
+        meta_path, table_path = paths
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            # 來源 URL 被 .env 換掉時，舊快取不可用
+            if meta.get("url") != self.sources[name]:
+                return None
+            with open(table_path, "r", encoding="utf-8") as f:
+                table = ColumnarTable.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARN] 無法讀取 {name} 快取檔: {e}", file=sys.stderr)
+            return None
+
+        entry = CachedDataset(
+            name=name,
+            url=meta["url"],
+            table=table,
+            version=meta.get("version", ""),
+            validated_at=float(meta.get("validated_at", 0)),
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            loaded_from="disk",
+        )
+        self._attach_index(entry)
+        self._entries[name] = entry
+        return entry
+
+    def _save_to_disk(self, entry: CachedDataset, meta_only: bool = False) -> None:
+        paths = self._disk_paths(entry.name)
+        if not paths:
+            return
+        meta_path, table_path = paths
+        meta = {
+            "url": entry.url,
+            "version": entry.version,
+            "validated_at": entry.validated_at,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+        }
+        try:
+            if not meta_only:
+                _atomic_write_json(table_path, entry.table.to_dict())
+            _atomic_write_json(meta_path, meta)
+        except OSError as e:
+            print(f"[WARN] 無法寫入 {entry.name} 快取檔: {e}", file=sys.stderr)
+
+
+def _atomic_write_json(path: str, data) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
@@ -0,0 +1,168 @@
+# job-guardian/mcp_server/fetcher.py
+# 非同步 HTTP 抓取引擎：所有資料來源共用一個 httpx.AsyncClient 連線池。
+# - keep-alive 連線重用、串流下載、邊下載邊解析 CSV
+# - 連線錯誤 / 429 / 5xx 以指數退避 + 隨機抖動（full jitter）重試
+# - force_ipv4：綁定 0.0.0.0 只走 IPv4（取代舊版 urllib3 monkeypatch）
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import sys
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from columnar import ColumnarTable, TableBuilder
+from csv_stream import ENCODINGS, CSVStreamParser, EncodingMismatch
+from dataset_cache import FetchResult
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# on_progress(builder)：每解析完一段就呼叫一次，讓查詢端邊下載邊掃描
+ProgressCallback = Callable[[TableBuilder], None]
+
+
+class RetryableStatus(Exception):
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status}: {url}")
+        self.status = status
+
+
+class AsyncFetcher:
+    def __init__(
+        self,
+        timeout: float = 30,
+        headers: Optional[Dict[str, str]] = None,
+        force_ipv4: bool = True,
+        max_connections: int = 10,
+        max_keepalive: int = 5,
+        keepalive_expiry: float = 60,
+        retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8,
+        chunk_size: int = 64 * 1024,
+    ):
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.force_ipv4 = force_ipv4
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.chunk_size = chunk_size
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ---------------- 連線池 ----------------
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # 連線綁定在 event loop 上；換 loop（例如 notebook 多次 asyncio.run）時重建
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            transport = httpx.AsyncHTTPTransport(
+                limits=self.limits,
+                local_address="0.0.0.0" if self.force_ipv4 else None,
+            )
+            self._client = httpx.AsyncClient(
+                http2=False,
+                timeout=self.timeout,
+                headers=self.headers,
+                transport=transport,
+            )
+            self._loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    # ---------------- 抓取 ----------------
+    async def fetch(
+        self,
+        url: str,
+        conditional_headers: Optional[Dict[str, str]] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> FetchResult:
+        """
+        下載並解析成 ColumnarTable；304 時 table 為 None。
+        重試時會建立新的 TableBuilder，on_progress 收到不同的 builder 即代表重新開始。
+        """
+        headers = dict(conditional_headers or {})
+        encodings = list(ENCODINGS)
+        encoding: Optional[str] = None  # None = 由第一段內容判斷
+        attempt = 0
+        while True:
+            try:
+                return await self._fetch_once(url, headers, encoding, on_progress)
+            except EncodingMismatch as e:
+                # 判斷錯誤：換下一個候選編碼重抓（不算網路重試次數）
+                if e.encoding in encodings:
+                    encodings.remove(e.encoding)
+                if not encodings:
+                    raise
+                encoding = encodings[0]
+                print(f"[WARN] {url} {e}，改用 {encoding} 重新下載", file=sys.stderr)
+            except (httpx.TransportError, RetryableStatus) as e:
+                if attempt >= self.retries:
+                    raise RuntimeError(f"無法抓取 {url}（已重試 {attempt} 次）: {e}") from e
+                delay = self._backoff(attempt)
+                attempt += 1
+                print(f"[WARN] 抓取 {url} 失敗（{e}），{delay:.2f}s 後重試", file=sys.stderr)
+                await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _fetch_once(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        encoding: Optional[str],
+        on_progress: Optional[ProgressCallback],
+    ) -> FetchResult:
+        async with self.client.stream("GET", url, headers=headers) as resp:
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+            if resp.status_code == 304:
+                return FetchResult(status=304, etag=etag, last_modified=last_modified)
+            if resp.status_code in RETRYABLE_STATUS:
+                raise RetryableStatus(resp.status_code, url)
+            resp.raise_for_status()
+
+            parser = CSVStreamParser(encoding)
+            digest = hashlib.sha1()
+            builder: Optional[TableBuilder] = None
+
+            def _consume(records):
+                nonlocal builder
+                for rec in records:
+                    if builder is None:
+                        builder = TableBuilder(rec)
+                    else:
+                        builder.append(rec)
+
+            async for chunk in resp.aiter_bytes(self.chunk_size):
+                digest.update(chunk)
+                _consume(parser.feed(chunk))
+                if on_progress is not None and builder is not None:
+                    on_progress(builder)
+            _consume(parser.close())
+            if on_progress is not None and builder is not None:
+                on_progress(builder)
+
+        table = builder.build() if builder is not None else ColumnarTable((), [], [])
+        return FetchResult(
+            status=resp.status_code,
+            table=table,
+            etag=etag,
+            last_modified=last_modified,
+            version=digest.hexdigest()[:12],
+        )
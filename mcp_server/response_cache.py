@@ -0,0 +1,107 @@
+# job-guardian/mcp_server/response_cache.py
+# 工具回應快取：熱門公司反覆查詢時直接回傳上次的結果。
+# - key = (工具名稱, 參數原值, 相依資料集版本)；LRU + TTL
+#   參數不做正規化：工具以原始字串比對，"台積電 " 與 "台積電" 結果不同，不能共用一筆
+# - 資料集版本一變動，依賴該資料集的項目全部清掉
+# - 命中/未命中次數放進回應 meta.cache，client 端 call_tool span 會記錄到 telemetry
+
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def canonical_args(args: Dict[str, Any]) -> str:
+    """參數序列化成穩定排序的 JSON 字串；值保持原樣，只有工具視為相同的呼叫才會共用 key。"""
+    return json.dumps(args, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ResponseCache:
+    """
+    max_entries: 最多保留幾筆回應（0 代表停用）
+    ttl: 每筆回應最多保留秒數（即使資料集版本未變）
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (存入時間, 相依資料集, 回應)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Tuple[str, ...], Any]]" = OrderedDict()
+        self._versions: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.purges = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, tool: str, args: Dict[str, Any], versions: Dict[str, str]) -> Hashable:
+        return (tool, canonical_args(args), tuple(sorted(versions.items())))
+
+    def observe(self, versions: Dict[str, str]) -> None:
+        """記錄目前的資料集版本；版本變動時清掉依賴舊版本的項目。"""
+        changed = {n for n, v in versions.items() if self._versions.get(n) not in (None, v)}
+        self._versions.update(versions)
+        if changed:
+            self.invalidate(changed)
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        """命中時回傳 (資料年齡秒數, 回應)。"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, _, value = entry
+        age = time.time() - stored_at
+        if age >= self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return age, value
+
+    def put(self, key: Hashable, datasets: Tuple[str, ...], value: Any) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (time.time(), datasets, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, datasets: Optional[set] = None) -> int:
+        """清掉依賴指定資料集的項目；None = 全部清除。回傳清掉的筆數。"""
+        if datasets is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            stale = [k for k, (_, deps, _) in self._entries.items() if datasets.intersection(deps)]
+            for k in stale:
+                del self._entries[k]
+            removed = len(stale)
+        self.purges += removed
+        return removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "purges": self.purges,
+        }
@@ -1,41 +1,66 @@
 # job-guardian/mcp_server/server.py
-# MCP server: tools = esg_hr, labor_violations, ge_work_equality_violations
-# 每次 tool call 直接從官方 URL 下載最新 CSV，於工具內做 ETL/篩選/回傳。
+# MCP server: tools = esg_hr, labor_violations, ge_work_equality_violations, violation_summary,
+#             company_profile_batch, resolve_company
+# 官方 CSV 經 DatasetCache 快取（記憶體 + 磁碟，TTL 到期後條件式重新驗證），於工具內做篩選/回傳。
+# 下載走共用連線池的非同步 fetcher，工具皆為 async，不會卡住 server loop。
+# 冷啟動（沒有任何快取）時工具邊下載邊掃描，湊滿 limit 筆就先回傳。
+# 工具回應另有 LRU + TTL 快取（key 含資料集版本），熱門公司重複查詢直接回傳。
+# `python server.py --build-snapshot` 產生離線 snapshot；啟動時以 mmap 載入，不必等上游網站。
 # 參考 mcp-agent 的 asyncio/fastmcp 範例（@mcp.tool）
 
 from __future__ import annotations
 
 import argparse
-import csv
-import io
+import asyncio
+import functools
+import inspect
 import json
 import os
 import re
+import sys
 import time
 import unicodedata
-from typing import Dict, List, Optional
+from contextlib import aclosing, asynccontextmanager
+from typing import Callable, Dict, List, Optional, Tuple
 
-import requests
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
-import socket
-import requests.packages.urllib3.util.connection as urllib3_cn
+from mcp.types import ToolAnnotations
 
-
-def _force_ipv4():
-    def allowed_gai_family():
-        return socket.AF_INET
-    urllib3_cn.allowed_gai_family = allowed_gai_family
-
-
-_force_ipv4()
+from aggregates import CompanyAggregates, date_key, date_year, merge_aggregates
+from company_index import CompanyIndex
+from company_resolver import CompanyResolver
+from columnar import ColumnarTable
+from dataset_cache import CachedDataset, DatasetCache, LoadProgress, StreamUnavailable
+from fetcher import AsyncFetcher
+from response_cache import ResponseCache
+from snapshot import Snapshot, SnapshotError, write_snapshot
 
 
 # ------------------------------------------------------------
 # 初始化
 # ------------------------------------------------------------
 load_dotenv()
-mcp = FastMCP("job-guardian")
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    # 有離線 snapshot 就先載入（mmap，毫秒等級），之後照 TTL 在背景重新驗證
+    await asyncio.to_thread(_load_snapshot)
+    # 啟動時在背景同時預抓三個資料集；第一個 tool call 只需等尚未完成的那份
+    prefetch = asyncio.create_task(datasets.prefetch())
+    try:
+        yield {}
+    finally:
+        if not prefetch.done():
+            prefetch.cancel()
+
+
+mcp = FastMCP("job-guardian", lifespan=_lifespan)
+# 查詢類工具不改變任何狀態；client 端（MCPAggregator）只會合併這類工具的同時呼叫
+READ_ONLY = ToolAnnotations(readOnlyHint=True)
+# 會清掉共用快取的管理工具；agent 端不開放（見 main.py 的 allowed_tools）
+ADMIN_DESTRUCTIVE = ToolAnnotations(readOnlyHint=False, destructiveHint=True)
 
 # 來源 URL（可用 .env 覆寫）
 ESG_URL = os.getenv(
@@ -54,9 +79,17 @@ GE_VIO_URL = os.getenv(
 ).strip()
 
 HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "10"))
+# 只走 IPv4（部分部署環境的 IPv6 連不到政府網站）
+HTTP_FORCE_IPV4 = os.getenv("HTTP_FORCE_IPV4", "true").lower() == "true"
 CASE_SENSITIVE = os.getenv("CASE_SENSITIVE", "false").lower() == "true"
 PARTIAL_MATCH = os.getenv(
     "PARTIAL_MATCH", "false").lower() == "true"  # True: 子字串/模糊包含
+# 回傳項目是否附上「資料列原始」；關掉可大幅縮小餵給 LLM 的 payload
+INCLUDE_RAW_ROW = os.getenv("INCLUDE_RAW_ROW", "true").lower() == "true"
+# company_profile_batch 一次最多查幾家公司
+BATCH_MAX_COMPANIES = int(os.getenv("BATCH_MAX_COMPANIES", "20"))
 
 # ------------------------------------------------------------
 # 公用：時間/名稱正規化/CSV下載與解析
@@ -67,6 +100,10 @@ def _iso_now() -> str:
     return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
 
+def _iso_time(ts: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
 SUFFIX_PAT = re.compile(r"(股份有?限公司|有限?公司|公司|Co\.?,?Ltd\.?)$")
 
 
@@ -81,60 +118,284 @@ def normalize_company_name(name: str) -> str:
     return s
 
 
+HTTP_HEADERS = {
+    "User-Agent": "curl/8.5.0",
+    "Accept": "text/csv,*/*;q=0.8",
+}
+
+
+def _new_fetcher() -> AsyncFetcher:
+    return AsyncFetcher(
+        timeout=HTTP_TIMEOUT,
+        headers=HTTP_HEADERS,
+        force_ipv4=HTTP_FORCE_IPV4,
+        max_connections=HTTP_MAX_CONNECTIONS,
+        retries=HTTP_RETRIES,
+    )
+
+
+# 所有資料來源共用一個連線池（keep-alive、串流解析、退避重試）
+fetcher = _new_fetcher()
+
+
 def _fetch_csv_rows(url: str) -> List[Dict[str, str]]:
     """
-    下載 CSV → DictReader。
-    先嘗試 requests (UA 模擬 curl)，若失敗再 fallback httpx。
+    不經快取直接下載並解析（除錯/notebook 用；不可在執行中的 event loop 內呼叫）。
+    asyncio.run 每次都開新的 event loop，所以另開一個 fetcher 並在同一個 loop 內關閉，
+    不動共用連線池（它的連線屬於 server 的 loop）。
     """
-    import httpx
-
-    # 嘗試多種解碼
-    def _decode_content(content: bytes) -> str:
-        for enc in ("utf-8", "cp950", "big5", "latin-1"):
-            try:
-                return content.decode(enc)
-            except UnicodeDecodeError:
-                continue
-        # 全部失敗就回傳 binary
-        return content.decode("utf-8", errors="ignore")
 
-    # ---------- 1. 先用 requests ----------
+    async def _fetch() -> List[Dict[str, str]]:
+        own = _new_fetcher()
+        try:
+            table = (await own.fetch(url)).table
+        finally:
+            await own.aclose()
+        return table.rows() if table is not None else []
+
+    return asyncio.run(_fetch())
+
+
+# ------------------------------------------------------------
+# 資料集快取（記憶體 + 磁碟，TTL + 條件式重新驗證）
+# ------------------------------------------------------------
+DATASET_CACHE_DIR = os.getenv(
+    "DATASET_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"),
+).strip()
+DATASET_CACHE_TTL = float(os.getenv("DATASET_CACHE_TTL", str(6 * 3600)))
+DATASET_CACHE_MAX_STALE = float(os.getenv("DATASET_CACHE_MAX_STALE", str(7 * 86400)))
+# 工具回應快取（0 筆代表停用）
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "600"))
+# 離線 snapshot（--build-snapshot 產生）；檔案不存在時略過
+DATASET_SNAPSHOT = os.getenv(
+    "DATASET_SNAPSHOT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets.snapshot"),
+).strip()
+
+# ------------------------------------------------------------
+# 欄位別名：輸出欄名 → 候選欄名（依優先順序，因年版不同略有差異）
+# 每個資料表（schema）只解析一次成欄位 index，見 ColumnarTable.resolve
+# ------------------------------------------------------------
+ESG_FIELDS = {
+    "公司代號": ("公司代號", "股票代號", "StockCode"),
+    "公司名稱": ("公司名稱", "公司", "公司名稱(中)", "company", "CompanyName"),
+    "年度": ("申報年度", "年度", "Year", "year", "報告年度"),
+    "員工薪資中位數": (
+        "員工薪資中位數",
+        "薪資中位數",
+        "MedianSalary",
+        "薪資中位",
+        "非擔任主管之全時員工薪資中位數(仟元/人)",
+    ),
+    "員工薪資平均數": (
+        "員工薪資平均數",
+        "薪資平均數",
+        "AverageSalary",
+        "薪資平均",
+        "員工薪資平均數(仟元/人)",
+    ),
+    "女性主管比例": (
+        "女性主管比例",
+        "女性主管比",
+        "FemaleManagerRatio",
+        "管理職女性主管佔比",
+    ),
+}
+
+VIOLATION_FIELDS = {
+    "事業單位名稱": ("事業單位名稱或負責人", "事業單位名稱", "雇主名稱", "公司名稱", "name"),
+    "公告日期": ("公告日期", "公布日期", "處分日期", "date", "公告日"),
+    "裁處機關": ("主管機關", "裁處機關", "機關"),
+    "違反法條": ("違法法規法條", "違反法條", "法條"),
+    "違反法條內容": ("違反法規內容", "違反法條內容", "違規內容", "事實摘要"),
+    "罰鍰金額": ("罰鍰金額", "處分金額", "金額"),
+}
+
+DATASET_FIELDS = {
+    "esg": ESG_FIELDS,
+    "labor": VIOLATION_FIELDS,
+    # 性平資料集的日期欄沒有「公告日」這個別名
+    "ge": {**VIOLATION_FIELDS, "公告日期": ("公告日期", "公布日期", "處分日期", "date")},
+}
+
+COMPANY_FIELD = {"esg": "公司名稱", "labor": "事業單位名稱", "ge": "事業單位名稱"}
+VIOLATION_DATASETS = ("labor", "ge")
+
+AMOUNT_PAT = re.compile(r"\d+(?:\.\d+)?")
+# 金額的一段：數字 + 可有可無的單位（2萬5千 = 2萬 + 5千）
+AMOUNT_PART = re.compile(r"(\d+(?:\.\d+)?)\s*([萬万千仟百佰])?")
+AMOUNT_UNITS = {"萬": 10000, "万": 10000, "千": 1000, "仟": 1000, "百": 100, "佰": 100}
+
+
+def _parse_year(date: Optional[str]) -> int:
+    """公告日期 → 西元年（民國年已換算）；無法解析回傳 0。"""
+    return date_key(date)[0][0] if date else 0
+
+
+def _parse_amount(value: Optional[str]) -> int:
+    """
+    罰鍰金額字串 → 整數元；無法解析回傳 -1。
+    可能含逗號、元，以及萬/千/百單位（30,000元、3萬元、2萬5千元、2萬5000元、5千元）。
+    """
+    if not value:
+        return -1
+    s = unicodedata.normalize("NFKC", value).replace(",", "")
+    m = AMOUNT_PAT.search(s)
+    if not m:
+        return -1
+    total = 0.0  # 已完成的「萬」位數
+    part = 0.0   # 萬以下的部分
+    pos = m.start()
+    while True:
+        m = AMOUNT_PART.match(s, pos)
+        if m is None:
+            break
+        n, unit = float(m.group(1)), m.group(2)
+        pos = m.end()
+        if unit is None:
+            # 不帶單位的數字是金額的最後一段（2萬5000）
+            part += n
+            break
+        if AMOUNT_UNITS[unit] == 10000:
+            total += (part + n) * 10000
+            part = 0.0
+        else:
+            part += n * AMOUNT_UNITS[unit]
+    return int(round(total + part))
+
+
+def _resolve_fields(table: ColumnarTable, fields: Dict[str, tuple]) -> Dict[str, tuple]:
+    return {out: table.resolve(*candidates) for out, candidates in fields.items()}
+
+
+def _project(table: ColumnarTable, i: int, refs: Dict[str, tuple], include_raw: bool) -> dict:
+    item = {out: table.pick(i, ref) for out, ref in refs.items()}
+    if include_raw:
+        item["資料列原始"] = table.row(i)
+    return item
+
+
+def _build_company_index(name: str, table: ColumnarTable) -> CompanyIndex:
+    fields = DATASET_FIELDS[name]
+    if name in VIOLATION_DATASETS:
+        # 年份/罰鍰先解析成數值欄，查詢時不必再切字串
+        table.derive("year", table.resolve(*fields["公告日期"]), _parse_year, "H")
+        table.derive("fine", table.resolve(*fields["罰鍰金額"]), _parse_amount, "q")
+    index = CompanyIndex(
+        table.column(table.resolve(*fields[COMPANY_FIELD[name]])),
+        normalize=normalize_company_name,
+        case_sensitive=CASE_SENSITIVE,
+    )
+    print(f"[INFO] {name} 公司索引建立完成: {index.stats()}", file=sys.stderr)
+    return index
+
+
+def _build_aggregates(name: str, table: ColumnarTable, index: CompanyIndex) -> Optional[CompanyAggregates]:
+    if name not in VIOLATION_DATASETS:
+        return None
+    fields = DATASET_FIELDS[name]
+    aggregates = CompanyAggregates(
+        index,
+        table,
+        date_ref=table.resolve(*fields["公告日期"]),
+        article_ref=table.resolve(*fields["違反法條"]),
+    )
+    print(f"[INFO] {name} 公司彙總表建立完成: {aggregates.stats()}", file=sys.stderr)
+    return aggregates
+
+
+datasets = DatasetCache(
+    sources={"esg": ESG_URL, "labor": LAB_VIO_URL, "ge": GE_VIO_URL},
+    fetch=fetcher.fetch,
+    cache_dir=DATASET_CACHE_DIR or None,
+    ttl=DATASET_CACHE_TTL,
+    max_stale=DATASET_CACHE_MAX_STALE,
+    build_index=_build_company_index,
+    build_aggregates=_build_aggregates,
+)
+
+response_cache = ResponseCache(max_entries=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+
+def _load_snapshot() -> List[str]:
+    """把 DATASET_SNAPSHOT 的資料集放進快取；回傳成功載入的資料集名稱。"""
+    if not DATASET_SNAPSHOT or not os.path.exists(DATASET_SNAPSHOT):
+        return []
+    started = time.perf_counter()
     try:
-        resp = requests.get(
-            url,
-            timeout=HTTP_TIMEOUT,
-            headers={
-                "User-Agent": "curl/8.5.0",
-                "Accept": "text/csv,*/*;q=0.8",
-            },
-        )
-        resp.raise_for_status()
-        text = _decode_content(resp.content)
-        rows = list(csv.DictReader(io.StringIO(text)))
-        return [{(k or "").strip(): (v or "").strip() for k, v in row.items()} for row in rows]
-
-    except Exception as e_req:
-        print(f"[WARN] requests 抓取失敗，改用 httpx: {e_req}")
-
-    # ---------- 2. fallback httpx ----------
+        snap = Snapshot(DATASET_SNAPSHOT)
+        loaded = [e.name for e in snap.datasets(normalize_company_name, CASE_SENSITIVE) if datasets.install(e)]
+    except SnapshotError as e:
+        print(f"[WARN] 略過 snapshot: {e}", file=sys.stderr)
+        return []
+    print(
+        f"[INFO] 由 snapshot 載入 {loaded}（{(time.perf_counter() - started) * 1000:.1f}ms，"
+        f"建立於 {_iso_time(snap.created_at)}）",
+        file=sys.stderr,
+    )
+    return loaded
+
+
+async def _build_snapshot(path: str) -> dict:
+    """向所有來源重新驗證（必要時下載）後寫成 snapshot。"""
     try:
-        with httpx.Client(
-            http2=False,
-            timeout=HTTP_TIMEOUT,
-            headers={
-                "User-Agent": "curl/8.5.0",
-                "Accept": "text/csv,*/*;q=0.8",
-            },
-            transport=httpx.HTTPTransport(local_address="0.0.0.0")
-        ) as client:
-            resp = client.get(url)
-            resp.raise_for_status()
-            text = _decode_content(resp.content)
-            rows = list(csv.DictReader(io.StringIO(text)))
-            return [{(k or "").strip(): (v or "").strip() for k, v in row.items()} for row in rows]
-
-    except Exception as e_httpx:
-        raise RuntimeError(f"requests + httpx 都無法抓取 {url}: {e_httpx}")
+        entries = await asyncio.gather(*(datasets.refresh(n, force=True) for n in datasets.sources))
+        return await asyncio.to_thread(write_snapshot, path, entries)
+    finally:
+        await fetcher.aclose()
+
+
+def _with_cache_meta(result, hit: bool, age: Optional[float] = None):
+    # 快取內保存原始回應；每次回傳都另外複製一份再加上 meta.cache
+    if not isinstance(result, dict):
+        return result
+    out = dict(result)
+    meta = dict(out.get("meta") or {})
+    meta["cache"] = {
+        "hit": hit,
+        "age_seconds": round(age, 1) if age is not None else None,
+        "hits": response_cache.hits,
+        "misses": response_cache.misses,
+    }
+    out["meta"] = meta
+    return out
+
+
+def _cached_tool(*dataset_names: str):
+    """
+    工具回應快取；dataset_names 為工具依賴的資料集，其版本是 key 的一部分。
+    資料集還不在記憶體（冷啟動，可能是邊下載邊回傳的結果）時不快取。
+    """
+
+    def decorator(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            loaded = [datasets.peek(n) for n in dataset_names]
+            if not response_cache.enabled or any(ds is None for ds in loaded):
+                return await fn(*args, **kwargs)
+
+            versions = {ds.name: ds.version for ds in loaded}
+            response_cache.observe(versions)
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = response_cache.key(fn.__name__, bound.arguments, versions)
+            cached = response_cache.get(key)
+            if cached is not None:
+                age, result = cached
+                return _with_cache_meta(result, hit=True, age=age)
+
+            result = await fn(*args, **kwargs)
+            if isinstance(result, dict) and "error" not in result:
+                response_cache.put(key, dataset_names, result)
+            return _with_cache_meta(result, hit=False)
+
+        return wrapper
+
+    return decorator
 
 
 def _match_company(row_value: str, user_input: str) -> bool:
@@ -163,6 +424,92 @@ def _pick(d: Dict[str, str], *candidates: str) -> Optional[str]:
     return None
 
 
+# accept(table, refs, 列號)：公司比對之外的條件（年度等）
+RowFilter = Callable[[ColumnarTable, Dict[str, tuple], int], bool]
+
+
+async def _query(
+    name: str,
+    find: Callable[[CompanyIndex], List[int]],
+    matches: Callable[[str], bool],
+    accept: RowFilter,
+    limit: int,
+    include_raw: bool,
+) -> Tuple[List[dict], Optional[CachedDataset]]:
+    """
+    查詢資料集，回傳 (items, ds)。
+    find: 有索引時用索引找出候選列；matches: 冷啟動逐列掃描時的公司比對（與 find 同語意）。
+    ds 為 None 代表結果來自邊下載邊掃描，湊滿 limit 筆即提早回傳（下載仍在背景完成）。
+    """
+    src = await datasets.get_or_follow(name)
+    if isinstance(src, LoadProgress):
+        try:
+            return await _scan_stream(name, src, matches, accept, limit, include_raw), None
+        except StreamUnavailable:
+            src = await datasets.get(name)
+
+    table = src.table
+    refs = _resolve_fields(table, DATASET_FIELDS[name])
+    out: List[dict] = []
+    for i in find(src.index):
+        if not accept(table, refs, i):
+            continue
+        out.append(_project(table, i, refs, include_raw))
+        if len(out) >= limit:
+            break
+    return out, src
+
+
+async def _scan_stream(
+    name: str,
+    progress: LoadProgress,
+    matches: Callable[[str], bool],
+    accept: RowFilter,
+    limit: int,
+    include_raw: bool,
+) -> List[dict]:
+    out: List[dict] = []
+    if limit <= 0:
+        return out
+    view = None
+    async with aclosing(progress.follow()) as rows:
+        async for table, i in rows:
+            if table is not view:
+                view = table
+                refs = _resolve_fields(table, DATASET_FIELDS[name])
+                company_ref = refs[COMPANY_FIELD[name]]
+            comp = table.pick(i, company_ref)
+            if not comp or not matches(comp) or not accept(table, refs, i):
+                continue
+            out.append(_project(table, i, refs, include_raw))
+            if len(out) >= limit:
+                break
+    return out
+
+
+def _count_by_year(items: List[dict]) -> Dict[str, int]:
+    by_year: Dict[str, int] = {}
+    for item in items:
+        date = item["公告日期"]
+        if date:
+            y = date_year(date)
+            by_year[y] = by_year.get(y, 0) + 1
+    return by_year
+
+
+def _source_meta(ds: Optional[CachedDataset]) -> dict:
+    """fetched_at / dataset_version；串流結果還沒有版本（下載未完成）。"""
+    if ds is None:
+        return {"fetched_at": _iso_now(), "dataset_version": None}
+    return {"fetched_at": _iso_time(ds.validated_at), "dataset_version": ds.version}
+
+
+def _index_meta(ds: Optional[CachedDataset]) -> dict:
+    if ds is None:
+        return {"streamed": True, "index": None}
+    return {"index": ds.index.stats()}
+
+
 # ------------------------------------------------------------
 # Tool 1: esg_hr（ESG 人力發展）
 #   來源：t187ap46_O_5.csv
@@ -171,69 +518,50 @@ def _pick(d: Dict[str, str], *candidates: str) -> Optional[str]:
 #   - 員工薪資中位數/薪資中位數, 員工薪資平均數/薪資平均數
 #   - 女性主管比例/女性主管比, 福利（視資料而定）
 # ------------------------------------------------------------
-@mcp.tool()
-def esg_hr(company: str, year: Optional[int] = None, limit: int = 50) -> dict:
+@mcp.tool(annotations=READ_ONLY)
+@_cached_tool("esg")
+async def esg_hr(
+    company: str,
+    year: Optional[int] = None,
+    limit: int = 50,
+    include_raw: Optional[bool] = None,
+) -> dict:
     """
-    查 ESG 人力發展（薪資/福利/女性主管比等）。會即時抓取 CSV，於工具內 ETL 後回傳。
+    查 ESG 人力發展（薪資/福利/女性主管比等）。資料來自快取的官方 CSV，於工具內 ETL 後回傳。
     Args:
       company: 公司名稱（可含股份有限公司等尾綴）
       year: 指定年度（可省略）
       limit: 最多回傳筆數
+      include_raw: 是否附上原始資料列（預設依 INCLUDE_RAW_ROW）
     Returns: dict(items=[...], source_url, fetched_at, meta)
     """
-    rows = _fetch_csv_rows(ESG_URL)
-    out: List[Dict[str, str | float | int]] = []
+    raw = INCLUDE_RAW_ROW if include_raw is None else include_raw
 
-    for r in rows:
-        comp = _pick(r, "公司名稱", "公司", "公司名稱(中)", "company", "CompanyName")
-        if not comp:
-            continue
-        if not _match_company(comp, company):
-            continue
+    def accept(table: ColumnarTable, refs: Dict[str, tuple], i: int) -> bool:
+        return year is None or str(year) == str(table.pick(i, refs["年度"]))
 
-        y = _pick(r, "申報年度", "年度", "Year", "year", "報告年度")
-        if year is not None and (str(year) != str(y)):
-            continue
-
-        item = {
-            "公司代號": _pick(r, "公司代號", "股票代號", "StockCode"),
-            "公司名稱": comp,
-            "年度": y,
-            "員工薪資中位數": _pick(
-                r,
-                "員工薪資中位數",
-                "薪資中位數",
-                "MedianSalary",
-                "薪資中位",
-                "非擔任主管之全時員工薪資中位數(仟元/人)",
-            ),
-            "員工薪資平均數": _pick(
-                r,
-                "員工薪資平均數",
-                "薪資平均數",
-                "AverageSalary",
-                "薪資平均",
-                "員工薪資平均數(仟元/人)",
-            ),
-            "女性主管比例": _pick(
-                r,
-                "女性主管比例",
-                "女性主管比",
-                "FemaleManagerRatio",
-                "管理職女性主管佔比",
-            ),
-            "資料列原始": r,
-        }
-        out.append(item)
-        if len(out) >= limit:
-            break
+    # 索引已套用 _match_company 的比對語意，只需走訪命中的列
+    out, ds = await _query(
+        "esg",
+        find=lambda index: index.rows_for(index.match(company, partial=PARTIAL_MATCH)),
+        matches=lambda comp: _match_company(comp, company),
+        accept=accept,
+        limit=limit,
+        include_raw=raw,
+    )
 
     return {
         "items": out,
         "count": len(out),
         "source_url": ESG_URL,
-        "fetched_at": _iso_now(),
-        "meta": {"query": company, "year": year, "partial_match": PARTIAL_MATCH},
+        **_source_meta(ds),
+        "meta": {
+            "query": company,
+            "year": year,
+            "partial_match": PARTIAL_MATCH,
+            "include_raw": raw,
+            **_index_meta(ds),
+        },
     }
 
 
@@ -243,60 +571,55 @@ def esg_hr(company: str, year: Optional[int] = None, limit: int = 50) -> dict:
 #   推測欄位：
 #   - 事業單位名稱, 所在縣市, 違反法條, 違反法條內容, 公告日期, 裁處機關, 罰鍰金額
 # ------------------------------------------------------------
-@mcp.tool()
-def labor_violations(company: str, since_year: Optional[int] = None, limit: int = 50) -> dict:
+@mcp.tool(annotations=READ_ONLY)
+@_cached_tool("labor")
+async def labor_violations(
+    company: str,
+    since_year: Optional[int] = None,
+    limit: int = 50,
+    include_raw: Optional[bool] = None,
+) -> dict:
     """
     查勞動部違反勞基法紀錄（官方彙總）。
     Args:
       company: 事業單位名稱（可用部分關鍵字）
-      since_year: 公告日期的年份 >= since_year 才算
+      since_year: 公告日期的西元年份 >= since_year 才算（民國年會先換算）
       limit: 最多回傳筆數
+      include_raw: 是否附上原始資料列（預設依 INCLUDE_RAW_ROW）
     """
-    rows = _fetch_csv_rows(LAB_VIO_URL)
-    out: List[Dict[str, str]] = []
-    by_year: Dict[str, int] = {}
-
-    for r in rows:
-        comp = _pick(r, "事業單位名稱或負責人", "事業單位名稱", "雇主名稱", "公司名稱", "name")
-        if not comp:
-            continue
-
-        # 支援部分關鍵字比對（公司名包含即可）
-        if company not in comp:
-            continue
-
-        # 公告日期
-        date = _pick(r, "公告日期", "公布日期", "處分日期", "date", "公告日")
-        y = (date or "")[:4]
-
-        # 年份過濾
-        if since_year is not None and (not y.isdigit() or int(y) < int(since_year)):
-            continue
-
-        item = {
-            "事業單位名稱": comp,
-            "公告日期": date,
-            "裁處機關": _pick(r, "主管機關", "裁處機關", "機關"),
-            "違反法條": _pick(r, "違法法規法條", "違反法條", "法條"),
-            "違反法條內容": _pick(r, "違反法規內容", "違反法條內容", "違規內容", "事實摘要"),
-            "罰鍰金額": _pick(r, "罰鍰金額", "處分金額", "金額"),
-            "資料列原始": r,
-        }
-        out.append(item)
-
-        if y:
-            by_year[y] = by_year.get(y, 0) + 1
-
-        if len(out) >= limit:
-            break
+    raw = INCLUDE_RAW_ROW if include_raw is None else include_raw
+
+    def accept(table: ColumnarTable, refs: Dict[str, tuple], i: int) -> bool:
+        if since_year is None:
+            return True
+        # 年份過濾（有索引時用數值欄；0 代表公告日期無法解析）
+        years = table.numeric.get("year")
+        y = years[i] if years is not None else _parse_year(table.pick(i, refs["公告日期"]))
+        return y != 0 and y >= int(since_year)
+
+    # 索引查詢等同「company in 公司名」，只走訪命中的列
+    out, ds = await _query(
+        "labor",
+        find=lambda index: index.rows_for(index.contains(company)),
+        matches=lambda comp: company in comp,
+        accept=accept,
+        limit=limit,
+        include_raw=raw,
+    )
 
     return {
         "items": out,
         "count": len(out),
-        "stats": {"count_by_year": by_year},
+        "stats": {"count_by_year": _count_by_year(out)},
         "source_url": LAB_VIO_URL,
-        "fetched_at": _iso_now(),
-        "meta": {"query": company, "since_year": since_year, "partial_match": True},
+        **_source_meta(ds),
+        "meta": {
+            "query": company,
+            "since_year": since_year,
+            "partial_match": True,
+            "include_raw": raw,
+            **_index_meta(ds),
+        },
     }
 
 
@@ -306,61 +629,246 @@ def labor_violations(company: str, since_year: Optional[int] = None, limit: int
 #   常見欄位：
 #   - 事業單位名稱, 違反法條, 違反法條內容, 公告日期, 裁處機關
 # ------------------------------------------------------------
-@mcp.tool()
-def ge_work_equality_violations(
-    company: str, since_year: Optional[int] = None, limit: int = 50) -> dict:
+@mcp.tool(annotations=READ_ONLY)
+@_cached_tool("ge")
+async def ge_work_equality_violations(
+    company: str,
+    since_year: Optional[int] = None,
+    limit: int = 50,
+    include_raw: Optional[bool] = None,
+) -> dict:
     """
     查性平工作法違規紀錄（官方彙總）。
     Args:
       company: 公司名稱或關鍵字
       since_year: 公告日期包含該年份字串 (ex: 2025)
       limit: 最多回傳筆數
+      include_raw: 是否附上原始資料列（預設依 INCLUDE_RAW_ROW）
     """
-    rows = _fetch_csv_rows(GE_VIO_URL)
-    out: List[Dict[str, str]] = []
-    by_year: Dict[str, int] = {}
+    raw = INCLUDE_RAW_ROW if include_raw is None else include_raw
 
-    for r in rows:
-        # ⚡ 修正公司欄位
-        comp = _pick(r, "事業單位名稱或負責人", "事業單位名稱", "雇主名稱", "公司名稱", "name")
-        if not comp:
-            continue
+    def accept(table: ColumnarTable, refs: Dict[str, tuple], i: int) -> bool:
+        # ⚡ 改為「字串包含」模式
+        return since_year is None or str(since_year) in (table.pick(i, refs["公告日期"]) or "")
+
+    # 索引查詢等同「company in 公司名」，只走訪命中的列
+    out, ds = await _query(
+        "ge",
+        find=lambda index: index.rows_for(index.contains(company)),
+        matches=lambda comp: company in comp,
+        accept=accept,
+        limit=limit,
+        include_raw=raw,
+    )
 
-        # ⚡ 改用模糊比對
-        if company not in comp:
-            continue
+    return {
+        "items": out,
+        "count": len(out),
+        "stats": {"count_by_year": _count_by_year(out)},
+        "source_url": GE_VIO_URL,
+        **_source_meta(ds),
+        "meta": {
+            "query": company,
+            "since_year": since_year,
+            "partial_match": True,
+            "include_raw": raw,
+            **_index_meta(ds),
+        },
+    }
 
-        date = _pick(r, "公告日期", "公布日期", "處分日期", "date")
-        y = (date or "")[:4]
 
-        # ⚡ 改為「字串包含」模式
-        if since_year is not None and str(since_year) not in (date or ""):
+# ------------------------------------------------------------
+# Tool 4: violation_summary（違規彙總，不回傳原始資料列）
+#   資料集載入時已依正規化公司名稱彙總，查詢為 O(1) 查表
+# ------------------------------------------------------------
+@mcp.tool(annotations=READ_ONLY)
+@_cached_tool(*VIOLATION_DATASETS)
+async def violation_summary(company: str, dataset: Optional[str] = None) -> dict:
+    """
+    查公司在違規資料集中的完整彙總：各年度件數、罰鍰總額、違反法條、最近一次公告日期。
+    統計涵蓋全部紀錄（不受 limit 影響），公司名稱以正規化後精確比對（忽略股份有限公司等尾綴）。
+    Args:
+      company: 公司名稱
+      dataset: labor（勞基法）/ ge（性平工作法）；省略則兩者都查
+    """
+    names = [dataset] if dataset else list(VIOLATION_DATASETS)
+    if any(n not in VIOLATION_DATASETS for n in names):
+        return {"error": f"未知的違規資料集: {dataset}", "datasets": list(VIOLATION_DATASETS)}
+
+    loaded = await asyncio.gather(*(datasets.get(n) for n in names))
+    out: Dict[str, dict] = {}
+    for name, ds in zip(names, loaded):
+        aggregates: CompanyAggregates = ds.aggregates
+        agg = aggregates.lookup(company)
+        result = {
+            "found": agg is not None,
+            "summary": agg.to_dict() if agg is not None else None,
+            "source_url": ds.url,
+            "fetched_at": _iso_time(ds.validated_at),
+            "dataset_version": ds.version,
+        }
+        if agg is None:
+            # 查無精確名稱時，提供包含關鍵字的公司名稱供下一次查詢
+            result["suggestions"] = [ds.index.names[nid] for nid in ds.index.contains(company)[:5]]
+        out[name] = result
+
+    return {"query": company, "datasets": out, "checked_at": _iso_now()}
+
+
+# ------------------------------------------------------------
+# Tool 5: company_profile_batch（多家公司一次查完三個資料集）
+#   取代「每家公司 × 每個資料集」各一次 tool call；只走索引與彙總表
+# ------------------------------------------------------------
+def _violation_profile(ds: CachedDataset, company: str) -> dict:
+    aggregates: CompanyAggregates = ds.aggregates
+    agg = aggregates.lookup(company)
+    # 正規化名稱查不到時退回關鍵字包含（與 labor_violations 相同語意）
+    aggs = [agg] if agg is not None else aggregates.for_names(ds.index.contains(company))
+    return {"found": bool(aggs), "summary": merge_aggregates(aggs)}
+
+
+def _esg_profile(ds: CachedDataset, company: str, year: Optional[int], limit: int) -> dict:
+    index: CompanyIndex = ds.index
+    table: ColumnarTable = ds.table
+    refs = _resolve_fields(table, ESG_FIELDS)
+    name_ids = index.match(company, partial=PARTIAL_MATCH)
+    items: List[dict] = []
+    for i in index.rows_for(name_ids):
+        if year is not None and str(year) != str(table.pick(i, refs["年度"])):
             continue
+        items.append(_project(table, i, refs, False))
+        if len(items) >= limit:
+            break
+    return {"found": bool(items), "items": items, "count": len(items)}
+
 
-        item = {
-            "事業單位名稱": comp,
-            "公告日期": date,
-            "裁處機關": _pick(r, "主管機關", "裁處機關", "機關"),
-            "違反法條": _pick(r, "違法法規法條", "違反法條", "法條"),
-            "違反法條內容": _pick(r, "違反法規內容", "違反法條內容", "違規內容", "事實摘要"),
-            "罰鍰金額": _pick(r, "罰鍰金額", "處分金額", "金額"),
-            "資料列原始": r,
+@mcp.tool(annotations=READ_ONLY)
+@_cached_tool("esg", "labor", "ge")
+async def company_profile_batch(
+    companies: List[str],
+    year: Optional[int] = None,
+    limit: int = 5,
+) -> dict:
+    """
+    一次查多家公司的 ESG 人力發展與勞基法/性平工作法違規彙總（比較多家雇主時使用）。
+    違規部分回傳全部紀錄的彙總（件數、各年度、罰鍰、違反法條、最近日期），不附原始資料列。
+    Args:
+      companies: 公司名稱清單（重複者只查一次）
+      year: ESG 指定年度（可省略）
+      limit: 每家公司最多回傳幾筆 ESG 資料
+    """
+    queries = list(dict.fromkeys(c.strip() for c in companies if c and c.strip()))
+    skipped = queries[BATCH_MAX_COMPANIES:]
+    queries = queries[:BATCH_MAX_COMPANIES]
+
+    esg, labor, ge = await asyncio.gather(*(datasets.get(n) for n in ("esg", "labor", "ge")))
+    profiles = [
+        {
+            "company": q,
+            "esg_hr": _esg_profile(esg, q, year, limit),
+            "labor_violations": _violation_profile(labor, q),
+            "ge_work_equality_violations": _violation_profile(ge, q),
         }
-        out.append(item)
+        for q in queries
+    ]
 
-        if y:
-            by_year[y] = by_year.get(y, 0) + 1
+    return {
+        "profiles": profiles,
+        "count": len(profiles),
+        "sources": {
+            name: {
+                "source_url": ds.url,
+                "fetched_at": _iso_time(ds.validated_at),
+                "dataset_version": ds.version,
+            }
+            for name, ds in (("esg", esg), ("labor", labor), ("ge", ge))
+        },
+        "meta": {
+            "year": year,
+            "partial_match": PARTIAL_MATCH,
+            "max_companies": BATCH_MAX_COMPANIES,
+            "skipped": skipped,
+        },
+    }
 
-        if len(out) >= limit:
-            break
 
+# ------------------------------------------------------------
+# Tool 6: resolve_company（公司名稱模糊解析）
+#   以三個資料集的公司名稱聯集建 n-gram TF-IDF；任一資料集版本變動才重建
+# ------------------------------------------------------------
+_resolver: Optional[CompanyResolver] = None
+_resolver_versions: Optional[tuple] = None
+
+
+async def _company_resolver() -> CompanyResolver:
+    global _resolver, _resolver_versions
+    loaded = await asyncio.gather(*(datasets.get(n) for n in datasets.sources))
+    versions = tuple(ds.version for ds in loaded)
+    if _resolver is None or _resolver_versions != versions:
+        sources = {
+            ds.name: [(n, len(rows)) for n, rows in zip(ds.index.names, ds.index.rows_by_name)]
+            for ds in loaded
+        }
+        _resolver = await asyncio.to_thread(CompanyResolver, sources, normalize_company_name)
+        _resolver_versions = versions
+        print(f"[INFO] 公司名稱解析器建立完成: {_resolver.stats()}", file=sys.stderr)
+    return _resolver
+
+
+@mcp.tool(annotations=READ_ONLY)
+@_cached_tool("esg", "labor", "ge")
+async def resolve_company(name: str, top_k: int = 5, min_score: float = 0.2) -> dict:
+    """
+    把使用者輸入的公司名稱（簡稱、全形/半形、台/臺、分公司、英文尾綴等寫法）對應到資料集裡的標準公司名稱。
+    查詢其他工具前可先用此工具取得正確名稱。
+    Args:
+      name: 使用者輸入的公司名稱
+      top_k: 最多回傳幾個候選
+      min_score: 相似度下限（0~1；1 代表正規化後完全相同）
+    Returns: dict(candidates=[{name, score, datasets, variants}], meta)
+    """
+    resolver = await _company_resolver()
+    started = time.perf_counter()
+    candidates = resolver.resolve(name, top_k=max(1, top_k), min_score=min_score)
     return {
-        "items": out,
-        "count": len(out),
-        "stats": {"count_by_year": by_year},
-        "source_url": GE_VIO_URL,
-        "fetched_at": _iso_now(),
-        "meta": {"query": company, "since_year": since_year, "partial_match": True},
+        "query": name,
+        "candidates": candidates,
+        "meta": {
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+            "resolver": resolver.stats(),
+        },
+    }
+
+
+# ------------------------------------------------------------
+# Tool 7: invalidate_dataset_cache（手動清除快取，僅供管理者）
+# ------------------------------------------------------------
+@mcp.tool(annotations=ADMIN_DESTRUCTIVE)
+async def invalidate_dataset_cache(dataset: Optional[str] = None) -> dict:
+    """
+    清除資料集快取，下次查詢會重新下載。
+    管理用：所有 client 共用同一份快取，不要開放給 LLM agent。
+    Args:
+      dataset: esg / labor / ge；省略則全部清除
+    """
+    try:
+        cleared = await datasets.invalidate(dataset)
+    except KeyError as e:
+        return {"error": str(e), "datasets": list(datasets.sources)}
+    responses = response_cache.invalidate(set(cleared))
+    return {"cleared": cleared, "cleared_responses": responses, "invalidated_at": _iso_now()}
+
+
+# ------------------------------------------------------------
+# Tool 8: dataset_status（快取與索引狀態，供 telemetry 觀察）
+# ------------------------------------------------------------
+@mcp.tool(annotations=READ_ONLY)
+def dataset_status() -> dict:
+    """回傳各資料集的快取版本、資料年齡、公司索引/彙總表大小與建置時間，以及工具回應快取命中率。"""
+    return {
+        "datasets": datasets.status(),
+        "response_cache": response_cache.stats(),
+        "checked_at": _iso_now(),
     }
 
 # ------------------------------------------------------------
@@ -374,8 +882,16 @@ if __name__ == "__main__":
     parser.add_argument("--transport", type=str, default=None,
                         choices=["stdio", "http", "sse"],
                         help="Override transport explicitly")
+    parser.add_argument("--build-snapshot", type=str, nargs="?", const=DATASET_SNAPSHOT, default=None,
+                        metavar="PATH",
+                        help=f"Download all datasets, write an offline snapshot and exit (default: {DATASET_SNAPSHOT})")
     args = parser.parse_args()
 
+    if args.build_snapshot:
+        info = asyncio.run(_build_snapshot(args.build_snapshot))
+        print(json.dumps(info, ensure_ascii=False, indent=2))
+        sys.exit(0)
+
     # 優先用 --transport；其次，如果有 --http，就用 http
     if args.transport:
         if args.transport == "stdio":
@@ -0,0 +1,285 @@
+# job-guardian/mcp_server/snapshot.py
+# 離線資料集 snapshot：把所有資料集（欄式資料 + 預建公司索引）寫成單一檔案，
+# server 啟動時以 mmap 載入，不必等政府網站。
+# 檔案格式：
+#   MAGIC(8) | manifest 長度(u64) | manifest JSON | 對齊 8 bytes 的陣列區
+# - manifest 只放中繼資料（來源、版本、欄名、各區段位置）
+# - 代碼/數值欄位/列號/倒排表等整數陣列放在陣列區，載入時直接以 memoryview 指向 mmap，
+#   多個 server process 共用同一份 page cache
+# - 字串表（欄位值、公司名稱）也放在陣列區：offsets 陣列 + UTF-8 blob，第一次讀到某個字串時才解碼
+# - gram 與 exact 查詢表必須是 Python dict，載入時由陣列區的字串表重建（每個 process 各一份）
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence
+
+from columnar import ColumnarTable
+from company_index import CompanyIndex, SubstringIndex
+from dataset_cache import CachedDataset
+
+MAGIC = b"JGSNAP01"
+# 3：衍生的 year 欄改為解析後的西元年（民國年日期原本存成 0）
+FORMAT_VERSION = 3
+_HEADER = struct.Struct("<8sQ")
+
+
+class SnapshotError(ValueError):
+    """snapshot 檔案不存在、格式不符或與目前平台不相容。"""
+
+
+# ------------------------------------------------------------
+# 寫入
+# ------------------------------------------------------------
+class _ArrayArea:
+    def __init__(self):
+        self.buf = bytearray()
+
+    def add(self, data: Sequence[int], typecode: str) -> dict:
+        if not isinstance(data, array) or data.typecode != typecode:
+            data = array(typecode, data)
+        self.buf.extend(b"\0" * (-len(self.buf) % 8))
+        section = {"offset": len(self.buf), "count": len(data), "type": typecode}
+        self.buf.extend(data.tobytes())
+        return section
+
+    def add_lists(self, lists: Sequence[Sequence[int]]) -> dict:
+        """多個整數 list 攤平成 flat + offsets（len(lists) + 1）。"""
+        offsets = array("I", [0])
+        flat = array("I")
+        for lst in lists:
+            flat.extend(lst)
+            offsets.append(len(flat))
+        return {"offsets": self.add(offsets, "I"), "flat": self.add(flat, "I")}
+
+    def add_strings(self, strings: Sequence[str]) -> dict:
+        """字串表攤平成 UTF-8 blob + byte offsets（len(strings) + 1）。"""
+        offsets = array("I", [0])
+        blob = bytearray()
+        for text in strings:
+            blob.extend(text.encode("utf-8"))
+            offsets.append(len(blob))
+        return {"offsets": self.add(offsets, "I"), "blob": self.add(blob, "B")}
+
+
+def _table_parts(table: ColumnarTable, area: _ArrayArea) -> dict:
+    return {
+        "columns": list(table.columns),
+        "values": [area.add_strings(vals) for vals in table.values],
+        "codes": [area.add(c, "I") for c in table.codes],
+        "numeric": {
+            name: area.add(a, a.typecode if isinstance(a, array) else a.format)
+            for name, a in table.numeric.items()
+        },
+    }
+
+
+def _sub_parts(sub: SubstringIndex, area: _ArrayArea) -> dict:
+    grams = list(sub.postings)
+    return {"grams": area.add_strings(grams), **area.add_lists([sub.postings[g] for g in grams])}
+
+
+def _index_parts(index: CompanyIndex, area: _ArrayArea) -> dict:
+    subs = {"raw": _sub_parts(index.raw_sub, area), "norm": _sub_parts(index.norm_sub, area)}
+    # 區分大小寫時 folded_sub 就是 raw_sub，不重複寫入
+    if index.folded_sub is not index.raw_sub:
+        subs["folded"] = _sub_parts(index.folded_sub, area)
+    return {
+        "case_sensitive": index.case_sensitive,
+        "build_ms": index.build_ms,
+        "row_count": index.row_count,
+        "names": area.add_strings(index.names),
+        "folded": area.add_strings(index.folded),
+        "normalized": area.add_strings(index.normalized),
+        "exact": {"keys": area.add_strings(list(index.exact)), **area.add_lists(list(index.exact.values()))},
+        "rows": area.add_lists(index.rows_by_name),
+        "subs": subs,
+    }
+
+
+def write_snapshot(path: str, entries: Sequence[CachedDataset]) -> dict:
+    """寫入 snapshot（先寫暫存檔再 rename）；回傳各資料集的摘要。"""
+    area = _ArrayArea()
+    manifest = {
+        "format": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "created_at": time.time(),
+        "datasets": [],
+    }
+    for entry in entries:
+        manifest["datasets"].append({
+            "name": entry.name,
+            "url": entry.url,
+            "version": entry.version,
+            "validated_at": entry.validated_at,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "table": _table_parts(entry.table, area),
+            "index": _index_parts(entry.index, area) if isinstance(entry.index, CompanyIndex) else None,
+        })
+
+    body = json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    head = _HEADER.pack(MAGIC, len(body)) + body
+    head += b"\0" * (-len(head) % 8)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(head)
+        f.write(area.buf)
+    os.replace(tmp, path)
+    return {
+        "path": path,
+        "bytes": len(head) + len(area.buf),
+        "datasets": {e.name: {"rows": len(e.table), "version": e.version} for e in entries},
+    }
+
+
+# ------------------------------------------------------------
+# 載入
+# ------------------------------------------------------------
+class _StringTable(Sequence[str]):
+    """
+    mmap 上的唯讀字串表，可當 list[str] 使用。
+    blob 與 offsets 由各 process 共用；字串在第一次讀取時解碼，之後留在本 process 的快取。
+    """
+
+    __slots__ = ("_offsets", "_blob", "_cache")
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+        self._cache: List[Optional[str]] = [None] * (len(offsets) - 1)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        text = self._cache[i]
+        if text is None:
+            if i < 0:
+                i += len(self._cache)
+            text = self._cache[i] = str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+        return text
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        """mmap 上佔用的大小（不含已解碼的快取）。"""
+        return self._blob.nbytes + self._offsets.nbytes
+
+
+class Snapshot:
+    """以 mmap 開啟的 snapshot；datasets() 產生可直接放進 DatasetCache 的 CachedDataset。"""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"無法開啟 snapshot {path}: {e}") from e
+
+        if len(self._mmap) < _HEADER.size:
+            raise SnapshotError(f"{path} 不是 snapshot 檔")
+        magic, length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} 不是 snapshot 檔")
+        try:
+            self.manifest = json.loads(self._mmap[_HEADER.size:_HEADER.size + length])
+        except ValueError as e:
+            raise SnapshotError(f"{path} manifest 損毀: {e}") from e
+        if self.manifest.get("format") != FORMAT_VERSION:
+            raise SnapshotError(f"{path} 格式版本 {self.manifest.get('format')} 不支援")
+        if self.manifest.get("byteorder") != sys.byteorder:
+            raise SnapshotError(f"{path} 的位元組順序與本機不同")
+
+        start = _HEADER.size + length
+        start += -start % 8
+        self._data = memoryview(self._mmap)[start:]
+        self.created_at = float(self.manifest.get("created_at", 0))
+
+    def _array(self, section: dict) -> memoryview:
+        typecode = section["type"]
+        size = array(typecode).itemsize
+        begin = section["offset"]
+        return self._data[begin:begin + section["count"] * size].cast(typecode)
+
+    def _lists(self, parts: dict) -> List[memoryview]:
+        offsets = self._array(parts["offsets"])
+        flat = self._array(parts["flat"])
+        return [flat[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    def _strings(self, parts: dict) -> _StringTable:
+        return _StringTable(self._array(parts["offsets"]), self._array(parts["blob"]))
+
+    def _table(self, parts: dict) -> ColumnarTable:
+        table = ColumnarTable(
+            parts["columns"],
+            [self._strings(v) for v in parts["values"]],
+            [self._array(s) for s in parts["codes"]],
+        )
+        for name, section in parts["numeric"].items():
+            table.numeric[name] = self._array(section)
+        return table
+
+    def _sub(self, texts: Sequence[str], parts: dict) -> SubstringIndex:
+        return SubstringIndex.from_postings(texts, dict(zip(self._strings(parts["grams"]), self._lists(parts))))
+
+    def _index(self, parts: dict, normalize: Callable[[str], str]) -> CompanyIndex:
+        names = self._strings(parts["names"])
+        folded_names = self._strings(parts["folded"])
+        normalized = self._strings(parts["normalized"])
+        raw = self._sub(names, parts["subs"]["raw"])
+        folded = self._sub(folded_names, parts["subs"]["folded"]) if "folded" in parts["subs"] else raw
+        exact = parts["exact"]
+        return CompanyIndex.from_parts(
+            names=names,
+            rows_by_name=self._lists(parts["rows"]),
+            folded=folded_names,
+            normalized=normalized,
+            exact=dict(zip(self._strings(exact["keys"]), self._lists(exact))),
+            subs={"raw": raw, "folded": folded, "norm": self._sub(normalized, parts["subs"]["norm"])},
+            normalize=normalize,
+            case_sensitive=parts["case_sensitive"],
+            row_count=parts["row_count"],
+            build_ms=parts["build_ms"],
+        )
+
+    def datasets(
+        self,
+        normalize: Callable[[str], str],
+        case_sensitive: Optional[bool] = None,
+    ) -> List[CachedDataset]:
+        """
+        normalize: 公司名稱正規化函式（不存在檔案裡）
+        case_sensitive: 與建檔時不同時捨棄預建索引（由 DatasetCache 重建）
+        """
+        out = []
+        for ds in self.manifest["datasets"]:
+            parts = ds.get("index")
+            index = None
+            if parts is not None and (case_sensitive is None or parts["case_sensitive"] == case_sensitive):
+                index = self._index(parts, normalize)
+            out.append(CachedDataset(
+                name=ds["name"],
+                url=ds["url"],
+                table=self._table(ds["table"]),
+                version=ds.get("version", ""),
+                validated_at=float(ds.get("validated_at", 0)),
+                etag=ds.get("etag"),
+                last_modified=ds.get("last_modified"),
+                loaded_from="snapshot",
+                index=index,
+            ))
+        return out
@@ -0,0 +1,89 @@
+"""
+MCPActivityExporter 吞吐量測試（spans/sec）。
+
+    python -m telemetry.bench_exporter --spans 20000 --batch 512
+
+用真實的 ReadableSpan 模擬 BatchSpanProcessor 的批次呼叫，分別量測
+檔案 + broadcaster、再加上限速終端輸出、以及終端輸出不限速時的吞吐量。
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+from rich.console import Console
+
+from telemetry.broadcaster import TelemetryBroadcaster
+from telemetry.exporter import BroadcastSink, ConsoleSink, FileSink, MCPActivityExporter
+
+SPAN_NAMES = (
+    "receive_prompt",
+    "MCPAggregator.call_tool",
+    "MCPAgentClientSession.send_request",
+    "execute_llm_generation",
+    "format_response",
+    "load_servers",  # 會被過濾掉
+)
+
+
+class _Collect(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+
+def make_spans(n: int):
+    collector = _Collect()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(collector))
+    tracer = provider.get_tracer("bench")
+    for i in range(n):
+        with tracer.start_as_current_span(SPAN_NAMES[i % len(SPAN_NAMES)]) as span:
+            span.set_attribute("company", "台積電")
+            span.set_attribute("tool", "get_company_violations")
+            span.set_attribute("arg.query", "請問台積電有沒有違反勞基法的紀錄？" * 2)
+            span.set_attribute("rows", i)
+    return collector.spans
+
+
+def run(exporter, spans, batch: int) -> float:
+    started = time.perf_counter()
+    for i in range(0, len(spans), batch):
+        exporter.export(spans[i:i + batch])
+    exporter.shutdown()
+    return len(spans) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spans", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=512)
+    args = parser.parse_args()
+
+    spans = make_spans(args.spans)
+    quiet = Console(file=io.StringIO(), force_terminal=True, width=120)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mcp-activity.log")
+        cases = {
+            "file + broadcast": lambda: [FileSink(path), BroadcastSink(TelemetryBroadcaster())],
+            "file + broadcast + console (20/s)": lambda: [
+                FileSink(path), BroadcastSink(TelemetryBroadcaster()), ConsoleSink(quiet, max_per_second=20),
+            ],
+            "file + broadcast + console (unlimited)": lambda: [
+                FileSink(path), BroadcastSink(TelemetryBroadcaster()), ConsoleSink(quiet, max_per_second=0),
+            ],
+        }
+        for label, sinks in cases.items():
+            rate = run(MCPActivityExporter(sinks()), spans, args.batch)
+            print(f"{label:<40} {rate:>12,.0f} spans/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional, Set, Tuple
+
+# (event id, 一行 JSON log)
+Event = Tuple[int, str]
+
+
+class _Subscriber:
+    """單一 SSE client 的佇列：固定大小，滿了丟掉最舊的事件。"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.loop = loop
+        self.queue: Deque[Event] = deque(maxlen=max_queue)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def push(self, event: Event) -> None:
+        # 只在 subscriber 所屬的 event loop 上呼叫
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(event)
+        self._ready.set()
+
+    async def wait(self) -> None:
+        await self._ready.wait()
+        self._ready.clear()
+
+
+class TelemetryBroadcaster:
+    """
+    把 MCPActivityExporter 輸出的每一行 log 分送給所有 /telemetry/stream 連線，
+    取代每條連線各自輪詢 log 檔。
+    - exporter 在 BatchSpanProcessor 的背景 thread 呼叫 publish()，以 call_soon_threadsafe 交給各 client 的 loop
+    - 每個 client 一個固定大小的佇列，client 太慢時丟掉最舊的事件，不會拖慢 exporter 或其他 client
+    - 保留最近 buffer_size 筆事件（ring buffer），client 重連時依 Last-Event-ID 補送漏掉的部分
+    """
+
+    def __init__(self, buffer_size: int = 1000, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._buffer: Deque[Event] = deque(maxlen=buffer_size)
+        self._subscribers: Set[_Subscriber] = set()
+        self._lock = threading.Lock()
+        self.last_id = 0
+        self.published = 0
+
+    def publish(self, line: str) -> int:
+        """可在任何 thread 呼叫。回傳事件 id。"""
+        with self._lock:
+            self.last_id += 1
+            event = (self.last_id, line)
+            self._buffer.append(event)
+            self.published += 1
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.push, event)
+            except RuntimeError:
+                # loop 已關閉（server 結束中）
+                self._discard(sub)
+        return event[0]
+
+    def _replay(self, last_event_id: Optional[int]) -> List[Event]:
+        if last_event_id is None:
+            return []
+        if last_event_id > self.last_id:
+            # id 比目前還大：server 重啟過，全部重送
+            return list(self._buffer)
+        return [e for e in self._buffer if e[0] > last_event_id]
+
+    async def subscribe(
+        self,
+        last_event_id: Optional[int] = None,
+        heartbeat: Optional[float] = None,
+    ) -> AsyncIterator[Optional[Event]]:
+        """
+        依序產生事件；有 last_event_id 時先補送 ring buffer 裡比它新的事件。
+        登記與取補送資料在同一把鎖內完成，補送與即時事件之間不會漏也不會重複。
+        heartbeat: 閒置超過這個秒數就產生一次 None（讓呼叫端送 keep-alive）
+        """
+        sub = _Subscriber(asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            replay = self._replay(last_event_id)
+            self._subscribers.add(sub)
+        try:
+            for event in replay:
+                yield event
+            while True:
+                while sub.queue:
+                    yield sub.queue.popleft()
+                try:
+                    await asyncio.wait_for(sub.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._discard(sub)
+
+    def _discard(self, sub: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "last_id": self.last_id,
+            "buffered": len(self._buffer),
+            "buffer_size": self._buffer.maxlen,
+            "max_queue": self.max_queue,
+            "dropped": sum(s.dropped for s in subscribers),
+        }
+
+
+broadcaster = TelemetryBroadcaster(
+    buffer_size=int(os.getenv("TELEMETRY_STREAM_BUFFER", "1000")),
+    max_queue=int(os.getenv("TELEMETRY_STREAM_QUEUE", "256")),
+)
@@ -1,101 +1,250 @@
 import os
+import re
 import json
+import time
 from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
 from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
 from rich.console import Console
 from rich.syntax import Syntax
 
+from telemetry.broadcaster import TelemetryBroadcaster, broadcaster
+from telemetry.log_tail import rotate_if_needed
+
 console = Console()
 
-def _safe_serialize(obj):
-    """將不可序列化的物件安全轉換為字串"""
-    try:
-        json.dumps(obj)
-        return obj
-    except TypeError:
-        if isinstance(obj, dict):
-            return {str(k): _safe_serialize(v) for k, v in obj.items()}
-        elif isinstance(obj, (list, tuple, set)):
-            return [_safe_serialize(v) for v in obj]
-        else:
-            return str(obj)
+# 只關心 MCP 過程（過濾掉初始化、load_servers 等）
+MCP_SPAN_KEYS = (
+    "receive_prompt",
+    "tool_call",
+    "send_request",
+    "execute_llm_generation",
+    "format_response",
+    "mcpaggregator",
+    "mcp_agentclientsession",
+)
+
+
+class SpanNameMatcher:
+    """
+    預先編譯的 span 名稱過濾器（不分大小寫的子字串比對）。
+    span 名稱種類有限，比對結果依名稱快取，同名 span 只比對一次。
+    """
+
+    def __init__(self, keys: Iterable[str] = MCP_SPAN_KEYS, max_cache: int = 4096):
+        self._pattern = re.compile("|".join(re.escape(k) for k in keys), re.IGNORECASE)
+        self._cache: Dict[str, bool] = {}
+        self._max_cache = max_cache
+
+    def __call__(self, name: str) -> bool:
+        hit = self._cache.get(name)
+        if hit is None:
+            if len(self._cache) >= self._max_cache:
+                self._cache.clear()
+            hit = self._cache[name] = self._pattern.search(name) is not None
+        return hit
+
+
+class ActivityRecord(NamedTuple):
+    """一個 span 轉成的 log 記錄；line 是已序列化好的 JSON，各 sink 共用不重複序列化。"""
+
+    level: str
+    prefix: str
+    line: str
+
+
+class LogSink:
+    """exporter 的輸出端；write 在 BatchSpanProcessor 的背景 thread 上呼叫。"""
+
+    def write(self, records: Sequence[ActivityRecord]) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FileSink(LogSink):
+    """
+    寫入 log 檔（純文字方便 iframe 讀取）：檔案保持開啟、帶緩衝，每批 flush 一次。
+    超過 max_bytes 時輪替（mcp-activity.log.1 ...），保留 backup_count 份。
+    """
+
+    def __init__(self, filepath: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 3, buffering: int = 64 * 1024):
+        self.filepath = filepath
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.buffering = buffering
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        self._file = None
+        self._size = 0
+
+    def _open(self):
+        self._file = open(self.filepath, "ab", buffering=self.buffering)
+        self._size = self._file.tell()
+
+    def write(self, records: Sequence[ActivityRecord]) -> None:
+        payload = "".join(r.line + "\n" for r in records).encode("utf-8")
+        if self._file is None:
+            self._open()
+        if self.max_bytes > 0 and self._size and self._size + len(payload) > self.max_bytes:
+            self._file.close()
+            rotate_if_needed(self.filepath, self.max_bytes, self.backup_count, len(payload))
+            self._open()
+        self._file.write(payload)
+        self._size += len(payload)
+        # 每批 flush 一次，/telemetry/recent 才讀得到最新的行
+        self._file.flush()
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class BroadcastSink(LogSink):
+    """交給 broadcaster，/telemetry/stream 直接收到，不必輪詢檔案。"""
+
+    def __init__(self, target: TelemetryBroadcaster):
+        self.target = target
+
+    def write(self, records: Sequence[ActivityRecord]) -> None:
+        for r in records:
+            self.target.publish(r.line)
+
+
+class ConsoleSink(LogSink):
+    """
+    終端輸出（Render log 也支援 Rich）。
+    max_per_second: 每秒最多印幾筆，超過的略過並在之後補印略過的筆數（0 = 不限制）
+    pretty: 用 Rich Syntax 高亮 JSON（較慢）；False 時只印一行
+    """
+
+    def __init__(self, out: Console = console, max_per_second: float = 20, pretty: bool = True):
+        self.out = out
+        self.max_per_second = max_per_second
+        self.pretty = pretty
+        self._tokens = max_per_second
+        self._refilled = time.monotonic()
+        self.suppressed = 0
+
+    def _allow(self) -> bool:
+        if self.max_per_second <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.max_per_second, self._tokens + (now - self._refilled) * self.max_per_second)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def write(self, records: Sequence[ActivityRecord]) -> None:
+        for r in records:
+            if not self._allow():
+                self.suppressed += 1
+                continue
+            if self.suppressed:
+                self.out.print(f"[yellow][otel][/yellow] {self.suppressed} spans not printed (rate limit)")
+                self.suppressed = 0
+            if self.pretty:
+                self.out.print(r.prefix)
+                self.out.print(Syntax(r.line, "json", theme="ansi_dark", word_wrap=True))
+            else:
+                self.out.print(r.line, markup=False, highlight=False)
 
 
 class MCPActivityExporter(SpanExporter):
     """
     專為 Job Guardian 設計的 Telemetry Exporter：
-    - 只輸出與 MCP 工具互動相關的 spans
+    - 只輸出與 MCP 工具互動相關的 spans（matcher）
     - 簡化時間欄位（不輸出 start_time / end_time）
-    - 美化顯示格式類似 log stream
-    - 可在 Render 部署環境保持 Rich 高亮輸出
+    - 每個 span 只序列化一次，結果交給各個 sink（檔案、broadcaster、終端）
+    - 單一 sink 失敗不影響其他 sink
     """
 
-    def __init__(self, filepath="telemetry/mcp-activity.log"):
-        self.filepath = filepath
-        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
-        console.print(f"[green][otel][/green] Logging MCP activities to [bold]{self.filepath}[/bold]")
+    def __init__(self, sinks: Sequence[LogSink], matcher: Optional[SpanNameMatcher] = None):
+        self.sinks = list(sinks)
+        self.matcher = matcher or SpanNameMatcher()
+        self.exported = 0
+        self.sink_errors = 0
 
-    def export(self, spans):
-        log_lines = []
+    def to_records(self, spans) -> List[ActivityRecord]:
+        records = []
+        timestamp = datetime.utcnow().isoformat(timespec="seconds")
         for span in spans:
-            name = span.name.lower()
-
-            # 🧩 僅關心 MCP 過程（過濾掉初始化、load_servers 等）
-            if not any(key in name for key in [
-                "receive_prompt",
-                "tool_call",
-                "send_request",
-                "execute_llm_generation",
-                "format_response",
-                "mcpaggregator",
-                "mcp_agentclientsession"
-            ]):
+            name = span.name
+            if not self.matcher(name):
                 continue
 
-            # 提取基本欄位
-            attrs = _safe_serialize(span.attributes)
-            # ctx = span.context # Not used in this simplified output
-
             # 🧠 Level 判定
-            if "error" in name:
+            lowered = name.lower()
+            if "error" in lowered:
                 level = "ERROR"
-            elif "receive" in name:
+            elif "receive" in lowered:
                 level = "INFO"
-            elif "call" in name or "send" in name:
+            elif "call" in lowered or "send" in lowered:
                 level = "DEBUG"
             else:
                 level = "INFO"
 
             # 📦 組出 log prefix
-            prefix = f"[{level}] {datetime.utcnow().isoformat(timespec='seconds')} {span.name}"
-
-            # 🧾 美化 attributes 並組合成單一 JSON 物件
-            log_data_json = json.dumps(
-                {
-                    "prefix": prefix,
-                    "data": attrs
-                },
-                ensure_ascii=False
-            )
-            syntax = Syntax(log_data_json, "json", theme="ansi_dark", word_wrap=True)
+            prefix = f"[{level}] {timestamp} {name}"
 
-            # ✅ 終端輸出（Render log 也支援 Rich）
-            console.print(prefix)
-            console.print(syntax)
+            # 🧾 attributes 與 prefix 組合成單一 JSON 物件（無法序列化的值轉成字串）
+            line = json.dumps(
+                {"prefix": prefix, "data": dict(span.attributes or {})},
+                ensure_ascii=False,
+                default=str,
+            )
+            records.append(ActivityRecord(level, prefix, line))
+        return records
 
-            # ✅ 寫入檔案（純文字方便 iframe 讀取）
-            log_lines.append(log_data_json)
+    def export(self, spans):
+        records = self.to_records(spans)
+        if records:
+            for sink in self.sinks:
+                try:
+                    sink.write(records)
+                except Exception as e:
+                    self.sink_errors += 1
+                    console.print(f"[red][otel][/red] {type(sink).__name__} failed: {e}", markup=True)
+            self.exported += len(records)
+        return SpanExportResult.SUCCESS
 
-        # 附加寫入檔案
-        if log_lines:
-            with open(self.filepath, "a", encoding="utf-8") as f:
-                for line in log_lines:
-                    f.write(line + "\n")
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        for sink in self.sinks:
+            sink.flush()
+        return True
 
-        return SpanExportResult.SUCCESS
+    def shutdown(self):
+        for sink in self.sinks:
+            sink.close()
 
 
 def get_exporter():
     """使用自訂的 MCPActivityExporter"""
     console.print("[green][otel][/green] Using MCP Activity Exporter (human-readable logs)")
-    return MCPActivityExporter(filepath="telemetry/mcp-activity.log")
\ No newline at end of file
+    filepath = "telemetry/mcp-activity.log"
+    sinks: List[LogSink] = [
+        FileSink(
+            filepath,
+            max_bytes=int(os.getenv("TELEMETRY_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            backup_count=int(os.getenv("TELEMETRY_LOG_BACKUPS", "3")),
+        ),
+        BroadcastSink(broadcaster),
+    ]
+    # 終端輸出可關閉（TELEMETRY_CONSOLE=0），或改成不高亮的單行輸出（TELEMETRY_CONSOLE_PRETTY=0）
+    if os.getenv("TELEMETRY_CONSOLE", "1") != "0":
+        sinks.append(ConsoleSink(
+            max_per_second=float(os.getenv("TELEMETRY_CONSOLE_RATE", "20")),
+            pretty=os.getenv("TELEMETRY_CONSOLE_PRETTY", "1") != "0",
+        ))
+    console.print(f"[green][otel][/green] Logging MCP activities to [bold]{filepath}[/bold]")
+    return MCPActivityExporter(sinks)
@@ -0,0 +1,97 @@
+import os
+from typing import List, Optional, Tuple
+
+BLOCK_SIZE = 64 * 1024
+
+
+def tail_lines(path: str, n: int, block_size: int = BLOCK_SIZE) -> Tuple[List[str], int]:
+    """
+    從檔尾往前以 block 為單位讀取，湊滿 n 行就停，不必讀整個檔案。
+    只回傳完整的行（最後一行若還沒寫完換行符號則略過）。
+    回傳 (lines, offset)；offset 是最後一個完整行之後的位置，可交給 read_since 接續讀取。
+    """
+    if n <= 0:
+        return [], tail_lines(path, 1, block_size)[1]
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        buf = b""
+        complete_end: Optional[int] = None
+        # 需要 n + 1 個換行符號才能確定第一行是完整的（或一路讀到檔頭）
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            if complete_end is None:
+                last_nl = buf.rfind(b"\n")
+                if last_nl < 0:
+                    continue
+                complete_end = pos + last_nl + 1
+                buf = buf[: last_nl + 1]
+            if buf.count(b"\n") > n:
+                break
+        if complete_end is None:
+            return [], pos
+        lines = buf.split(b"\n")[:-1]
+        return [line.decode("utf-8", "replace") for line in lines[-n:]], complete_end
+
+
+def read_since(
+    path: str,
+    offset: int,
+    max_lines: int = 500,
+    max_bytes: int = 1024 * 1024,
+) -> Tuple[List[str], int, bool]:
+    """
+    從 offset 開始讀取完整的行（最多 max_lines 行 / max_bytes bytes）。
+    offset 超過檔案大小代表檔案已輪替或被清空，改從檔頭讀起；
+    offset 落在某一行中間時從下一行開始。
+    回傳 (lines, next_offset, reset)。
+    """
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        reset = offset > size
+        if reset:
+            offset = 0
+        if offset > 0:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                f.readline()
+                offset = f.tell()
+        f.seek(offset)
+        data = f.read(min(max_bytes, size - offset))
+    last_nl = data.rfind(b"\n")
+    if last_nl < 0:
+        return [], offset, reset
+    lines = data[: last_nl + 1].split(b"\n")[:-1]
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        consumed = sum(len(line) + 1 for line in lines)
+    else:
+        consumed = last_nl + 1
+    return [line.decode("utf-8", "replace") for line in lines], offset + consumed, reset
+
+
+def rotate_if_needed(path: str, max_bytes: int, backup_count: int = 3, incoming: int = 0) -> bool:
+    """
+    檔案加上即將寫入的 incoming bytes 超過 max_bytes 時輪替：
+    path -> path.1 -> path.2 ...，最多保留 backup_count 份。回傳是否有輪替。
+    """
+    if max_bytes <= 0:
+        return False
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return False
+    if size == 0 or size + incoming <= max_bytes:
+        return False
+    if backup_count <= 0:
+        os.remove(path)
+        return True
+    for i in range(backup_count - 1, 0, -1):
+        src = f"{path}.{i}"
+        if os.path.exists(src):
+            os.replace(src, f"{path}.{i + 1}")
+    os.replace(path, f"{path}.1")
+    return True
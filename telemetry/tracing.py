@@ -1,18 +1,208 @@
-
+import asyncio
+import bisect
+import inspect
+import threading
+import time
 from functools import wraps
+from typing import Dict, Iterable, List, Optional, Union
+
 from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
 
 tracer = trace.get_tracer(__name__)
 
-def trace_span(span_name):
+# Bucket upper bounds in milliseconds: 0.1 ms .. ~20 min, growing by 25% per bucket
+_BUCKETS_MS: List[float] = []
+_b = 0.1
+while _b < 20 * 60 * 1000:
+    _BUCKETS_MS.append(round(_b, 4))
+    _b *= 1.25
+del _b
+
+MAX_ARG_LENGTH = 200
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram; memory stays constant no matter how many calls are recorded.
+    Percentiles are interpolated within the bucket, so they are accurate to about 25%.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+
+    def record(self, ms: float, error: bool = False) -> None:
+        self.counts[bisect.bisect_left(_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.errors += error
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = ms if self.max_ms is None else max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = p * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = _BUCKETS_MS[i - 1] if i > 0 else 0.0
+                hi = _BUCKETS_MS[i] if i < len(_BUCKETS_MS) else self.max_ms
+                value = lo + (hi - lo) * (rank - seen) / c
+                return min(max(value, self.min_ms), self.max_ms)
+            seen += c
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        def r(v):
+            return round(v, 3) if v is not None else None
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": r(self.total_ms / self.count) if self.count else None,
+            "min_ms": r(self.min_ms),
+            "p50_ms": r(self.percentile(0.50)),
+            "p95_ms": r(self.percentile(0.95)),
+            "p99_ms": r(self.percentile(0.99)),
+            "max_ms": r(self.max_ms),
+        }
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def record_latency(span_name: str, ms: float, error: bool = False) -> None:
+    # Sync functions may be traced from worker threads
+    with _histograms_lock:
+        hist = _histograms.get(span_name)
+        if hist is None:
+            hist = _histograms[span_name] = LatencyHistogram()
+        hist.record(ms, error)
+
+
+def latency_snapshot() -> Dict[str, dict]:
+    """p50/p95/p99 and counts per span name."""
+    with _histograms_lock:
+        return {name: hist.snapshot() for name, hist in sorted(_histograms.items())}
+
+
+def _arg_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= MAX_ARG_LENGTH else text[:MAX_ARG_LENGTH] + "…"
+
+
+def _capture(span, signature, capture_args, args, kwargs) -> None:
+    try:
+        bound = signature.bind_partial(*args, **kwargs)
+    except TypeError:
+        return
+    for name, value in bound.arguments.items():
+        if name in ("self", "cls"):
+            continue
+        if capture_args is not True and name not in capture_args:
+            continue
+        span.set_attribute(f"arg.{name}", _arg_value(value))
+
+
+def _current(span):
+    # The wrapper records errors and ends the span itself
+    return trace.use_span(span, end_on_exit=False, record_exception=False, set_status_on_exception=False)
+
+
+def _fail(span, e: BaseException) -> bool:
+    """Mark the span as failed; cancellation (e.g. client disconnect) is not counted as an error."""
+    if isinstance(e, (asyncio.CancelledError, GeneratorExit)):
+        return False
+    span.record_exception(e)
+    span.set_status(Status(StatusCode.ERROR, str(e)))
+    return True
+
+
+def trace_span(span_name, capture_args: Union[bool, Iterable[str]] = False):
     """
     A decorator to trace the execution of a function using OpenTelemetry.
+    Works with sync functions, coroutine functions and async generators: the span
+    covers the whole call (for async generators, the whole iteration), and its
+    duration is recorded in a per-span-name latency histogram.
+
+    capture_args: True to record all arguments as span attributes, or an iterable
+    of argument names to record only those. Values are truncated to MAX_ARG_LENGTH.
     """
+    if capture_args and capture_args is not True:
+        capture_args = frozenset(capture_args)
+
     def decorator(func):
+        signature = inspect.signature(func) if capture_args else None
+
+        def start(args, kwargs):
+            span = tracer.start_span(span_name)
+            if capture_args:
+                _capture(span, signature, capture_args, args, kwargs)
+            return span, time.perf_counter()
+
+        def finish(span, started, error):
+            record_latency(span_name, (time.perf_counter() - started) * 1000, error)
+            span.end()
+
+        if inspect.isasyncgenfunction(func):
+            @wraps(func)
+            async def agen_wrapper(*args, **kwargs):
+                span, started = start(args, kwargs)
+                agen = func(*args, **kwargs)
+                error = False
+                try:
+                    while True:
+                        # The generator may be resumed from different tasks (e.g. a streaming
+                        # response), so the span is only made current around each step
+                        with _current(span):
+                            try:
+                                item = await agen.__anext__()
+                            except StopAsyncIteration:
+                                break
+                        yield item
+                except BaseException as e:
+                    error = _fail(span, e)
+                    raise
+                finally:
+                    await agen.aclose()
+                    finish(span, started, error)
+            return agen_wrapper
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                span, started = start(args, kwargs)
+                error = False
+                try:
+                    with _current(span):
+                        return await func(*args, **kwargs)
+                except BaseException as e:
+                    error = _fail(span, e)
+                    raise
+                finally:
+                    finish(span, started, error)
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            with tracer.start_as_current_span(span_name):
-                result = func(*args, **kwargs)
-            return result
+            span, started = start(args, kwargs)
+            error = False
+            try:
+                with _current(span):
+                    return func(*args, **kwargs)
+            except BaseException as e:
+                error = _fail(span, e)
+                raise
+            finally:
+                finish(span, started, error)
         return wrapper
     return decorator
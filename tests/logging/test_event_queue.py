@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from mcp_agent.logging import logger  # noqa: F401 - loads transport without the import cycle
+from mcp_agent.logging.events import Event
+from mcp_agent.logging.transport import _EventQueue
+
+
+async def _noop(event: Event) -> None:
+    pass
+
+
+def _event(event_type: str, message: str = "") -> Event:
+    return Event(type=event_type, namespace="test", message=message)
+
+
+def _queue(*types: str, overflow="drop_debug_first") -> _EventQueue:
+    queue = _EventQueue("test", _noop, maxsize=len(types), overflow=overflow, sample_rate=1.0)
+    for t in types:
+        queue.offer(_event(t))
+    return queue
+
+
+def _types(queue: _EventQueue):
+    return [e.type for e in queue.events]
+
+
+def test_drop_debug_first_evicts_equal_severity_before_errors():
+    queue = _queue("error", "info", "info")
+    queue.offer(_event("info", "new"))
+    assert _types(queue) == ["error", "info", "info"]
+    assert queue.events[-1].message == "new"
+    assert queue.dropped == 1
+
+
+def test_drop_debug_first_drops_incoming_when_everything_is_more_severe():
+    queue = _queue("error", "warning", "error")
+    queue.offer(_event("info"))
+    assert _types(queue) == ["error", "warning", "error"]
+
+
+def test_drop_debug_first_prefers_lowest_severity():
+    queue = _queue("info", "debug", "error")
+    queue.offer(_event("warning"))
+    assert _types(queue) == ["info", "error", "warning"]
+
+
+@pytest.mark.asyncio
+async def test_block_does_not_wait_on_own_queue():
+    queue = None
+
+    async def handle(event: Event) -> None:
+        if event.message == "fill":
+            for _ in range(3):
+                await queue.put(_event("info", "from-handler"))
+
+    queue = _EventQueue("test", handle, maxsize=1, overflow="block", sample_rate=1.0)
+    queue.start()
+    try:
+        await queue.put(_event("info", "fill"))
+        await asyncio.wait_for(_until_idle(queue), timeout=1.0)
+    finally:
+        await queue.stop()
+
+
+async def _until_idle(queue: _EventQueue) -> None:
+    while queue.pending:
+        await asyncio.sleep(0.01)
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from mcp_agent.logging import logger  # noqa: F401 - loads transport without the import cycle
+from mcp_agent.logging import json_serializer
+from mcp_agent.logging.json_serializer import JSONSerializer
+
+BACKENDS = [pytest.param(False, id="json")]
+if json_serializer.orjson is not None:
+    BACKENDS.append(pytest.param(True, id="orjson"))
+
+
+def _huge():
+    return {
+        f"section_{i}": [
+            {"id": j, "text": "職場安全" * 50, "tags": ["a", "b", "c"]} for j in range(100)
+        ]
+        for i in range(100)
+    }
+
+
+@pytest.mark.parametrize("use_orjson", BACKENDS)
+def test_encode_keeps_non_ascii_characters(use_orjson):
+    serializer = JSONSerializer(use_orjson=use_orjson)
+
+    assert serializer.dumps({"公司": "台積電"}) == '{"公司":"台積電"}'
+
+
+def test_json_fallback_matches_orjson():
+    if json_serializer.orjson is None:
+        pytest.skip("orjson not installed")
+    data = {"公司": ["台積電", 1, 2.5, None, True], "nested": {"é": "ü"}}
+
+    assert JSONSerializer(use_orjson=False).dumps(data) == JSONSerializer(use_orjson=True).dumps(data)
+
+
+@pytest.mark.parametrize("max_bytes", [4 * 1024, 64 * 1024])
+def test_huge_object_is_cut_to_about_max_bytes(max_bytes):
+    serializer = JSONSerializer(max_bytes=max_bytes)
+
+    output = serializer.dumps(_huge())
+    size = len(output.encode("utf-8"))
+
+    assert max_bytes * 0.9 < size < max_bytes * 1.1
+    assert "<truncated>" in output
+    json.loads(output)
+
+
+def test_default_budget_is_max_bytes():
+    output = JSONSerializer().dumps(_huge())
+
+    size = len(output.encode("utf-8"))
+    assert JSONSerializer.MAX_BYTES * 0.9 < size < JSONSerializer.MAX_BYTES * 1.1
+
+
+def test_long_string_and_long_list_get_markers():
+    serializer = JSONSerializer(max_string_length=10, max_items=3)
+
+    data = serializer.serialize({"text": "x" * 25, "items": list(range(5))})
+
+    assert data["text"] == "x" * 10 + "...<15 more chars>"
+    assert data["items"] == [0, 1, 2, "<... 2 more items truncated>"]
+
+
+def test_circular_references_are_replaced_with_a_marker():
+    parent = {"name": "parent"}
+    child = {"name": "child", "parent": parent}
+    parent["child"] = child
+    loop = []
+    loop.append(loop)
+
+    data = JSONSerializer().serialize({"tree": parent, "loop": loop})
+
+    assert data["tree"]["child"]["parent"] == "<circular reference: dict>"
+    assert data["loop"] == ["<circular reference: list>"]
+
+
+def test_shared_object_outside_the_current_path_is_not_circular():
+    shared = {"value": 1}
+
+    data = JSONSerializer().serialize({"a": shared, "b": [shared, shared]})
+
+    assert data == {"a": {"value": 1}, "b": [{"value": 1}, {"value": 1}]}
+
+
+def test_depth_limit_marker():
+    nested = {}
+    node = nested
+    for _ in range(5):
+        node["next"] = {}
+        node = node["next"]
+
+    data = JSONSerializer(max_depth=2).serialize(nested)
+
+    assert data["next"]["next"]["next"] == "<max depth exceeded: dict>"
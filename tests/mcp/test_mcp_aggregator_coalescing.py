@@ -0,0 +1,57 @@
+from mcp.types import Tool, ToolAnnotations
+
+from mcp_agent.logging import logger  # noqa: F401 - loads transport without the import cycle
+from mcp_agent.mcp.mcp_aggregator import MCPAggregator, NamespacedTool
+
+
+def _aggregator(coalesce_tool_calls=True, **annotations_by_tool) -> MCPAggregator:
+    aggregator = MCPAggregator(server_names=["jobs"], coalesce_tool_calls=coalesce_tool_calls)
+    aggregator._server_to_tool_map["jobs"] = [
+        NamespacedTool(
+            tool=Tool(name=name, inputSchema={"type": "object"}, annotations=annotations),
+            server_name="jobs",
+            namespaced_tool_name=f"jobs_{name}",
+        )
+        for name, annotations in annotations_by_tool.items()
+    ]
+    return aggregator
+
+
+def test_read_only_and_idempotent_tools_are_coalesced():
+    aggregator = _aggregator(
+        lookup=ToolAnnotations(readOnlyHint=True),
+        upsert=ToolAnnotations(idempotentHint=True),
+    )
+
+    assert aggregator._tool_call_key("jobs", "lookup", {"b": 1, "a": 2}) == (
+        "jobs",
+        "lookup",
+        '{"a":2,"b":1}',
+    )
+    assert aggregator._tool_call_key("jobs", "upsert", None) == ("jobs", "upsert", "{}")
+
+
+def test_tools_with_side_effects_are_never_coalesced():
+    aggregator = _aggregator(
+        flush=ToolAnnotations(destructiveHint=True),
+        send=ToolAnnotations(readOnlyHint=False, idempotentHint=False),
+        plain=None,
+    )
+
+    assert aggregator._tool_call_key("jobs", "flush", {}) is None
+    assert aggregator._tool_call_key("jobs", "send", {}) is None
+    assert aggregator._tool_call_key("jobs", "plain", {}) is None
+    assert aggregator._tool_call_key("jobs", "unknown", {}) is None
+    assert aggregator._tool_call_key("other", "flush", {}) is None
+
+
+def test_coalescing_can_be_disabled():
+    aggregator = _aggregator(coalesce_tool_calls=False, lookup=ToolAnnotations(readOnlyHint=True))
+
+    assert aggregator._tool_call_key("jobs", "lookup", {}) is None
+
+
+def test_unserializable_arguments_are_not_coalesced():
+    aggregator = _aggregator(lookup=ToolAnnotations(readOnlyHint=True))
+
+    assert aggregator._tool_call_key("jobs", "lookup", {"when": object()}) is None
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# mcp_server 的模組彼此以檔名直接 import（python server.py 的執行方式），測試時比照辦理
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "mcp_server"))
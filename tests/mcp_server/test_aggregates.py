@@ -0,0 +1,106 @@
+import pytest
+
+from aggregates import UNKNOWN_YEAR, CompanyAggregates, date_key, date_year, merge_aggregates
+from columnar import ColumnarTable
+from company_index import CompanyIndex
+from server import _count_by_year, _parse_amount, _parse_year
+
+
+@pytest.mark.parametrize(
+    "earlier, later",
+    [
+        ("2024/9/30", "2024/10/1"),
+        ("2024-03-05", "2024-03-15"),
+        ("112/12/31", "113/01/02"),
+        ("99/12/31", "100/01/01"),
+        ("1121231", "1130102"),
+        ("2023-12-31", "113年1月2日"),
+        ("不詳", "2001-01-01"),
+    ],
+)
+def test_date_key_orders_by_calendar_date(earlier, later):
+    assert date_key(earlier) < date_key(later)
+
+
+def _aggregates(records):
+    table = ColumnarTable.from_records(["事業單位名稱", "公告日期", "違反法條"], records)
+    index = CompanyIndex(table.column((0,)), normalize=str.strip)
+    return index, CompanyAggregates(index, table, (1,), (2,))
+
+
+def test_latest_date_uses_parsed_dates():
+    _, aggs = _aggregates([
+        ["甲公司", "2024/10/1", "第24條"],
+        ["甲公司", "2024/9/30", "第32條"],
+        ["乙公司", "99/12/31", "第24條"],
+        ["乙公司", "100/01/01", "第24條"],
+    ])
+
+    assert aggs.lookup("甲公司").latest_date == "2024/10/1"
+    assert aggs.lookup("乙公司").latest_date == "100/01/01"
+
+
+def test_merged_latest_date_uses_parsed_dates():
+    index, aggs = _aggregates([
+        ["甲公司", "2024/9/30", "第24條"],
+        ["甲公司二廠", "2024/10/1", "第24條"],
+    ])
+
+    merged = merge_aggregates(aggs.for_names(index.contains("甲公司")))
+    assert merged["latest_date"] == "2024/10/1"
+    assert merged["violations"] == 2
+
+
+@pytest.mark.parametrize(
+    "value, amount",
+    [
+        ("30,000元", 30000),
+        ("30000", 30000),
+        ("3萬元", 30000),
+        ("1.5萬元", 15000),
+        ("2萬5千元", 25000),
+        ("2萬5000元", 25000),
+        ("5千元", 5000),
+        ("3百元", 300),
+        ("1萬2千5百元", 12500),
+        ("新臺幣２萬元", 20000),
+        ("30,000元（3萬元）", 30000),
+        ("", -1),
+        (None, -1),
+        ("無", -1),
+    ],
+)
+def test_parse_amount_handles_chinese_units(value, amount):
+    assert _parse_amount(value) == amount
+
+
+@pytest.mark.parametrize(
+    "date, year",
+    [
+        ("2024/3/5", "2024"),
+        ("113/03/05", "2024"),
+        ("99年12月31日", "2010"),
+        ("1130305", "2024"),
+        ("不詳", UNKNOWN_YEAR),
+    ],
+)
+def test_date_year_converts_roc_years(date, year):
+    assert date_year(date) == year
+
+
+def test_count_by_year_uses_parsed_years():
+    _, aggs = _aggregates([
+        ["甲公司", "113/01/02", "第24條"],
+        ["甲公司", "2024-05-06", "第24條"],
+        ["甲公司", "112/12/31", "第24條"],
+        ["甲公司", "不詳", "第24條"],
+    ])
+
+    assert aggs.lookup("甲公司").count_by_year == {"2024": 2, "2023": 1, UNKNOWN_YEAR: 1}
+
+
+def test_tool_stats_count_by_year_matches_aggregates():
+    items = [{"公告日期": d} for d in ("113/01/02", "2024-05-06", "112/12/31", None)]
+
+    assert _count_by_year(items) == {"2024": 2, "2023": 1}
+    assert [_parse_year(item["公告日期"]) for item in items] == [2024, 2024, 2023, 0]
@@ -0,0 +1,52 @@
+import csv
+import io
+
+import pytest
+
+from csv_stream import CSVStreamParser
+
+MALFORMED = (
+    '公司,內容\n'
+    '1,ab"c\n'
+    '2,"多行\n欄位"\n'
+    '3,x"y"z\n'
+    '4,"結束後"尾巴\n'
+    '5,"跳脫""引號"\n'
+    '6,"""\n'
+    '7,尾端\n'
+)
+
+
+def _stream(data: bytes, chunk_size: int, encoding=None):
+    parser = CSVStreamParser(encoding)
+    records = []
+    for i in range(0, len(data), chunk_size):
+        records.extend(parser.feed(data[i:i + chunk_size]))
+    records.extend(parser.close())
+    return records
+
+
+def _as_dicts(records):
+    header, *rows = records
+    return [dict(zip(header, row)) for row in rows]
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "cp950"])
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 64 * 1024])
+def test_malformed_quotes_match_dictreader(encoding, chunk_size):
+    expected = list(csv.DictReader(io.StringIO(MALFORMED)))
+    records = _stream(MALFORMED.encode(encoding), chunk_size)
+    assert _as_dicts(records) == expected
+
+
+def test_unclosed_quote_at_eof_matches_dictreader():
+    text = '公司,內容\n1,"沒有結束\n2,b\n'
+    expected = list(csv.DictReader(io.StringIO(text)))
+    assert _as_dicts(_stream(text.encode("utf-8"), 3)) == expected
+
+
+def test_feed_without_complete_record_returns_nothing():
+    parser = CSVStreamParser("utf-8")
+    assert parser.feed(b'a,"b\n') == []
+    assert parser.feed(b'c"\n') == [["a", "b\nc"]]
+    assert parser.close() == []
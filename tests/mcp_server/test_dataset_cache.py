@@ -0,0 +1,217 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from dataset_cache import DatasetCache
+from fetcher import AsyncFetcher
+import server
+
+LABOR_V1 = "事業單位名稱,公告日期\n甲公司,2024-01-02\n乙公司,2024-03-04\n"
+LABOR_V2 = LABOR_V1 + "丙公司,2024-05-06\n"
+
+
+class StandIn:
+    """本機 HTTP 替身：路徑 -> (內容, ETag)；If-None-Match 相符時回 304。"""
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.requests.append((self.path, dict(self.headers)))
+                body, etag = stand_in.files[self.path]
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv")
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    def serve(self, path: str, text: str, etag=None, encoding="utf-8") -> str:
+        self.files[path] = (text.encode(encoding), etag)
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def hits(self, path: str) -> int:
+        return sum(1 for p, _ in self.requests if p == path)
+
+
+@pytest.fixture
+def stand_in():
+    server = StandIn()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def _run(coro_fn, fetcher: AsyncFetcher):
+    async def _main():
+        try:
+            return await coro_fn()
+        finally:
+            await fetcher.aclose()
+
+    return asyncio.run(_main())
+
+
+def _names(table):
+    return [table.get(i, 0) for i in range(len(table))]
+
+
+# ---------------- fetcher ----------------
+def test_fetch_parses_csv_and_reports_etag(stand_in):
+    url = stand_in.serve("/labor.csv", LABOR_V1, etag='"v1"')
+    fetcher = AsyncFetcher(force_ipv4=False)
+
+    result = _run(lambda: fetcher.fetch(url), fetcher)
+
+    assert result.status == 200
+    assert result.etag == '"v1"'
+    assert result.version
+    assert _names(result.table) == ["甲公司", "乙公司"]
+
+
+def test_fetch_returns_304_for_matching_etag(stand_in):
+    url = stand_in.serve("/labor.csv", LABOR_V1, etag='"v1"')
+    fetcher = AsyncFetcher(force_ipv4=False)
+
+    result = _run(lambda: fetcher.fetch(url, {"If-None-Match": '"v1"'}), fetcher)
+
+    assert result.status == 304
+    assert result.table is None
+
+
+def test_fetch_falls_back_to_cp950_when_utf8_breaks_mid_stream(stand_in):
+    # 第一段全是 ASCII，會先判斷成 utf-8；後段的 cp950 位元組讓下載改用 cp950 重來
+    text = "name,city\n" + "x,y\n" * 50 + "台積電,新竹市\n"
+    url = stand_in.serve("/big5.csv", text, encoding="cp950")
+    fetcher = AsyncFetcher(force_ipv4=False, chunk_size=64)
+
+    result = _run(lambda: fetcher.fetch(url), fetcher)
+
+    assert result.table.row(len(result.table) - 1) == {"name": "台積電", "city": "新竹市"}
+    assert stand_in.hits("/big5.csv") == 2
+
+
+# ---------------- cache ----------------
+def _cache(url, tmp_path, fetcher, **kwargs):
+    return DatasetCache({"labor": url}, fetcher.fetch, cache_dir=str(tmp_path), **kwargs)
+
+
+def test_fresh_entry_is_served_without_network(stand_in, tmp_path):
+    url = stand_in.serve("/labor.csv", LABOR_V1, etag='"v1"')
+    fetcher = AsyncFetcher(force_ipv4=False)
+    cache = _cache(url, tmp_path, fetcher, ttl=3600)
+
+    async def _main():
+        first = await cache.get("labor")
+        second = await cache.get("labor")
+        return first, second
+
+    first, second = _run(_main, fetcher)
+
+    assert second is first
+    assert stand_in.hits("/labor.csv") == 1
+
+
+def test_stale_entry_is_served_while_revalidating_with_etag(stand_in, tmp_path):
+    url = stand_in.serve("/labor.csv", LABOR_V1, etag='"v1"')
+    fetcher = AsyncFetcher(force_ipv4=False)
+    cache = _cache(url, tmp_path, fetcher, ttl=60, max_stale=3600)
+
+    async def _main():
+        entry = await cache.get("labor")
+        entry.validated_at -= 120  # 超過 TTL，仍在 max_stale 內
+        stale = await cache.get("labor")
+        assert stale is entry
+        await cache._background["labor"]
+        return entry
+
+    entry = _run(_main, fetcher)
+
+    path, headers = stand_in.requests[-1]
+    assert headers.get("If-None-Match") == '"v1"'
+    assert entry.revalidations == 1
+    assert entry.age() < 60
+
+
+def test_stale_entry_is_replaced_when_source_changes(stand_in, tmp_path):
+    url = stand_in.serve("/labor.csv", LABOR_V1, etag='"v1"')
+    fetcher = AsyncFetcher(force_ipv4=False)
+    cache = _cache(url, tmp_path, fetcher, ttl=60, max_stale=3600)
+
+    async def _main():
+        entry = await cache.get("labor")
+        entry.validated_at -= 120
+        stand_in.serve("/labor.csv", LABOR_V2, etag='"v2"')
+        stale = await cache.get("labor")
+        await cache._background["labor"]
+        return stale, await cache.get("labor")
+
+    stale, fresh = _run(_main, fetcher)
+
+    assert len(stale.table) == 2
+    assert len(fresh.table) == 3
+    assert fresh.etag == '"v2"'
+    assert fresh.version != stale.version
+
+
+def test_entry_past_max_stale_waits_for_fetch(stand_in, tmp_path):
+    url = stand_in.serve("/labor.csv", LABOR_V1, etag='"v1"')
+    fetcher = AsyncFetcher(force_ipv4=False)
+    cache = _cache(url, tmp_path, fetcher, ttl=60, max_stale=120)
+
+    async def _main():
+        entry = await cache.get("labor")
+        entry.validated_at -= 600
+        stand_in.serve("/labor.csv", LABOR_V2, etag='"v2"')
+        return await cache.get("labor")
+
+    entry = _run(_main, fetcher)
+
+    assert len(entry.table) == 3
+
+
+def test_disk_copy_survives_restart(stand_in, tmp_path):
+    url = stand_in.serve("/labor.csv", LABOR_V1, etag='"v1"')
+    fetcher = AsyncFetcher(force_ipv4=False)
+    _run(lambda: _cache(url, tmp_path, fetcher, ttl=3600).get("labor"), fetcher)
+
+    restarted = _cache(url, tmp_path, fetcher, ttl=3600)
+    entry = _run(lambda: restarted.get("labor"), fetcher)
+
+    assert entry.loaded_from == "disk"
+    assert entry.etag == '"v1"'
+    assert _names(entry.table) == ["甲公司", "乙公司"]
+    assert stand_in.hits("/labor.csv") == 1
+
+
+# ---------------- notebook helper ----------------
+def test_fetch_csv_rows_closes_its_own_client(stand_in):
+    url = stand_in.serve("/labor.csv", LABOR_V1, etag='"v1"')
+
+    # 每次 asyncio.run 都是新的 loop；連續呼叫不能沿用上一個 loop 的連線
+    first = server._fetch_csv_rows(url)
+    second = server._fetch_csv_rows(url)
+
+    assert [row["事業單位名稱"] for row in first] == ["甲公司", "乙公司"]
+    assert second == first
+    assert server.fetcher._client is None
@@ -0,0 +1,29 @@
+from response_cache import ResponseCache
+
+
+def test_key_keeps_arguments_exact():
+    cache = ResponseCache()
+    versions = {"labor": "v1"}
+    base = cache.key("labor_violations", {"company": "台積電"}, versions)
+    assert cache.key("labor_violations", {"company": "台積電 "}, versions) != base
+    assert cache.key("labor_violations", {"company": "ＡＢＣ"}, versions) != cache.key(
+        "labor_violations", {"company": "ABC"}, versions
+    )
+    assert cache.key("labor_violations", {"company": "台積電"}, {"labor": "v2"}) != base
+
+
+def test_key_ignores_argument_order():
+    cache = ResponseCache()
+    a = cache.key("esg_hr", {"company": "台積電", "limit": 5}, {})
+    b = cache.key("esg_hr", {"limit": 5, "company": "台積電"}, {})
+    assert a == b
+
+
+def test_version_change_purges_dependents():
+    cache = ResponseCache()
+    cache.observe({"labor": "v1"})
+    key = cache.key("labor_violations", {"company": "台積電"}, {"labor": "v1"})
+    cache.put(key, ("labor",), {"items": []})
+    assert cache.get(key) is not None
+    cache.observe({"labor": "v2"})
+    assert cache.get(key) is None
@@ -0,0 +1,22 @@
+import asyncio
+
+import server
+
+
+def _tools():
+    return {tool.name: tool for tool in asyncio.run(server.mcp.list_tools())}
+
+
+def test_cache_invalidation_is_marked_destructive():
+    annotations = _tools()["invalidate_dataset_cache"].annotations
+
+    assert annotations.destructiveHint is True
+    assert not annotations.readOnlyHint
+
+
+def test_query_tools_are_read_only():
+    tools = _tools()
+    tools.pop("invalidate_dataset_cache")
+
+    assert tools
+    assert all(tool.annotations and tool.annotations.readOnlyHint for tool in tools.values())
@@ -0,0 +1,73 @@
+import json
+import unicodedata
+
+from columnar import ColumnarTable
+from company_index import CompanyIndex
+from dataset_cache import CachedDataset
+from snapshot import Snapshot, write_snapshot
+
+RECORDS = [
+    ["台積電股份有限公司", "新竹市", "2024-01-02"],
+    ["聯電", "新竹市", "2024-03-04"],
+    ["台積電股份有限公司", "台南市", "2023-05-06"],
+    ["ABC Co.", "", "2022-07-08"],
+]
+
+
+def _normalize(name: str) -> str:
+    return unicodedata.normalize("NFKC", name).replace("股份有限公司", "").strip()
+
+
+def _entry() -> CachedDataset:
+    table = ColumnarTable.from_records(["事業單位名稱", "所在縣市", "公告日期"], RECORDS)
+    index = CompanyIndex(table.column((0,)), normalize=_normalize)
+    return CachedDataset(
+        name="labor",
+        url="http://example.invalid/labor.csv",
+        table=table,
+        version="v1",
+        validated_at=1.0,
+        etag='"v1"',
+        index=index,
+    )
+
+
+def _load(tmp_path):
+    path = str(tmp_path / "datasets.snapshot")
+    original = _entry()
+    write_snapshot(path, [original])
+    (loaded,) = Snapshot(path).datasets(_normalize)
+    return original, loaded, path
+
+
+def test_tables_and_index_round_trip(tmp_path):
+    original, loaded, _ = _load(tmp_path)
+
+    assert loaded.loaded_from == "snapshot"
+    assert loaded.table.rows() == original.table.rows()
+    assert list(loaded.index.names) == list(original.index.names)
+    for query in ("台積電股份有限公司", "台積電", "abc co.", "聯電"):
+        assert loaded.index.match(query) == original.index.match(query)
+        assert loaded.index.match(query, partial=True) == original.index.match(query, partial=True)
+    assert loaded.index.contains("積電") == original.index.contains("積電")
+
+
+def test_strings_live_in_the_mapped_area(tmp_path):
+    _, loaded, path = _load(tmp_path)
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    length = int.from_bytes(raw[8:16], "little")
+    manifest = raw[16:16 + length].decode("utf-8")
+    # manifest 只剩欄名等中繼資料，資料值都在陣列區
+    assert "台南市" not in manifest and "聯電" not in manifest
+    assert "台南市".encode("utf-8") in raw[16 + length:]
+    assert json.loads(manifest)["datasets"][0]["table"]["columns"][0] == "事業單位名稱"
+    assert loaded.table.approx_bytes() > 0
+
+
+def test_snapshot_table_can_be_saved_to_disk_cache(tmp_path):
+    _, loaded, _ = _load(tmp_path)
+
+    data = json.loads(json.dumps(loaded.table.to_dict(), ensure_ascii=False))
+    assert ColumnarTable.from_dict(data).rows() == loaded.table.rows()
@@ -0,0 +1,151 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected, concurrency_limit
+
+
+async def _settle():
+    # 讓排隊中的 task 跑到下一個 await
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def _queue_up(controller, order, names):
+    async def _run(name):
+        await controller.acquire()
+        order.append(name)
+
+    tasks = []
+    for name in names:
+        tasks.append(asyncio.create_task(_run(name)))
+        await _settle()
+    return tasks
+
+
+@pytest.mark.asyncio
+async def test_released_slot_goes_to_waiters_in_fifo_order():
+    controller = AdmissionController(limit=1, max_queue=5)
+    await controller.acquire()
+    order = []
+    tasks = await _queue_up(controller, order, ["a", "b", "c"])
+    assert controller.queue_depth == 3
+
+    controller.release()
+    # 名額已交給 a；這時才到的請求不能插隊
+    late = await _queue_up(controller, order, ["late"])
+    for _ in range(4):
+        await _settle()
+        controller.release()
+    await asyncio.gather(*tasks, *late)
+
+    assert order == ["a", "b", "c", "late"]
+    assert controller.active == 0
+    stats = controller.stats()
+    assert stats["admitted"] == 5
+    assert stats["queued"] == 4
+    assert stats["max_queue_depth_seen"] == 3
+    assert stats["wait_ms"]["max"] > 0
+
+
+@pytest.mark.asyncio
+async def test_waiter_times_out_with_503_without_leaking_a_slot():
+    controller = AdmissionController(limit=1, max_queue=5, queue_timeout=0.05)
+    await controller.acquire()
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await controller.acquire()
+
+    assert excinfo.value.status == 503
+    assert excinfo.value.retry_after >= 1
+    assert controller.queue_depth == 0
+    assert controller.stats()["rejected_timeout"] == 1
+
+    controller.release()
+    assert controller.active == 0
+    await asyncio.wait_for(controller.acquire(), 0.1)
+    assert controller.active == 1
+
+
+@pytest.mark.asyncio
+async def test_waiter_cancelled_while_queued_leaves_the_queue():
+    controller = AdmissionController(limit=1, max_queue=5)
+    await controller.acquire()
+    waiter = asyncio.create_task(controller.acquire())
+    await _settle()
+    assert controller.queue_depth == 1
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert controller.queue_depth == 0
+    controller.release()
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_waiter_cancelled_after_handoff_passes_the_slot_on():
+    controller = AdmissionController(limit=1, max_queue=5)
+    await controller.acquire()
+    first = asyncio.create_task(controller.acquire())
+    await _settle()
+    second = asyncio.create_task(controller.acquire())
+    await _settle()
+
+    controller.release()  # 交給 first，first 醒來前就被取消
+    first.cancel()
+    try:
+        await first
+        controller.release()  # 已經拿到名額：照常執行完才釋放
+    except asyncio.CancelledError:
+        pass  # 取消時名額轉交給下一位
+    await asyncio.wait_for(second, 0.1)
+
+    assert controller.active == 1
+    controller.release()
+    assert controller.active == 0
+    assert controller.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_429_and_retry_after():
+    controller = AdmissionController(limit=1, max_queue=1)
+    async with controller.admit():
+        pass
+    controller._service_ewma = 4.0  # 平均處理時間 4 秒
+    await controller.acquire()
+    queued = asyncio.create_task(controller.acquire())
+    await _settle()
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await controller.acquire()
+
+    # 前面還有 1 個排隊：(1 + 1) 批 × 4 秒
+    assert excinfo.value.status == 429
+    assert excinfo.value.retry_after == 8
+    assert controller.stats()["rejected_queue_full"] == 1
+
+    controller.release()
+    await queued
+    controller.release()
+
+
+@pytest.mark.asyncio
+async def test_no_queue_rejects_immediately():
+    controller = AdmissionController(limit=1, max_queue=0)
+    await controller.acquire()
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await controller.acquire()
+    assert excinfo.value.status == 429
+    assert excinfo.value.retry_after >= 1
+
+
+def test_concurrency_limit_falls_back_to_executor_then_pool_size():
+    executor = SimpleNamespace(config=SimpleNamespace(max_concurrent_activities=7))
+    assert concurrency_limit(None, executor, 4) == 7
+    assert concurrency_limit(3, executor, 4) == 3
+    no_limit = SimpleNamespace(config=SimpleNamespace(max_concurrent_activities=None))
+    assert concurrency_limit(None, no_limit, 4) == 4
+    assert concurrency_limit(None, SimpleNamespace(config=None), 4) == 4
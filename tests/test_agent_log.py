@@ -0,0 +1,103 @@
+from agent_log import AgentLog
+
+
+def _log(n: int, max_entries: int) -> AgentLog:
+    log = AgentLog(max_entries)
+    for i in range(1, n + 1):
+        log.append(f"m{i}")
+    return log
+
+
+def _messages(entries):
+    return [message for _, _, message in entries]
+
+
+def test_empty_log_has_no_entries():
+    log = AgentLog(3)
+
+    assert len(log) == 0
+    assert log.last_seq == 0
+    assert log.first_seq == 1
+    assert log.tail(5) == []
+    assert log.since(0) == []
+
+
+def test_oldest_entries_are_evicted_at_max_entries():
+    log = _log(5, max_entries=3)
+
+    assert len(log) == 3
+    assert _messages(log.tail(10)) == ["m3", "m4", "m5"]
+    assert log.first_seq == 3
+    assert log.last_seq == 5
+
+
+def test_sequence_numbers_keep_counting_after_wrap():
+    log = _log(7, max_entries=3)
+
+    assert log.append("m8") == 8
+    assert log.first_seq == 6
+    assert [seq for seq, _, _ in log.tail(3)] == [6, 7, 8]
+
+
+def test_tail_bounds():
+    log = _log(5, max_entries=3)
+
+    assert _messages(log.tail(2)) == ["m4", "m5"]
+    assert log.tail(0) == []
+    assert log.tail(-1) == []
+
+
+def test_since_returns_newer_entries_up_to_limit():
+    log = _log(5, max_entries=10)
+
+    assert _messages(log.since(2)) == ["m3", "m4", "m5"]
+    assert _messages(log.since(2, limit=2)) == ["m3", "m4"]
+    assert log.since(5) == []
+
+
+def test_page_reports_entries_dropped_before_since():
+    log = _log(6, max_entries=3)
+
+    page = log.page(1)
+
+    assert page["dropped"] is True
+    assert [e["message"] for e in page["entries"]] == ["m4", "m5", "m6"]
+    assert page["next"] == 6
+    assert page["last_seq"] == 6
+    assert page["reset"] is False
+
+
+def test_page_without_gap_is_not_dropped():
+    log = _log(6, max_entries=3)
+
+    page = log.page(3, limit=2)
+
+    assert page["dropped"] is False
+    assert [e["seq"] for e in page["entries"]] == [4, 5]
+    assert page["next"] == 5
+
+
+def test_page_when_caught_up():
+    log = _log(3, max_entries=3)
+
+    page = log.page(3)
+
+    assert page["entries"] == []
+    assert page["next"] == 3
+    assert page["dropped"] is False
+
+
+def test_page_restarts_when_since_is_ahead_of_the_log():
+    log = _log(2, max_entries=3)
+
+    page = log.page(10)
+
+    assert page["reset"] is True
+    assert [e["seq"] for e in page["entries"]] == [1, 2]
+    assert page["dropped"] is False
+
+
+def test_page_on_empty_log():
+    page = AgentLog(3).page(0)
+
+    assert page == {"entries": [], "next": 0, "last_seq": 0, "dropped": False, "reset": False}
@@ -0,0 +1,28 @@
+import pytest
+
+from answer_cache import normalize_query, only_filler_differs
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ("台積電有沒有違反勞基法", "請問台積電是否違反勞基法？"),
+        ("台積電違反勞基法嗎", "臺積電 違反勞基法"),
+        ("想知道聯電目前的ESG", "聯電目前的esg呢"),
+    ],
+)
+def test_rephrased_questions_match(a, b):
+    assert only_filler_differs(normalize_query(a), normalize_query(b))
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ("大有公司違反勞基法嗎", "大公司違反勞基法嗎"),
+        ("現代汽車的ESG", "代汽車的ESG"),
+        ("台積電違反勞基法嗎", "聯電違反勞基法嗎"),
+        ("台積電違反勞基法嗎", "台積電違反性別工作平等法嗎"),
+    ],
+)
+def test_different_companies_or_laws_do_not_match(a, b):
+    assert not only_filler_differs(normalize_query(a), normalize_query(b))
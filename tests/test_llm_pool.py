@@ -0,0 +1,156 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from llm_pool import LLMPool
+from mcp_agent.workflows.llm.augmented_llm import SimpleMemory
+
+
+def _factory():
+    return SimpleNamespace(history=SimpleMemory())
+
+
+def _message(role: str, text: str):
+    return SimpleNamespace(role=role, text=text)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_separate_sessions_get_separate_workers():
+    pool = LLMPool(_factory, max_size=4)
+
+    async with pool.acquire("alice") as alice:
+        alice.history.append(_message("user", "alice"))
+    async with pool.acquire("bob") as bob:
+        bob.history.append(_message("user", "bob"))
+    async with pool.acquire("alice") as again:
+        pass
+
+    assert alice is not bob
+    assert again is alice
+    assert [m.text for m in again.history.get()] == ["alice"]
+    assert pool.stats()["sessions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_requests_without_session_are_stateless():
+    pool = LLMPool(_factory, max_size=4)
+
+    async with pool.acquire() as llm:
+        llm.history.append(_message("user", "q1"))
+    async with pool.acquire() as reused:
+        history = reused.history.get()
+
+    assert reused is llm
+    assert history == []
+    assert pool.stats()["sessions"] == 0
+    assert pool.stats()["stateless_idle"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_never_grows_past_max_size():
+    pool = LLMPool(_factory, max_size=2)
+    gate = asyncio.Event()
+    entered = []
+
+    async def _use(session_id):
+        async with pool.acquire(session_id):
+            entered.append(session_id)
+            await gate.wait()
+
+    tasks = [asyncio.create_task(_use(s)) for s in ("a", "b", "c")]
+    await _settle()
+
+    # a、b 都在忙，c 只能等
+    assert entered == ["a", "b"]
+    assert pool.stats()["size"] == 2
+
+    gate.set()
+    await asyncio.gather(*tasks)
+
+    assert entered == ["a", "b", "c"]
+    assert pool.stats()["size"] == 2
+    assert pool.stats()["evicted"] == 1  # c 進來時回收最久沒用的 a
+    assert pool.created == 3
+
+
+@pytest.mark.asyncio
+async def test_same_session_is_served_one_request_at_a_time():
+    pool = LLMPool(_factory, max_size=4)
+    gate = asyncio.Event()
+    entered = []
+
+    async def _use(tag):
+        async with pool.acquire("alice"):
+            entered.append(tag)
+            await gate.wait()
+
+    tasks = [asyncio.create_task(_use(t)) for t in (1, 2)]
+    await _settle()
+    assert entered == [1]
+
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert entered == [1, 2]
+    assert pool.created == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_expire_after_ttl():
+    pool = LLMPool(_factory, max_size=4, idle_ttl=60)
+    async with pool.acquire("alice") as alice:
+        pass
+    async with pool.acquire("bob"):
+        pass
+
+    pool._sessions["alice"].last_used -= 120
+    await pool.evict_idle()
+
+    assert list(pool._sessions) == ["bob"]
+    assert pool.stats()["evicted"] == 1
+    async with pool.acquire("alice") as fresh:
+        assert fresh is not alice
+
+
+def test_trim_history_keeps_the_latest_turns_from_a_user_message():
+    pool = LLMPool(_factory, max_history=3)
+    llm = _factory()
+    llm.history.set([
+        _message("user", "q1"),
+        _message("model", "call"),
+        _message("function", "result"),
+        _message("model", "a1"),
+        _message("user", "q2"),
+        _message("model", "a2"),
+    ])
+
+    pool._trim_history(llm)
+
+    # 後 3 則從 model "a1" 開始，往後找到 user 訊息才切
+    assert [m.text for m in llm.history.get()] == ["q2", "a2"]
+
+
+def test_trim_history_leaves_short_history_alone():
+    pool = LLMPool(_factory, max_history=3)
+    llm = _factory()
+    llm.history.set([_message("user", "q1"), _message("model", "a1")])
+
+    pool._trim_history(llm)
+
+    assert len(llm.history.get()) == 2
+
+
+@pytest.mark.asyncio
+async def test_session_history_is_trimmed_on_checkin():
+    pool = LLMPool(_factory, max_history=2)
+    async with pool.acquire("alice") as llm:
+        for i in range(3):
+            llm.history.append(_message("user", f"q{i}"))
+            llm.history.append(_message("model", f"a{i}"))
+
+    assert [m.text for m in llm.history.get()] == ["q2", "a2"]
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from mcp_agent.utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_run_once():
+    flight = SingleFlight()
+    calls = 0
+    gate = asyncio.Event()
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await gate.wait()
+        return "result"
+
+    callers = [asyncio.create_task(flight.do("key", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*callers)
+
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert flight.stats() == {
+        "inflight": 0,
+        "executions": 1,
+        "coalesced": 4,
+        "coalesced_rate": 0.8,
+    }
+
+
+@pytest.mark.asyncio
+async def test_exception_reaches_every_waiter():
+    flight = SingleFlight()
+    gate = asyncio.Event()
+
+    async def work():
+        await gate.wait()
+        raise ValueError("boom")
+
+    callers = [asyncio.create_task(flight.do("key", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) and str(r) == "boom" for r in results)
+    assert not flight.is_inflight("key")
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+    gate = asyncio.Event()
+
+    async def work():
+        await gate.wait()
+        return 42
+
+    leader = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert flight.is_inflight("key")
+
+    gate.set()
+    assert await follower == 42
+    assert flight.stats()["executions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_key_is_released_after_completion():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await flight.do("key", work) == 1
+    assert not flight.is_inflight("key")
+    assert len(flight) == 0
+    # Nothing is cached: the next call runs again
+    assert await flight.do("key", work) == 2
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flight = SingleFlight()
+    gate = asyncio.Event()
+
+    async def work(value):
+        await gate.wait()
+        return value
+
+    a = asyncio.create_task(flight.do("a", lambda: work("a")))
+    b = asyncio.create_task(flight.do("b", lambda: work("b")))
+    await asyncio.sleep(0)
+    assert len(flight) == 2
+    gate.set()
+
+    assert await asyncio.gather(a, b) == ["a", "b"]
+    assert flight.stats()["executions"] == 2
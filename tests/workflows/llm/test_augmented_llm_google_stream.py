@@ -0,0 +1,173 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from google.genai import types
+from mcp.types import CallToolResult, ListToolsResult, TextContent, Tool
+
+from mcp_agent.config import GoogleSettings
+from mcp_agent.workflows.llm.augmented_llm import RequestParams
+from mcp_agent.workflows.llm.augmented_llm_google import (
+    GoogleAugmentedLLM,
+    GoogleCompletionTasks,
+)
+
+
+class FakeModels:
+    """Stands in for client.aio.models; each call streams the next scripted turn."""
+
+    def __init__(self, turns):
+        self.turns = list(turns)
+        self.requests = []
+
+    async def generate_content_stream(self, **payload):
+        # contents is the LLM's live message list; keep what was actually sent
+        self.requests.append({**payload, "contents": list(payload["contents"])})
+        parts = self.turns.pop(0)
+
+        async def _stream():
+            for part in parts:
+                yield types.GenerateContentResponse(
+                    candidates=[
+                        types.Candidate(content=types.Content(role="model", parts=[part]))
+                    ]
+                )
+
+        return _stream()
+
+    async def generate_content(self, **payload):
+        self.requests.append({**payload, "contents": list(payload["contents"])})
+        return types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(
+                    content=types.Content(role="model", parts=self.turns.pop(0))
+                )
+            ]
+        )
+
+
+def _text(text: str) -> types.Part:
+    return types.Part.from_text(text=text)
+
+
+def _call(name: str, **args) -> types.Part:
+    return types.Part(function_call=types.FunctionCall(name=name, args=args))
+
+
+@pytest.fixture
+def fake_models(monkeypatch):
+    models = FakeModels([])
+    monkeypatch.setattr(GoogleCompletionTasks, "_clients", {})
+    monkeypatch.setattr(
+        GoogleCompletionTasks,
+        "create_client",
+        staticmethod(lambda config: SimpleNamespace(aio=SimpleNamespace(models=models))),
+    )
+    return models
+
+
+@pytest.fixture
+def llm():
+    context = MagicMock()
+    context.config.google = GoogleSettings(api_key="test", default_model="gemini-2.0-flash")
+    context.tracing_enabled = False
+    agent = MagicMock()
+    agent.name = "test"
+    agent.instruction = "You are a helpful assistant."
+    agent.list_tools = AsyncMock(
+        return_value=ListToolsResult(
+            tools=[
+                Tool(
+                    name="lookup",
+                    description="Look up a company",
+                    inputSchema={"type": "object", "properties": {"q": {"type": "string"}}},
+                )
+            ]
+        )
+    )
+    llm = GoogleAugmentedLLM(agent=agent, context=context)
+    llm.select_model = AsyncMock(return_value="gemini-2.0-flash")
+    llm.call_tool = AsyncMock(
+        return_value=CallToolResult(content=[TextContent(type="text", text="found")])
+    )
+    return llm
+
+
+async def _collect(stream):
+    return [event async for event in stream]
+
+
+@pytest.mark.asyncio
+async def test_generate_stream_runs_tools_then_streams_answer(llm, fake_models):
+    fake_models.turns = [
+        [_call("lookup", q="台積電")],
+        [_text("Hel"), _text("lo")],
+    ]
+
+    events = await _collect(llm.generate_stream("who?"))
+
+    assert [e["type"] for e in events] == [
+        "tool_call_start",
+        "tool_call_end",
+        "token",
+        "token",
+        "done",
+    ]
+    assert events[0] == {"type": "tool_call_start", "name": "lookup", "arguments": {"q": "台積電"}}
+    assert events[1]["ok"] is True
+    assert events[-1] == {"type": "done", "text": "Hello", "iterations": 2}
+
+    # The second completion sees the tool call and its response
+    contents = fake_models.requests[1]["contents"]
+    assert [c.role for c in contents] == ["user", "model", "tool"]
+    assert contents[2].parts[0].function_response.name == "lookup"
+    assert fake_models.requests[1]["config"].tools[0].function_declarations[0].name == "lookup"
+
+    history = llm.history.get()
+    assert history[-1].role == "model"
+    assert history[-1].parts[0].text == "Hello"
+
+
+@pytest.mark.asyncio
+async def test_generate_stream_reports_failed_tool_and_continues(llm, fake_models):
+    llm.call_tool = AsyncMock(side_effect=RuntimeError("boom"))
+    fake_models.turns = [
+        [_call("lookup", q="x")],
+        [_text("sorry")],
+    ]
+
+    events = await _collect(llm.generate_stream("who?"))
+
+    tool_end = next(e for e in events if e["type"] == "tool_call_end")
+    assert tool_end["ok"] is False
+    tool_message = fake_models.requests[1]["contents"][-1]
+    assert tool_message.role == "tool"
+    assert "Error executing tool" in tool_message.parts[0].text
+    assert events[-1]["text"] == "sorry"
+
+
+@pytest.mark.asyncio
+async def test_generate_and_generate_stream_send_the_same_requests(llm, fake_models):
+    async def execute(task, request):
+        return await GoogleCompletionTasks.request_completion_task(request)
+
+    async def execute_many(calls):
+        return await asyncio.gather(*calls)
+
+    llm.executor.execute = execute
+    llm.executor.execute_many = execute_many
+    script = [[_call("lookup", q="x")], [_text("done")]]
+
+    fake_models.turns = list(script)
+    responses = await llm.generate("who?", RequestParams(use_history=False))
+    batch_requests, fake_models.requests = fake_models.requests, []
+
+    fake_models.turns = list(script)
+    await _collect(llm.generate_stream("who?", RequestParams(use_history=False)))
+
+    assert [r.parts[0].text for r in responses[1:]] == ["done"]
+    assert len(batch_requests) == len(fake_models.requests) == 2
+    for batch, streamed in zip(batch_requests, fake_models.requests):
+        assert batch["contents"] == streamed["contents"]
+        assert batch["config"] == streamed["config"]